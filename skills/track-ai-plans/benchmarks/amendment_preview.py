@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Amendment previews: deepcopy plus full validation versus copy-on-write plus `validate_amendment`.
+
+Each case applies one amendment's operations to a generated plan whose done items carry long
+verification histories. The copy-on-write path must produce an equal preview and equal
+errors, and leave the original plan and map untouched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from generate_store import generate  # noqa: E402
+from qing_plan import storage as st  # noqa: E402
+from qing_plan import amendments  # noqa: E402
+from qing_plan.amendments import apply_operation  # noqa: E402
+from qing_plan.domain import copy_on_write, validate_amendment, validate_plan, validate_project_map  # noqa: E402
+from qing_plan.storage import PlanError, fingerprint  # noqa: E402
+
+ENTRY = {"slug": "bench-000", "state": "active"}
+# apply_operation stamps the items it adds; one fixed clock lets the two previews compare equal.
+amendments.now = lambda: "2026-01-01T00:00:00Z"
+
+
+def operation_sets(plan: dict, project_map: dict) -> dict[str, list[dict]]:
+    items = [item for phase in plan["phases"] for item in phase["items"]]
+    waiting = next(item for item in reversed(items) if item["status"] == "not-started")
+    module = project_map["modules"][-1]["id"]
+    return {
+        "add-item": [{"op": "add-item", "phaseId": plan["phases"][-1]["id"], "id": "amended-item", "title": "Amended",
+                      "purpose": "Preview", "verifyKind": "test", "dependsOn": [items[-1]["id"], items[0]["id"]],
+                      "changeSets": [{"moduleId": module, "reason": "preview", "files": [{"path": "src/new.py", "action": "create", "from": None}]}]}],
+        "add-file": [{"op": "add-file", "itemId": waiting["id"], "moduleId": module, "reason": "preview", "path": "src/extra.py",
+                      "action": "create"}],
+        "map-and-scope": [
+            {"op": "upsert-module", "id": "preview-module", "name": "Preview", "description": "Preview module",
+             "pathPatterns": ["preview/**"], "reason": "preview", "evidence": "benchmark"},
+            {"op": "upsert-dependency", "moduleId": "preview-module", "dependsOn": module, "reason": "preview", "evidence": "benchmark"},
+            {"op": "add-file", "itemId": waiting["id"], "moduleId": "preview-module", "reason": "preview", "path": "preview/a.py",
+             "action": "create"},
+        ],
+        "invalid-dependency": [{"op": "add-item", "phaseId": plan["phases"][0]["id"], "id": "dangling", "title": "Dangling",
+                                "purpose": "Preview", "verifyKind": "test", "dependsOn": ["no-such-item"], "noFileImpact": True}],
+        "invalid-module": [{"op": "add-file", "itemId": waiting["id"], "moduleId": "no-such-module", "reason": "preview",
+                            "path": "src/orphan.py", "action": "create"}],
+    }
+
+
+def full_preview(plan: dict, project_map: dict, operations: list[dict]) -> tuple[dict, dict, list[str]]:
+    preview_plan, preview_map = copy.deepcopy(plan), copy.deepcopy(project_map)
+    for operation in operations:
+        apply_operation(preview_plan, preview_map, ENTRY["slug"], operation)
+    return preview_plan, preview_map, validate_project_map(preview_map) + validate_plan(ENTRY, preview_plan, preview_map)
+
+
+def incremental_preview(plan: dict, project_map: dict, operations: list[dict]) -> tuple[dict, dict, list[str]]:
+    preview_plan, preview_map = copy_on_write(plan, project_map, operations)
+    for operation in operations:
+        apply_operation(preview_plan, preview_map, ENTRY["slug"], operation)
+    return preview_plan, preview_map, validate_amendment(ENTRY, preview_plan, preview_map, operations)
+
+
+def timed(function, *args, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="500,2000", help="comma-separated item counts")
+    parser.add_argument("--attempts", type=int, default=25, help="verification attempts per done item")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    rows, identical = [], True
+    for size in [int(value) for value in args.sizes.split(",") if value]:
+        workdir = Path(tempfile.mkdtemp(prefix="planctl-amend-"))
+        try:
+            root = workdir / "store"
+            generate(root, plans=1, items=size, events=1, repo_files=size, untracked=0, dependencies=0)
+            plan, project_map = st.read_json(st.plan_path(root, ENTRY["slug"])), st.read_json(st.map_path(root))
+        finally:
+            st._STORE_OVERRIDE = None
+            shutil.rmtree(workdir, ignore_errors=True)
+        for item in (item for phase in plan["phases"] for item in phase["items"] if item["status"] == "done"):
+            item["verificationAttempts"] *= args.attempts
+        before = fingerprint([plan, project_map])
+        row = {"items": size, "cases": {}}
+        rows.append(row)
+        for name, operations in operation_sets(plan, project_map).items():
+            try:
+                full_seconds, expected = timed(full_preview, plan, project_map, operations, repeat=args.repeat)
+                cow_seconds, actual = timed(incremental_preview, plan, project_map, operations, repeat=args.repeat)
+            except PlanError as exc:
+                raise SystemExit(f"{name}: {exc}")
+            same = actual == expected and fingerprint([plan, project_map]) == before
+            identical = identical and same
+            row["cases"][name] = {"fullSeconds": round(full_seconds, 6), "copyOnWriteSeconds": round(cow_seconds, 6),
+                                  "speedup": round(full_seconds / cow_seconds, 1) if cow_seconds else None,
+                                  "errors": len(expected[2]), "identical": same}
+    print(json.dumps({"benchmark": "amendment_preview", "attemptsPerDoneItem": args.attempts, "results": rows}, indent=2))
+    if not identical:
+        print("copy-on-write previews differ from deepcopy plus full validation", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
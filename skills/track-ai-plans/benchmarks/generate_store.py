@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Write a synthetic Git repository plus Qing Plans store directly, without going through planctl.
+
+The store is deterministic for a given seed and passes `planctl validate`: the first plan
+is active with a done prefix, one item in progress and the rest not started; the others are
+completed with frozen status. `--legacy` writes a V1 `plans/` store for `migrate-store`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from qing_plan import storage as st  # noqa: E402
+from qing_plan.commands import install_store_assets, new_checkpoint  # noqa: E402
+from qing_plan.git import path_snapshot, reset_git_observers  # noqa: E402
+from qing_plan.projection import status_projection  # noqa: E402
+
+STAMP = "2026-01-01T00:00:00.000000Z"
+DEFAULTS = {"plans": 3, "phases": 8, "items": 400, "files": 3, "events": 2000, "modules": 24,
+            "dependencies": 40, "repo_files": 2000, "untracked": 50, "seed": 7}
+
+
+def git(root: Path, *args: str) -> str:
+    return subprocess.run(["git", "-C", str(root), *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def stamp(offset: int) -> str:
+    """Monotonic synthetic timestamps, one second apart from the fixed epoch."""
+    minutes, seconds = divmod(offset, 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    return f"2026-{1 + days // 28:02d}-{1 + days % 28:02d}T{hours:02d}:{minutes:02d}:{seconds:02d}.000000Z"
+
+
+def module_ids(count: int) -> list[str]:
+    return [f"mod-{number:03d}" for number in range(count)]
+
+
+def item_paths(module: str, slug: str, number: int, files: int) -> list[str]:
+    return [f"src/{module}/{slug}/item-{number:05d}-{part}.py" for part in range(files)]
+
+
+def build_repository(root: Path, params: dict, layout: dict[str, list[tuple[str, list[str]]]], rng: random.Random) -> str:
+    """Create the repository with every planned path plus filler files committed as the baseline."""
+    root.mkdir(parents=True, exist_ok=True)
+    git(root, "init", "-q")
+    git(root, "config", "user.email", "benchmarks@example.invalid")
+    git(root, "config", "user.name", "benchmarks")
+    planned = [path for items in layout.values() for _, paths in items for path in paths]
+    filler = [f"vendor/lib{number // 100:03d}/file{number:05d}.txt" for number in range(max(0, params["repo_files"] - len(planned)))]
+    for path in planned + filler:
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"{path}\n{rng.random()}\n", encoding="utf-8")
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", "benchmark baseline")
+    return git(root, "rev-parse", "HEAD")
+
+
+def modify_done_paths(root: Path, paths: list[str]) -> str:
+    for path in paths:
+        with (root / path).open("a", encoding="utf-8") as handle:
+            handle.write("changed by a done item\n")
+    if paths:
+        git(root, "add", "-A")
+        git(root, "commit", "-qm", "benchmark done items")
+    return git(root, "rev-parse", "HEAD")
+
+
+def add_untracked(root: Path, count: int) -> None:
+    for number in range(count):
+        target = root / "scratch" / f"untracked-{number:05d}.txt"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f"untracked {number}\n", encoding="utf-8")
+
+
+def plan_layout(slug: str, params: dict, modules: list[str]) -> list[tuple[str, list[str]]]:
+    """(item id, planned paths) in plan order for one plan."""
+    return [(f"{slug}-item-{number:05d}", item_paths(modules[number % len(modules)], slug, number, params["files"]))
+            for number in range(params["items"])]
+
+
+def project_map(params: dict, modules: list[str], rng: random.Random) -> dict:
+    document = st.empty_project_map()
+    document.update(revision=1, updatedAt=STAMP)
+    for module in modules:
+        document["modules"].append({
+            "id": module, "name": module.title(), "description": f"Synthetic module {module}",
+            "pathPatterns": [f"src/{module}/**"], "reason": "benchmark topology", "evidence": "generate_store.py",
+            "introducedByPlan": None, "updatedByPlan": None,
+        })
+    edges = set()
+    attempts = 0
+    while len(edges) < min(params["dependencies"], len(modules) * (len(modules) - 1) // 2) and attempts < params["dependencies"] * 20:
+        attempts += 1
+        low, high = sorted(rng.sample(range(len(modules)), 2))
+        edges.add((modules[high], modules[low]))
+    document["dependencies"] = [{"moduleId": module, "dependsOn": depends_on, "reason": "benchmark topology",
+                                 "evidence": "generate_store.py", "introducedByPlan": None, "updatedByPlan": None}
+                                for module, depends_on in sorted(edges)]
+    return document
+
+
+def done_execution(paths: list[str], head: str, offset: int) -> dict:
+    return {"startHead": head, "startedAt": stamp(offset), "plannedSnapshots": [], "endHead": head, "endedAt": stamp(offset + 1),
+            "observedFiles": [{"path": path, "plannedAction": "modify", "observedAction": "modify", "beforeSha256": None,
+                               "afterSha256": None, "from": None} for path in paths]}
+
+
+def build_plan(root: Path, slug: str, layout: list[tuple[str, list[str]]], params: dict, modules: list[str],
+               rng: random.Random, *, active: bool, head: str) -> dict:
+    phases = max(1, min(params["phases"], len(layout)))
+    per_phase = -(-len(layout) // phases)
+    done_count = len(layout) * 2 // 5 if active else len(layout)
+    plan = {
+        "schemaVersion": st.SCHEMA_VERSION, "slug": slug, "goal": f"Synthetic benchmark plan {slug}", "owner": "benchmarks",
+        "planner": "planner", "reviewPolicy": "none", "revision": 1, "createdAt": STAMP, "updatedAt": STAMP,
+        "currentPhaseId": None, "documentationImpact": {"mode": "none", "coverage": "all", "reason": "synthetic", "targets": []},
+        "phases": [], "reviews": [], "amendments": [], "checkpoint": new_checkpoint(), "issues": [],
+    }
+    for number, (item_id, paths) in enumerate(layout):
+        if number % per_phase == 0:
+            plan["phases"].append({"id": f"phase-{len(plan['phases']) + 1:03d}", "title": f"Phase {len(plan['phases']) + 1}",
+                                   "purpose": "Synthetic phase", "items": []})
+        earlier = [layout[rng.randrange(max(0, number - 30), number)][0] for _ in range(rng.randrange(3))] if number else []
+        status = "done" if number < done_count else "in-progress" if number == done_count else "not-started"
+        module = modules[number % len(modules)]
+        item = {
+            "id": item_id, "title": f"Item {number}", "purpose": "Synthetic work", "dependsOn": sorted(set(earlier)),
+            "status": status, "verifyKind": "test", "reason": None, "noFileImpact": False,
+            "changeSets": [{"moduleId": module, "reason": "synthetic change",
+                            "files": [{"path": path, "action": "modify", "from": None} for path in paths]}],
+            "verificationAttempts": [], "executionAttempts": [], "execution": None, "completedBy": None, "updatedAt": STAMP,
+        }
+        if status == "done":
+            item["verificationAttempts"] = [{"id": f"verify-{number:05d}", "kind": "test", "source": "script", "result": "pass",
+                                             "evidence": "synthetic tests passed", "reason": None, "actor": "worker",
+                                             "timestamp": stamp(number * 2 + 1)}]
+            item["execution"] = done_execution(paths, head, number * 2)
+            item["executionAttempts"] = [dict(item["execution"])]
+            item["completedBy"] = "worker"
+        elif status == "in-progress":
+            item["execution"] = {"startHead": head, "startedAt": stamp(number * 2), "endHead": None, "endedAt": None,
+                                 "observedFiles": [], "plannedSnapshots": [path_snapshot(root, path) for path in paths]}
+            item["executionAttempts"] = [dict(item["execution"])]
+        plan["phases"][-1]["items"].append(item)
+    plan["currentPhaseId"] = plan["phases"][0]["id"] if plan["phases"] else None
+    return plan
+
+
+def build_events(slug: str, plan: dict, count: int, rng: random.Random) -> list[dict]:
+    items = [item["id"] for phase in plan["phases"] for item in phase["items"]] or [None]
+    kinds = ["item-updated", "item-verified", "checkpoint-created", "issue-opened"]
+    records = [{"schemaVersion": st.SCHEMA_VERSION, "eventId": f"{stamp(0).replace(':', '-')}-plan-created-{slug}",
+                "occurredAt": stamp(0), "type": "plan-created", "planSlug": slug, "actor": "planner", "actorType": "agent",
+                "details": {"goal": plan["goal"], "reviewPolicy": plan["reviewPolicy"]}}]
+    for number in range(1, count):
+        kind = kinds[number % len(kinds)]
+        item_id = rng.choice(items)
+        details = {"itemId": item_id} if kind != "checkpoint-created" else {"checkpoint": {"itemId": item_id}}
+        records.append({"schemaVersion": st.SCHEMA_VERSION, "eventId": f"{stamp(number).replace(':', '-')}-{kind}-{number:08x}",
+                        "occurredAt": stamp(number), "type": kind, "planSlug": slug, "actor": "worker", "actorType": "agent",
+                        "details": details})
+    return records[:count]
+
+
+def generate(root: Path, **overrides) -> dict:
+    """Write the repository and V2 store under `root`; returns the parameters and resulting counts."""
+    params = {**DEFAULTS, **overrides}
+    if root.exists() and any(root.iterdir()):
+        raise SystemExit(f"refusing to generate into non-empty directory: {root}")
+    rng = random.Random(params["seed"])
+    modules = module_ids(max(1, params["modules"]))
+    slugs = [f"bench-{number:03d}" for number in range(params["plans"])]
+    layout = {slug: plan_layout(slug, params, modules) for slug in slugs}
+    baseline = build_repository(root, params, layout, rng)
+    done_paths = [path for slug in slugs for number, (_, paths) in enumerate(layout[slug])
+                  if slug != slugs[0] or number < len(layout[slug]) * 2 // 5 for path in paths]
+    head = modify_done_paths(root, done_paths)
+
+    st.select_store(root, "create")
+    reset_git_observers()
+    document = project_map(params, modules, rng)
+    st.write_json(st.map_path(root), document)
+    index = {**st.empty_index(), "revision": 1, "updatedAt": STAMP}
+    plans = {}
+    for position, slug in enumerate(slugs):
+        active = position == 0
+        entry = {"slug": slug, "name": f"Benchmark {slug}", "state": "active" if active else "completed",
+                 "path": f"{slug}/plan.json", "createdAt": STAMP, "updatedAt": STAMP, "activatedAt": STAMP,
+                 "baselineCommit": baseline, "replacedBy": None}
+        plan = plans[slug] = build_plan(root, slug, layout[slug], params, modules, rng, active=active, head=head)
+        index["plans"].append(entry)
+        if active:
+            index["currentPlanSlug"] = slug
+        st.write_json(st.plan_path(root, slug), plan)
+        st.write_event_records(st.events_dir(root, slug), build_events(slug, plan, params["events"], rng))
+    st.write_json(st.index_path(root), index)
+    install_store_assets(st.store_dir(root), overwrite=True)
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", "benchmark store")
+    # Status is rendered after the store commit so frozen snapshots observe a clean tree.
+    reset_git_observers()
+    for entry in index["plans"]:
+        st.write_json(st.status_path(root, entry["slug"]), status_projection(entry, plans[entry["slug"]], root, document, reuse=False))
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", "benchmark status")
+    add_untracked(root, params["untracked"])
+    return {"root": str(root), "params": params, "baseline": baseline, "plans": len(slugs),
+            "items": params["items"] * len(slugs), "plannedFiles": params["items"] * params["files"] * len(slugs),
+            "events": params["events"] * len(slugs)}
+
+
+def generate_legacy(root: Path, **overrides) -> dict:
+    """Write a V1 `plans/` store of the same shape, in a clean tree, for timing `migrate-store`."""
+    params = {**DEFAULTS, **overrides}
+    if root.exists() and any(root.iterdir()):
+        raise SystemExit(f"refusing to generate into non-empty directory: {root}")
+    rng = random.Random(params["seed"])
+    modules = module_ids(max(1, params["modules"]))
+    slugs = [f"bench-{number:03d}" for number in range(params["plans"])]
+    layout = {slug: plan_layout(slug, params, modules) for slug in slugs}
+    baseline = build_repository(root, params, layout, rng)
+    legacy = root / "plans"
+    index = {"schemaVersion": st.LEGACY_SCHEMA_VERSION, "revision": 1, "currentPlanSlug": slugs[0] if slugs else None,
+             "updatedAt": STAMP, "plans": []}
+    review = {"status": "passed", "reviewer": "reviewer", "evidence": "synthetic review", "reason": None, "reviewedAt": STAMP}
+    for position, slug in enumerate(slugs):
+        active = position == 0
+        index["plans"].append({"slug": slug, "name": f"Benchmark {slug}", "state": "active" if active else "completed",
+                               "path": f"{slug}/plan.json", "createdAt": STAMP, "updatedAt": STAMP, "activatedAt": STAMP,
+                               "baselineCommit": baseline, "replacedBy": None})
+        phases, per_phase = [], -(-len(layout[slug]) // max(1, params["phases"]))
+        for number, (item_id, paths) in enumerate(layout[slug]):
+            if number % per_phase == 0:
+                phases.append({"id": f"phase-{len(phases) + 1:03d}", "title": f"Phase {len(phases) + 1}", "purpose": "Synthetic phase",
+                               "phaseReview": review, "items": []})
+            done = not active or number < len(layout[slug]) * 2 // 5
+            phases[-1]["items"].append({
+                "id": item_id, "title": f"Item {number}", "purpose": "Synthetic work",
+                "dependsOn": [layout[slug][number - 1][0]] if number and rng.random() < 0.5 else [],
+                "status": "done" if done else "not-started", "verifyKind": "test", "verifiedBy": "script" if done else "unverified",
+                "completedBy": "worker" if done else None, "evidence": "synthetic tests passed" if done else None, "reason": None,
+                "noFileImpact": False, "plannedFiles": [{"path": path, "action": "modify", "from": None} for path in paths],
+                "updatedAt": STAMP})
+        plan = {"schemaVersion": st.LEGACY_SCHEMA_VERSION, "slug": slug, "goal": f"Synthetic legacy plan {slug}", "owner": "benchmarks",
+                "planner": "planner", "phaseReviewGatesEnabled": True, "planReview": review, "createdAt": STAMP, "updatedAt": STAMP,
+                "currentPhaseId": phases[0]["id"] if phases else None,
+                "documentationImpact": {"mode": "none", "coverage": "all", "reason": "synthetic", "targets": []},
+                "phases": phases, "checkpoint": {"currentItemId": None, "lastCompletedItemId": None, "stopReason": None, "updatedAt": STAMP},
+                "issues": []}
+        (legacy / slug / "events").mkdir(parents=True, exist_ok=True)
+        (legacy / slug / "plan.json").write_text(json.dumps(plan, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        if not active:
+            status = {"schemaVersion": st.LEGACY_SCHEMA_VERSION, "generatedAt": STAMP, "plan": {"slug": slug, "state": "completed"},
+                      "changeCoverage": {}, "documentationImpact": {"status": "skipped"}, "derivedIssues": []}
+            (legacy / slug / "status.json").write_text(json.dumps(status) + "\n", encoding="utf-8")
+        for number in range(params["events"]):
+            record = {"schemaVersion": st.LEGACY_SCHEMA_VERSION, "eventId": f"legacy-{slug}-{number:08d}", "occurredAt": stamp(number),
+                      "type": "item-verified", "planSlug": slug, "actor": "worker", "actorType": "agent",
+                      "details": {"itemId": layout[slug][number % len(layout[slug])][0]} if layout[slug] else {}}
+            (legacy / slug / "events" / f"{record['eventId']}.json").write_text(json.dumps(record) + "\n", encoding="utf-8")
+    (legacy / "index.json").write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", "benchmark legacy store")
+    # No untracked files here: migrate-store requires a clean working tree.
+    return {"root": str(root), "params": params, "legacy": True, "plans": len(slugs), "items": params["items"] * len(slugs),
+            "events": params["events"] * len(slugs)}
+
+
+def parameter_parser(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    return parser
+
+
+def main() -> int:
+    parser = parameter_parser(argparse.ArgumentParser(description=__doc__))
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--legacy", action="store_true", help="write a V1 plans/ store instead")
+    args = parser.parse_args()
+    params = {name: getattr(args, name) for name in DEFAULTS}
+    summary = (generate_legacy if args.legacy else generate)(args.root.resolve(), **params)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
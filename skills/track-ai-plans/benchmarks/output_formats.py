@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Peak memory and time of `history` and `show` output as indented JSON, compact JSON, and NDJSON.
+
+Each command runs in-process with stdout going to a sink that only counts bytes, so the
+tracemalloc peak is what building the output costs. NDJSON must carry exactly the events
+and items the JSON document does. Exits 1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from generate_store import generate  # noqa: E402
+from qing_plan import storage as st  # noqa: E402
+from qing_plan.cli import main as planctl  # noqa: E402
+
+FORMATS = ("json", "compact", "ndjson")
+
+
+class Sink(io.TextIOBase):
+    def __init__(self) -> None:
+        self.written = 0
+
+    def write(self, text: str) -> int:
+        self.written += len(text)
+        return len(text)
+
+
+def captured(argv: list[str]) -> str:
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        if planctl(argv):
+            raise SystemExit(f"planctl {' '.join(argv)} failed")
+    return buffer.getvalue()
+
+
+def measured(argv: list[str]) -> dict:
+    sink = Sink()
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        code = planctl(argv)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if code:
+        raise SystemExit(f"planctl {' '.join(argv)} failed")
+    return {"seconds": round(seconds, 4), "peakBytes": peak, "outputBytes": sink.written}
+
+
+def same_records(root: Path, command: str) -> bool:
+    document = json.loads(captured(["--root", str(root), command]))
+    rows = [json.loads(line) for line in captured(["--root", str(root), "--format", "ndjson", command]).splitlines()]
+    if command == "history":
+        return rows[:-1] == document["events"] and rows[-1]["type"] == "summary" and rows[-1]["events"] == len(document["events"])
+    items = [{"type": "item", "phaseId": phase["id"], **item} for phase in document["phases"] for item in phase["items"]]
+    return [row for row in rows if row["type"] == "item"] == items and rows[0]["summary"] == document["summary"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", default="2000,20000", help="comma-separated history lengths")
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+    rows, identical = [], True
+    for events in [int(value) for value in args.events.split(",") if value]:
+        workdir = Path(tempfile.mkdtemp(prefix="planctl-output-"))
+        try:
+            root = workdir / "store"
+            generate(root, plans=1, items=args.items, events=events, repo_files=args.items, untracked=0)
+            row = {"events": events, "items": args.items}
+            for command in ("history", "show"):
+                captured(["--root", str(root), command])  # warm the event index and status keys
+                row[command] = {name: measured(["--root", str(root), "--format", name, command]) for name in FORMATS}
+                same = same_records(root, command)
+                row[command]["identical"] = same
+                identical = identical and same
+            rows.append(row)
+        finally:
+            st._STORE_OVERRIDE = None
+            st._GENERATION = None
+            shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"benchmark": "output_formats", "results": rows}, indent=2))
+    if not identical:
+        print("NDJSON rows differ from the JSON document", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Compare the compiled PathMatcher against per-module fnmatch loops on a synthetic project map."""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from qing_plan.domain import module_matcher, path_matcher  # noqa: E402
+
+
+def synthetic_map(modules: int) -> dict:
+    entries = []
+    for number in range(modules):
+        base = f"src/pkg{number % 40}/mod{number}"
+        patterns = [f"{base}/**", f"{base}/*.py", f"tests/{base}_*.py"]
+        if number % 7 == 0:
+            patterns.append(f"docs/**/mod{number}*.md")
+        if number % 11 == 0:
+            patterns.append(f"src/pkg{number % 40}/[a-m]*")
+        entries.append({"id": f"mod-{number}", "pathPatterns": patterns})
+    entries.append({"id": "_unmapped", "pathPatterns": []})
+    return {"revision": 1, "modules": entries}
+
+
+def synthetic_paths(count: int, modules: int, rng: random.Random) -> list[str]:
+    paths = []
+    for number in range(count):
+        module = rng.randrange(modules)
+        shape = rng.randrange(5)
+        if shape == 0:
+            paths.append(f"src/pkg{module % 40}/mod{module}/file{number}.py")
+        elif shape == 1:
+            paths.append(f"tests/src/pkg{module % 40}/mod{module}_case{number}.py")
+        elif shape == 2:
+            paths.append(f"docs/guide/mod{module}-{number}.md")
+        elif shape == 3:
+            paths.append(f"src/pkg{module % 40}/{rng.choice('abcnxz')}helper{number}.py")
+        else:
+            paths.append(f"vendor/lib{number}/index.js")
+    return paths
+
+
+def loop_matches(project_map: dict, paths: list[str]) -> list[list[str]]:
+    normal = [m for m in project_map["modules"] if not m["id"].startswith("_")]
+    return [[m["id"] for m in normal if any(fnmatch.fnmatch(path, p) for p in m.get("pathPatterns", []))] for path in paths]
+
+
+def compiled_matches(project_map: dict, paths: list[str]) -> list[list[str]]:
+    matcher = module_matcher(project_map)
+    return [matcher.match(path) for path in paths]
+
+
+def timed(function, *args, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--paths", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    project_map = synthetic_map(args.modules)
+    paths = synthetic_paths(args.paths, args.modules, rng)
+    path_matcher.cache_clear()
+    started = time.perf_counter()
+    module_matcher(project_map)
+    compile_seconds = time.perf_counter() - started
+    loop_seconds, expected = timed(loop_matches, project_map, paths, repeat=args.repeat)
+    compiled_seconds, actual = timed(compiled_matches, project_map, paths, repeat=args.repeat)
+    if actual != expected:
+        mismatch = next(index for index, (left, right) in enumerate(zip(expected, actual)) if left != right)
+        print(f"mismatch for {paths[mismatch]}: loops {expected[mismatch]}, compiled {actual[mismatch]}", file=sys.stderr)
+        return 1
+    patterns = sum(len(m["pathPatterns"]) for m in project_map["modules"])
+    print(json.dumps({
+        "benchmark": "path_matcher", "modules": args.modules, "patterns": patterns, "paths": len(paths),
+        "matchedPaths": sum(1 for found in actual if found), "compileSeconds": round(compile_seconds, 6),
+        "loopSeconds": round(loop_seconds, 6), "compiledSeconds": round(compiled_seconds, 6),
+        "speedup": round(loop_seconds / compiled_seconds, 2) if compiled_seconds else None,
+        "identical": True,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
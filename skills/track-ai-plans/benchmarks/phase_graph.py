@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Scale phase_graph_projection over synthetic plans and check it against the former quadratic version."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from qing_plan.domain import PlanIndex, flatten_changes  # noqa: E402
+from qing_plan.projection import next_action, phase_graph_projection  # noqa: E402
+from synthetic import synthetic_plan  # noqa: E402
+
+
+def reference_phase_graph(plan: dict) -> dict:
+    """phase_graph_projection as it was before the reverse-dependency index: O(items^2)."""
+    phases = plan.get("phases", [])
+    items = {
+        item["id"]: item
+        for phase in phases
+        for item in phase.get("items", [])
+    }
+    item_phase = {
+        item["id"]: phase["id"]
+        for phase in phases
+        for item in phase.get("items", [])
+    }
+    dependencies: set[tuple[str, str]] = set()
+    for phase in phases:
+        for item in phase.get("items", []):
+            for dependency in item.get("dependsOn", []):
+                upstream = item_phase.get(dependency)
+                if upstream and upstream != phase["id"]:
+                    dependencies.add((phase["id"], upstream))
+
+    upstream_by_phase = {phase["id"]: set() for phase in phases}
+    downstream_by_phase = {phase["id"]: set() for phase in phases}
+    for phase_id, depends_on in dependencies:
+        upstream_by_phase[phase_id].add(depends_on)
+        downstream_by_phase[depends_on].add(phase_id)
+
+    projected = []
+    for order, phase in enumerate(phases):
+        phase_items = phase.get("items", [])
+        files = [file for item in phase_items for file in flatten_changes(item)]
+        modules = {file.get("moduleId") for file in files if file.get("moduleId")}
+        if any(item.get("noFileImpact") is True for item in phase_items):
+            modules.add("_cross-cutting")
+        internal_dependencies, incoming_dependencies, outgoing_dependencies = [], [], []
+        for item in phase_items:
+            for dependency in item.get("dependsOn", []):
+                edge = {"itemId": item["id"], "dependsOn": dependency}
+                dependency_phase = item_phase.get(dependency)
+                if dependency_phase == phase["id"]:
+                    internal_dependencies.append(edge)
+                else:
+                    incoming_dependencies.append({**edge, "fromPhaseId": dependency_phase})
+            for consumer in items.values():
+                if item["id"] not in consumer.get("dependsOn", []):
+                    continue
+                consumer_phase = item_phase.get(consumer["id"])
+                if consumer_phase != phase["id"]:
+                    outgoing_dependencies.append({
+                        "itemId": item["id"], "consumerId": consumer["id"], "toPhaseId": consumer_phase,
+                    })
+        projected.append({
+            "id": phase["id"], "title": phase.get("title"), "order": order,
+            "itemIds": [item["id"] for item in phase_items],
+            "completedItems": sum(item.get("status") == "done" for item in phase_items),
+            "totalItems": len(phase_items), "moduleIds": sorted(modules), "fileCount": len(files),
+            "dependsOn": sorted(upstream_by_phase[phase["id"]]),
+            "affects": sorted(downstream_by_phase[phase["id"]]),
+            "taskGraph": {
+                "nodes": [
+                    {"itemId": item["id"], "title": item.get("title"), "order": item_order,
+                     "status": item.get("status")}
+                    for item_order, item in enumerate(phase_items)
+                ],
+                "dependencies": sorted(internal_dependencies, key=lambda edge: (edge["itemId"], edge["dependsOn"])),
+                "incomingDependencies": sorted(
+                    incoming_dependencies,
+                    key=lambda edge: (edge["itemId"], edge["dependsOn"]),
+                ),
+                "outgoingDependencies": sorted(
+                    outgoing_dependencies,
+                    key=lambda edge: (edge["itemId"], edge["consumerId"]),
+                ),
+            },
+        })
+    return {
+        "phases": projected,
+        "dependencies": [
+            {"phaseId": phase_id, "dependsOn": depends_on}
+            for phase_id, depends_on in sorted(dependencies)
+        ],
+    }
+
+
+def timed(function, *args, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def indexed(plan: dict) -> tuple[dict, dict]:
+    plan_index = PlanIndex(plan)
+    return phase_graph_projection(plan, plan_index), next_action({"state": "active"}, plan, None, plan_index)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,2500,5000,10000", help="comma-separated item counts")
+    parser.add_argument("--phases", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--reference-limit", type=int, default=10000,
+                        help="skip the quadratic reference above this many items")
+    args = parser.parse_args()
+    rows = []
+    for size in [int(value) for value in args.sizes.split(",") if value]:
+        plan = synthetic_plan(size, args.phases, args.seed)
+        indexed_seconds, (projected, _) = timed(indexed, plan, repeat=args.repeat)
+        row = {"items": size, "edges": sum(len(item["dependsOn"]) for phase in plan["phases"] for item in phase["items"]),
+               "indexedSeconds": round(indexed_seconds, 6), "referenceSeconds": None, "identical": None}
+        if size <= args.reference_limit:
+            reference_seconds, expected = timed(reference_phase_graph, plan, repeat=args.repeat)
+            row.update(referenceSeconds=round(reference_seconds, 6), identical=expected == projected,
+                       speedup=round(reference_seconds / indexed_seconds, 1) if indexed_seconds else None)
+            if not row["identical"]:
+                print(json.dumps({"benchmark": "phase_graph", "results": rows + [row]}, indent=2))
+                print(f"phase graph differs from the reference at {size} items", file=sys.stderr)
+                return 1
+        rows.append(row)
+    print(json.dumps({"benchmark": "phase_graph", "phases": args.phases, "results": rows}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the plan lookup helpers: per-call walks versus one shared PlanIndex."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from qing_plan.domain import PlanIndex, find_item, item_map  # noqa: E402
+from qing_plan.projection import (  # noqa: E402
+    compute_change_coverage, next_action, phase_graph_projection, project_map_projection,
+)
+from synthetic import synthetic_plan  # noqa: E402
+
+ENTRY = {"state": "active"}
+
+
+def project_map_for(plan: dict) -> dict:
+    modules = sorted({change["moduleId"] for phase in plan["phases"] for item in phase["items"] for change in item["changeSets"]})
+    return {"revision": 1, "dependencies": [],
+            "modules": [{"id": module, "pathPatterns": [f"src/m{module.split('-')[1]}/**"]} for module in modules]}
+
+
+def dependencies_done(plan: dict, item: dict) -> bool:
+    """The per-call check the index replaced: a fresh item map for every lookup."""
+    items = item_map(plan)
+    return all(items.get(dep, {}).get("status") == "done" for dep in item.get("dependsOn", []))
+
+
+def cases(plan: dict, project_map: dict, sample: list[str]) -> dict:
+    """Each hot helper as (per-call walks, shared index); indexed cases pay for building the index."""
+
+    def find_walk() -> list:
+        return [find_item(plan, item_id)[1]["id"] for item_id in sample]
+
+    def find_indexed() -> list:
+        plan_index = PlanIndex(plan)
+        return [plan_index.find(item_id)[1]["id"] for item_id in sample]
+
+    def done_walk() -> list:
+        return [dependencies_done(plan, find_item(plan, item_id)[1]) for item_id in sample]
+
+    def done_indexed() -> list:
+        plan_index = PlanIndex(plan)
+        return [plan_index.dependencies_done(plan_index.items[item_id]) for item_id in sample]
+
+    def projections_walk() -> list:
+        return [compute_change_coverage(plan, {}), project_map_projection(plan, project_map), phase_graph_projection(plan),
+                next_action(ENTRY, plan, project_map)]
+
+    def projections_indexed() -> list:
+        plan_index = PlanIndex(plan)
+        return [compute_change_coverage(plan, {}, plan_index), project_map_projection(plan, project_map, plan_index),
+                phase_graph_projection(plan, plan_index), next_action(ENTRY, plan, project_map, plan_index)]
+
+    return {
+        "find_item": (find_walk, find_indexed),
+        "dependencies_done": (done_walk, done_indexed),
+        "status_projections": (projections_walk, projections_indexed),
+    }
+
+
+def timed(function, *args, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,5000,10000", help="comma-separated item counts")
+    parser.add_argument("--phases", type=int, default=25)
+    parser.add_argument("--lookups", type=int, default=200, help="item lookups and dependency checks per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    rows = []
+    for size in [int(value) for value in args.sizes.split(",") if value]:
+        plan = synthetic_plan(size, args.phases, args.seed)
+        project_map = project_map_for(plan)
+        sample = [f"item-{number}" for number in range(size - 1, -1, -max(1, size // args.lookups))]
+        build_seconds, _ = timed(PlanIndex, plan, repeat=args.repeat)
+        row = {"items": size, "lookups": len(sample), "buildSeconds": round(build_seconds, 6), "helpers": {}}
+        rows.append(row)
+        for name, (walk, indexed) in cases(plan, project_map, sample).items():
+            walk_seconds, expected = timed(walk, repeat=args.repeat)
+            index_seconds, actual = timed(indexed, repeat=args.repeat)
+            row["helpers"][name] = {
+                "walkSeconds": round(walk_seconds, 6), "indexedSeconds": round(index_seconds, 6),
+                "speedup": round(walk_seconds / index_seconds, 1) if index_seconds else None, "identical": actual == expected}
+        if not all(helper["identical"] for helper in row["helpers"].values()):
+            print(json.dumps({"benchmark": "plan_index", "results": rows}, indent=2))
+            print(f"indexed helpers differ from the walks at {size} items", file=sys.stderr)
+            return 1
+    print(json.dumps({"benchmark": "plan_index", "phases": args.phases, "results": rows}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Event-sourced replay: fold a long synthetic event log into its plan, from scratch and from snapshots.
+
+The log is written the way planctl records events, while an independent model applies each
+change to the expected plan. Replay must rebuild that plan exactly (less `updatedAt`), and a
+replay after appending `--tail` events must resume from a snapshot. Exits 1 otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from generate_store import generate, stamp  # noqa: E402
+from qing_plan import storage as st  # noqa: E402
+from qing_plan import replay  # noqa: E402
+from qing_plan.commands import new_checkpoint  # noqa: E402
+
+SLUG = "bench-000"
+
+
+class Log:
+    """Records events and applies the same changes to the expected plan, without the fold."""
+
+    def __init__(self, template: dict) -> None:
+        self.records: list[dict] = []
+        self.plan = {**copy.deepcopy(template), "revision": 1, "phases": [], "reviews": [], "amendments": [],
+                     "issues": [], "checkpoint": new_checkpoint(), "createdAt": stamp(0)}
+        self.plan.pop("executionLanes", None)
+        self.emit("plan-created", {"goal": self.plan["goal"], "reviewPolicy": self.plan["reviewPolicy"], "executionLanes": 1,
+                                   "plan": self.plan})
+        self.items: list[dict] = []
+        for phase in template["phases"]:
+            self.plan["phases"].append({**phase, "items": []})
+            self.plan["revision"] += 1
+            self.emit("phase-added", {"after": {**phase, "items": []}})
+            for source in phase["items"]:
+                item = {**source, "status": "not-started", "reason": None, "verificationAttempts": [], "executionAttempts": [],
+                        "execution": None, "completedBy": None, "updatedAt": stamp(len(self.records))}
+                self.plan["phases"][-1]["items"].append(item)
+                self.items.append(item)
+                self.plan["revision"] += 1
+                self.emit("item-added", {"phaseId": phase["id"], "after": item})
+
+    def emit(self, kind: str, details: dict) -> None:
+        # Serialised now, as storage.event does, so later changes to the model never leak in.
+        occurred = stamp(len(self.records))
+        self.records.append(json.loads(json.dumps({
+            "schemaVersion": st.SCHEMA_VERSION, "eventId": f"{occurred.replace(':', '-')}-{kind}-{len(self.records):08x}",
+            "occurredAt": occurred, "type": kind, "planSlug": SLUG, "actor": "bench", "actorType": "agent", "details": details})))
+
+    def checkpoint(self, item: dict | None) -> dict:
+        self.plan["checkpoint"] = {**new_checkpoint(), "itemId": item["id"] if item else None, "planRevision": self.plan["revision"],
+                                   "stopReason": item.get("reason") if item else None, "createdBy": "bench",
+                                   "createdAt": stamp(len(self.records))}
+        return self.plan["checkpoint"]
+
+    def set_state(self, item: dict, status: str, reason: str | None) -> dict:
+        if status == "in-progress":
+            item["execution"] = {"startHead": "0" * 40, "startedAt": stamp(len(self.records)), "plannedSnapshots": [],
+                                 "endHead": None, "endedAt": None, "observedFiles": []}
+            item["executionAttempts"].append(copy.deepcopy(item["execution"]))
+        elif item["status"] == "in-progress":
+            item["execution"].update({"endHead": "1" * 40, "endedAt": stamp(len(self.records))})
+            item["executionAttempts"][-1] = copy.deepcopy(item["execution"])
+        item.update({"status": status, "reason": reason, "updatedAt": stamp(len(self.records))})
+        return {key: item.get(key) for key in ("status", "reason", "updatedAt", "completedBy", "execution")}
+
+    def step(self, number: int) -> None:
+        item = self.items[number % len(self.items)]
+        if item["status"] != "in-progress":
+            before = {"status": item["status"], "reason": item["reason"]}
+            state = self.set_state(item, "in-progress", None)
+            self.emit("item-updated", {"itemId": item["id"], "before": before, "after": {"status": "in-progress", "reason": None},
+                                       "state": state, "checkpoint": self.checkpoint(item)})
+        elif number % 3 == 0:
+            attempt = {"id": f"verify-{number:08x}", "kind": item["verifyKind"], "source": "script", "result": "fail",
+                       "evidence": "bench", "reason": "flaky", "actor": "bench", "headCommit": "1" * 40,
+                       "timestamp": stamp(len(self.records))}
+            item["verificationAttempts"].append(attempt)
+            state = self.set_state(item, "failed", "flaky")
+            self.emit("item-verified", {"itemId": item["id"], "attempt": attempt, "state": state, "checkpoint": self.checkpoint(item)})
+        elif number % 7 == 0:
+            issue = {"id": f"issue-{number:08x}", "itemId": item["id"], "title": "Bench", "detail": "bench", "severity": "warning",
+                     "status": "open", "nextAction": "resolve", "createdAt": stamp(len(self.records)), "resolvedAt": None,
+                     "resolution": None}
+            self.plan["issues"].append(issue)
+            self.emit("issue-opened", issue)
+            resolved = stamp(len(self.records))
+            issue.update({"status": "resolved", "resolution": "done", "resolvedAt": resolved})
+            self.emit("issue-resolved", {"issueId": issue["id"], "resolution": "done", "resolvedAt": resolved})
+        else:
+            before = {"status": item["status"], "reason": item["reason"]}
+            state = self.set_state(item, "blocked", "waiting")
+            self.emit("item-updated", {"itemId": item["id"], "before": before, "after": {"status": "blocked", "reason": "waiting"},
+                                       "state": state, "checkpoint": self.checkpoint(item)})
+
+    def extend(self, count: int) -> list[dict]:
+        start = len(self.records)
+        number = 0
+        while len(self.records) - start < count:
+            self.step(start + number)
+            number += 1
+        return self.records[start:]
+
+
+def timed(function, *args, **kwargs) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--tail", type=int, default=200, help="events appended before the snapshot replay")
+    parser.add_argument("--snapshot-every", type=int, default=replay.REPLAY_SNAPSHOT_EVENTS)
+    args = parser.parse_args()
+    replay.REPLAY_SNAPSHOT_EVENTS = args.snapshot_every
+    workdir = Path(tempfile.mkdtemp(prefix="planctl-replay-"))
+    try:
+        root = workdir / "store"
+        generate(root, plans=1, items=args.items, events=1, repo_files=args.items, untracked=0, dependencies=0)
+        log = Log(st.read_json(st.plan_path(root, SLUG)))
+        log.extend(args.events - len(log.records))
+        directory = st.events_dir(root, SLUG)
+        shutil.rmtree(directory)
+        for start in range(0, len(log.records), 5000):
+            st.write_event_records(directory, log.records[start:start + 5000])
+        expected = replay.replayed_fields(log.plan)
+        full_seconds, (full, full_counts) = timed(replay.replay_plan, root, SLUG, snapshots=False)
+        first_seconds, (first, _) = timed(replay.replay_plan, root, SLUG)
+        identical = replay.replayed_fields(full) == expected and replay.replayed_fields(first) == expected
+        st.write_event_records(directory, log.extend(args.tail))
+        tail_seconds, (tail, tail_counts) = timed(replay.replay_plan, root, SLUG)
+        identical = identical and replay.replayed_fields(tail) == replay.replayed_fields(log.plan) and tail_counts["fromSnapshot"] > 0
+        read_seconds, _ = timed(lambda: json.loads(json.dumps(log.plan)))
+    finally:
+        st._STORE_OVERRIDE = None
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"benchmark": "replay", "events": full_counts["events"], "items": len(log.items),
+                      "snapshotEvery": args.snapshot_every, "fullReplaySeconds": round(full_seconds, 4),
+                      "snapshottingReplaySeconds": round(first_seconds, 4), "tailEvents": args.tail,
+                      "tailReplay": {"seconds": round(tail_seconds, 4), **tail_counts},
+                      "planRoundTripSeconds": round(read_seconds, 4), "identical": identical}, indent=2))
+    if not identical:
+        print("replayed plan differs from the plan the events describe, or the tail replay ignored its snapshot", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
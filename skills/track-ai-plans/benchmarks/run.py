@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Time planctl commands on a generated store, in-process and as subprocesses.
+
+Results are JSON. With `--baseline`, each command/mode median is compared against the
+stored run and the exit status is 1 when any regresses by more than the threshold ratio
+and by more than `--min-delta` seconds. A baseline file may carry a `thresholds` object
+mapping command names to their own ratio. `--save-baseline` writes the current results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+from generate_store import DEFAULTS, generate, generate_legacy, parameter_parser  # noqa: E402
+
+PLANCTL = SCRIPTS / "planctl.py"
+COMMANDS = ["show", "resume", "validate", "history", "verify", "propose-amendment", "migrate-store"]
+# Mutating commands only write inside qing-plans/, which is restored from a pristine copy before each run.
+MUTATING = {"verify", "propose-amendment", "migrate-store"}
+MODES = ["inProcess", "subprocess"]
+
+
+def command_argv(command: str, plan: dict) -> list[str]:
+    items = [item for phase in plan["phases"] for item in phase["items"]]
+    running = next(item for item in items if item["status"] == "in-progress")
+    pending = next(item for item in reversed(items) if item["status"] == "not-started")
+    module = pending["changeSets"][0]["moduleId"]
+    return {
+        "show": ["show"],
+        "resume": ["resume"],
+        "validate": ["validate"],
+        "history": ["history", "--limit", "50"],
+        "verify": ["verify", "--item", running["id"], "--result", "pass", "--evidence", "benchmark",
+                   "--verified-by", "script", "--actor", "worker", "--actor-type", "agent"],
+        "propose-amendment": ["propose-amendment", "--kind", "scope", "--reason", "benchmark", "--evidence", "benchmark",
+                              "--operation", json.dumps({"op": "add-file", "itemId": pending["id"], "moduleId": module,
+                                                         "reason": "benchmark", "path": f"src/{module}/amended.py",
+                                                         "action": "create"}),
+                              "--actor", "worker", "--actor-type", "agent"],
+        "migrate-store": ["migrate-store"],
+    }[command]
+
+
+def run_in_process(root: Path, argv: list[str]) -> float:
+    from qing_plan.cli import main
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        started = time.perf_counter()
+        code = main(["--root", str(root), *argv])
+        elapsed = time.perf_counter() - started
+    if code:
+        raise RuntimeError(f"planctl {' '.join(argv)} exited {code}: {stderr.getvalue().strip()}")
+    return elapsed
+
+
+def run_subprocess(root: Path, argv: list[str]) -> float:
+    env = {**os.environ, "PLANCTL_NO_DAEMON": "1"}
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, str(PLANCTL), "--root", str(root), *argv], env=env,
+                               capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if completed.returncode:
+        raise RuntimeError(f"planctl {' '.join(argv)} exited {completed.returncode}: {completed.stderr.strip()}")
+    return elapsed
+
+
+def restore_store(root: Path, pristine: Path) -> None:
+    shutil.rmtree(root / "qing-plans", ignore_errors=True)
+    if pristine.exists():
+        shutil.copytree(pristine, root / "qing-plans", symlinks=True)
+
+
+def time_command(command: str, argv: list[str], root: Path, pristine: Path, mode: str, repeat: int) -> dict:
+    runner = run_in_process if mode == "inProcess" else run_subprocess
+    if command not in MUTATING:
+        runner(root, argv)  # Warm imports and the git-ignored caches, as a repeated command would see them.
+    runs = []
+    for _ in range(repeat):
+        if command in MUTATING:
+            restore_store(root, pristine)
+        runs.append(runner(root, argv))
+    if command in MUTATING:
+        restore_store(root, pristine)
+    return {"median": round(statistics.median(runs), 6), "min": round(min(runs), 6), "max": round(max(runs), 6),
+            "runs": [round(value, 6) for value in runs]}
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list[dict]:
+    rows = []
+    thresholds = baseline.get("thresholds", {})
+    for command, modes in results.items():
+        for mode, timing in modes.items():
+            previous = baseline.get("results", {}).get(command, {}).get(mode)
+            if not previous:
+                rows.append({"command": command, "mode": mode, "status": "new", "current": timing["median"]})
+                continue
+            limit = thresholds.get(command, threshold)
+            ratio = timing["median"] / previous["median"] if previous["median"] else float("inf")
+            delta = timing["median"] - previous["median"]
+            status = "regressed" if ratio > 1 + limit and delta > min_delta else \
+                "improved" if ratio < 1 - limit and -delta > min_delta else "ok"
+            rows.append({"command": command, "mode": mode, "status": status, "baseline": previous["median"],
+                         "current": timing["median"], "ratio": round(ratio, 3), "threshold": limit})
+    return rows
+
+
+def main() -> int:
+    parser = parameter_parser(argparse.ArgumentParser(description=__doc__))
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="comma-separated subset of " + ",".join(COMMANDS))
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of " + ",".join(MODES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workdir", type=Path, help="where stores are generated; a temporary directory by default")
+    parser.add_argument("--keep", action="store_true", help="keep the generated stores")
+    parser.add_argument("--output", type=Path, help="write results here as well as to stdout")
+    parser.add_argument("--baseline", type=Path, help="compare against a stored results file")
+    parser.add_argument("--save-baseline", type=Path, help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio over the baseline median")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="ignore differences below this many seconds")
+    args = parser.parse_args()
+    commands = [command for command in args.commands.split(",") if command]
+    modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = sorted(set(commands) - set(COMMANDS)) + sorted(set(modes) - set(MODES))
+    if unknown:
+        parser.error(f"unknown commands or modes: {', '.join(unknown)}")
+    params = {name: getattr(args, name) for name in DEFAULTS}
+    workdir = (args.workdir or Path(tempfile.mkdtemp(prefix="planctl-bench-"))).resolve()
+    try:
+        store = workdir / "store"
+        legacy = workdir / "legacy"
+        started = time.perf_counter()
+        generate(store, **params)
+        if "migrate-store" in commands:
+            generate_legacy(legacy, **params)
+        setup_seconds = time.perf_counter() - started
+        shutil.copytree(store / "qing-plans", workdir / "pristine", symlinks=True)
+        current = json.loads((store / "qing-plans" / "index.json").read_text(encoding="utf-8"))["currentPlanSlug"]
+        plan = json.loads((store / "qing-plans" / current / "plan.json").read_text(encoding="utf-8"))
+        results = {}
+        for command in commands:
+            argv = command_argv(command, plan)
+            source = legacy if command == "migrate-store" else store
+            pristine = workdir / ("pristine-legacy" if command == "migrate-store" else "pristine")
+            results[command] = {mode: time_command(command, argv, source, pristine, mode, args.repeat) for mode in modes}
+        report = {
+            "benchmark": "planctl", "python": platform.python_version(), "platform": platform.platform(),
+            "params": params, "repeat": args.repeat, "setupSeconds": round(setup_seconds, 3), "results": results,
+        }
+        regressed = False
+        if args.baseline:
+            report["comparison"] = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold, args.min_delta)
+            regressed = any(row["status"] == "regressed" for row in report["comparison"])
+        text = json.dumps(report, indent=2) + "\n"
+        sys.stdout.write(text)
+        if args.output:
+            args.output.write_text(text, encoding="utf-8")
+        if args.save_baseline:
+            args.save_baseline.write_text(json.dumps({key: report[key] for key in ("python", "platform", "params", "repeat", "results")},
+                                                     indent=2) + "\n", encoding="utf-8")
+        return 1 if regressed else 0
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Count torn reads while a writer mutates the store: pinned generations versus plain files.
+
+`save_plan` stamps the plan and its index entry with one `updatedAt`, so a reader that sees
+the two disagree has read documents from two different mutations. Exits 1 if a pinned
+reader ever does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.dont_write_bytecode = True
+SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+from generate_store import generate  # noqa: E402
+from qing_plan import storage as st  # noqa: E402
+
+
+def read_pair(root: Path, pinned: bool) -> bool | None:
+    """True when the index entry and the plan agree, None when the read itself failed."""
+    st._GENERATION = None
+    if pinned:
+        st.pin_generation(root)
+    try:
+        index = st.read_json(st.index_path(root))
+        slug = index["currentPlanSlug"]
+        plan = st.read_json(st.plan_path(root, slug))
+    except st.PlanError:
+        return None
+    entry = next(entry for entry in index["plans"] if entry["slug"] == slug)
+    return entry["updatedAt"] == plan["updatedAt"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=30)
+    parser.add_argument("--items", type=int, default=60)
+    args = parser.parse_args()
+    workdir = Path(tempfile.mkdtemp(prefix="planctl-snapshot-"))
+    try:
+        root = workdir / "store"
+        generate(root, plans=1, items=args.items, events=args.items, repo_files=args.items, untracked=0)
+        st.select_store(root, "show")
+        env = {**os.environ, "PLANCTL_NO_DAEMON": "1"}
+        script = "; ".join(f"{sys.executable} {SCRIPTS / 'planctl.py'} --root {root} add-issue --title t{number} --detail d "
+                           f"--severity warning --next-action n --actor bench >/dev/null" for number in range(args.writes))
+        writer = subprocess.Popen(["sh", "-c", script], env=env)
+        reads = {"pinned": {"reads": 0, "torn": 0, "failed": 0}, "unpinned": {"reads": 0, "torn": 0, "failed": 0}}
+        started = time.perf_counter()
+        while writer.poll() is None:
+            for mode in reads:
+                agreed = read_pair(root, mode == "pinned")
+                counts = reads[mode]
+                counts["reads"] += 1
+                counts["failed" if agreed is None else "torn"] += agreed is not True
+        seconds = time.perf_counter() - started
+    finally:
+        st._GENERATION = None
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps({"benchmark": "snapshot_reads", "writes": args.writes, "seconds": round(seconds, 3), "reads": reads}, indent=2))
+    return 1 if reads["pinned"]["torn"] or reads["pinned"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,27 @@
+"""Deterministic synthetic plans shared by the benchmarks."""
+
+from __future__ import annotations
+
+import random
+
+
+def synthetic_plan(items: int, phases: int, seed: int = 11) -> dict:
+    """Items depend on up to three earlier items, mostly nearby, sometimes in earlier phases."""
+    rng = random.Random(seed)
+    per_phase = max(1, items // phases)
+    plan = {"phases": []}
+    ids: list[str] = []
+    statuses = ["done", "done", "in-progress", "not-started", "not-started", "not-started"]
+    for number in range(items):
+        if number % per_phase == 0 and len(plan["phases"]) < phases:
+            plan["phases"].append({"id": f"p{len(plan['phases']) + 1}", "title": f"Phase {len(plan['phases']) + 1}", "items": []})
+        depends = sorted({ids[rng.randrange(max(0, number - 50), number)] if rng.random() < 0.8 else rng.choice(ids)
+                          for _ in range(rng.randrange(4))}) if ids else []
+        item_id = f"item-{number}"
+        plan["phases"][-1]["items"].append({
+            "id": item_id, "title": f"Item {number}", "status": "not-started" if number > items // 2 else rng.choice(statuses),
+            "dependsOn": depends,
+            "changeSets": [{"moduleId": f"mod-{number % 30}", "files": [{"path": f"src/m{number % 30}/f{number}.py", "action": "modify"}]}],
+        })
+        ids.append(item_id)
+    return plan
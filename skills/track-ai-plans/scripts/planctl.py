@@ -5,8 +5,12 @@ import sys
 
 sys.dont_write_bytecode = True
 
-from qing_plan.cli import main
+from qing_plan.client import forward
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    code = forward(sys.argv[1:])
+    if code is None:
+        from qing_plan.cli import main
+        code = main()
+    raise SystemExit(code)
@@ -99,11 +99,18 @@ def apply_amendment(root: Path, plan: dict, project_map: dict, amendment: dict,
     map_changed = False
     for operation in amendment["operations"]:
         map_changed = apply_operation(plan, project_map, plan["slug"], operation) or map_changed
-    running = next((item for item in all_items(plan) if item["status"] == "in-progress"), None)
-    if running and running.get("execution"):
+    plan_index = PlanIndex(plan)
+    running_items = plan_index.by_status.get("in-progress", [])
+    for running in running_items:
+        overlaps = plan_index.overlaps(running, running_items)
+        if overlaps:
+            other, paths = next(iter(overlaps.items()))
+            die(f"amendment would make running items {running['id']} and {other} share declared paths: {', '.join(paths)}")
+        if not running.get("execution"):
+            continue
         snapshots = running["execution"].setdefault("plannedSnapshots", [])
         captured = {snapshot["path"] for snapshot in snapshots}
-        for file in flatten_changes(running):
+        for file in plan_index.files(running):
             for path in [file["path"], file.get("from")]:
                 if path and path not in captured:
                     snapshots.append(path_snapshot(root, path))
@@ -117,6 +124,16 @@ def apply_amendment(root: Path, plan: dict, project_map: dict, amendment: dict,
                       "after": {"planRevision": plan["revision"], "projectMapRevision": project_map["revision"]}})
 
 
+def amended_items(plan: dict, amendment: dict) -> list[dict]:
+    """Items an applied amendment added or edited, and the running items it snapshotted, whole for replay."""
+    _, touched, _, _ = amendment_touches(amendment["operations"])
+    return [item for item in PlanIndex(plan).order if item["id"] in touched or item["status"] == "in-progress"]
+
+
+def applied_details(plan: dict, amendment: dict) -> dict:
+    return {"items": amended_items(plan, amendment)} if amendment["status"] == "applied" else {}
+
+
 def cmd_propose_amendment(args: argparse.Namespace, root: Path) -> dict:
     index, entry, plan = selected_plan(args, root)
     require_state(entry, {"active"}, "propose-amendment")
@@ -125,12 +142,12 @@ def cmd_propose_amendment(args: argparse.Namespace, root: Path) -> dict:
     if args.kind == "temporary" and not args.cleanup_item:
         die("temporary amendment requires --cleanup-item")
     adds_cleanup = any(op.get("op") == "add-item" and op.get("id") == args.cleanup_item for op in operations)
-    if args.cleanup_item and args.cleanup_item not in item_map(plan) and not adds_cleanup:
+    if args.cleanup_item and args.cleanup_item not in PlanIndex(plan).items and not adds_cleanup:
         die("cleanup item must already exist or be added by this amendment")
-    preview_plan, preview_map = copy.deepcopy(plan), copy.deepcopy(load_project_map(root))
+    preview_plan, preview_map = copy_on_write(plan, load_project_map(root), operations)
     for operation in operations:
         apply_operation(preview_plan, preview_map, plan["slug"], operation)
-    preview_errors = validate_project_map(preview_map) + validate_plan(entry, preview_plan, preview_map)
+    preview_errors = validate_amendment(entry, preview_plan, preview_map, operations)
     if preview_errors:
         die("invalid amendment: " + "; ".join(preview_errors))
     amendment = {
@@ -143,10 +160,10 @@ def cmd_propose_amendment(args: argparse.Namespace, root: Path) -> dict:
     project_map = load_project_map(root)
     if plan["reviewPolicy"] == "none":
         apply_amendment(root, plan, project_map, amendment, args.actor)
-        errors = validate_project_map(project_map) + validate_plan(entry, plan, project_map)
+        errors = validate_amendment(entry, plan, project_map, amendment["operations"])
         if errors:
             die("applied amendment is invalid: " + "; ".join(errors))
-    event(root, entry["slug"], "amendment-proposed", args.actor, args.actor_type, {"amendment": amendment})
+    event(root, entry["slug"], "amendment-proposed", args.actor, args.actor_type, {"amendment": amendment, **applied_details(plan, amendment)})
     return save_plan(root, index, entry, plan, project_map)
 
 
@@ -172,10 +189,11 @@ def cmd_review_amendment(args: argparse.Namespace, root: Path) -> dict:
     plan["reviews"].append(review)
     if args.result == "pass":
         apply_amendment(root, plan, project_map, amendment, args.actor)
-        errors = validate_project_map(project_map) + validate_plan(entry, plan, project_map)
+        errors = validate_amendment(entry, plan, project_map, amendment["operations"])
         if errors:
             die("applied amendment is invalid: " + "; ".join(errors))
     else:
         amendment["status"] = "rejected"
-    event(root, entry["slug"], "amendment-reviewed", args.actor, args.actor_type, {"review": review, "status": amendment["status"]})
+    event(root, entry["slug"], "amendment-reviewed", args.actor, args.actor_type,
+          {"review": review, "status": amendment["status"], "amendment": amendment, **applied_details(plan, amendment)})
     return save_plan(root, index, entry, plan, project_map)
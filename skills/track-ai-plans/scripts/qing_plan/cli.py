@@ -3,8 +3,12 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
+import os
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 from . import storage as st
@@ -16,6 +20,10 @@ from .commands import *
 from .execution import *
 from .amendments import *
 from .migration import *
+from .daemon import cmd_daemon
+from .fleet import cmd_fleet
+from .replay import cmd_recover_plan
+from .profiling import profiling
 
 
 def add_plan_option(parser: argparse.ArgumentParser) -> None:
@@ -34,9 +42,93 @@ def add_review_args(parser: argparse.ArgumentParser) -> None:
     add_actor_option(parser, required=True)
 
 
+def batch_argv(payload) -> list[str]:
+    """Turn one JSONL payload into the argv a single planctl invocation would receive.
+
+    A payload is either the argv list itself or an object naming `command` plus its
+    options, e.g. {"command": "add-item", "phase": "p1", "file": ["a.py:create"]}.
+    """
+    if isinstance(payload, list) and payload and all(isinstance(value, str) for value in payload):
+        return payload
+    if not isinstance(payload, dict) or not isinstance(payload.get("command"), str):
+        die("each batch line must be an argv array or an object with a command")
+    argv = [payload["command"]]
+    for key, value in payload.items():
+        if key == "command" or value is None or value is False:
+            continue
+        option = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(option)
+            continue
+        for part in value if isinstance(value, list) else [value]:
+            argv.extend([option, str(part)])
+    return argv
+
+
+def read_batch(path: str):
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for number, line in enumerate(handle, 1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    die(f"batch line {number}: invalid JSON: {exc}")
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def cmd_batch(args: argparse.Namespace, root: Path) -> dict:
+    # main() already holds the store lock exclusively for the whole stream. Every step dispatches
+    # through the same handler a standalone invocation would use, but reads and writes go
+    # through one in-memory transaction and status renders once per touched plan at the end.
+    parser = build_parser()
+    steps = []
+    with transaction(defer_status=True) as pending:
+        for number, payload in read_batch(args.file):
+            argv = batch_argv(payload)
+            if argv[0] not in MUTATING_COMMANDS or argv[0] in BATCH_EXCLUDED_COMMANDS:
+                die(f"batch line {number}: {argv[0]} cannot run inside a batch")
+            try:
+                step = parser.parse_args(argv)
+            except SystemExit:
+                die(f"batch line {number}: invalid arguments for {argv[0]}")
+            try:
+                check_revisions(step, root)
+                step.handler(step, root)
+            except PlanConflict as exc:
+                raise PlanConflict({"line": number, **exc.conflict}) from None
+            except PlanError as exc:
+                die(f"batch line {number} ({argv[0]}): {exc}; no batch changes were written")
+            steps.append({"line": number, "command": argv[0]})
+    statuses = []
+    for slug in pending["renders"]:
+        index = load_index(root)
+        entry = find_entry(index, slug)
+        status = render_status(root, entry, read_json(plan_path(root, slug)), load_project_map(root))
+        if status.get("statusDeferred"):
+            statuses.append({"slug": slug, "state": entry["state"], "revision": status["plan"]["revision"], "statusQueued": True})
+            continue
+        statuses.append({"slug": slug, "state": entry["state"], "revision": status["plan"]["revision"],
+                         "summary": status["summary"], "nextAction": status["nextActions"][0]})
+    return {"batch": True, "applied": len(steps), "steps": steps, "statuses": statuses}
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--root", default=".", help="Git repository root")
+    parser.add_argument("--no-hash-cache", action="store_true", help="re-read and hash every file instead of trusting the stat-keyed cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="time git, JSON, hashing, validation and projections; summary on stderr, trace file beside the caches")
+    parser.add_argument("--profile-output", type=Path, help="write the Chrome trace-event JSON here instead")
+    parser.add_argument("--profile-memory", action="store_true", help="with --profile, also report the tracemalloc peak")
+    parser.add_argument("--lock-timeout", type=float, metavar="SECONDS",
+                        help="give up on a mutation after waiting this long for any one store lock (default: wait)")
+    parser.add_argument("--format", choices=("json", "compact", "ndjson"), default="json",
+                        help="indented JSON; one-line JSON; or NDJSON, which streams history events and per-item rows")
+    parser.add_argument("--defer-status", action="store_true",
+                        help="persist the mutation and leave status.json to a background worker; see refresh-status --wait")
     sub = parser.add_subparsers(dest="command", required=True)
 
     create = sub.add_parser("create")
@@ -49,6 +141,7 @@ def build_parser() -> argparse.ArgumentParser:
     create.add_argument("--doc-coverage", choices=sorted(DOC_COVERAGE), default="all")
     create.add_argument("--doc-reason")
     create.add_argument("--doc-target", action="append")
+    create.add_argument("--execution-lanes", type=int, help="items that may be in progress at once when their declared paths are disjoint")
     add_actor_option(create, required=True)
     create.set_defaults(handler=cmd_create)
 
@@ -151,6 +244,12 @@ def build_parser() -> argparse.ArgumentParser:
     add_actor_option(checkpoint)
     checkpoint.set_defaults(handler=cmd_checkpoint)
 
+    lanes = sub.add_parser("set-execution-lanes")
+    add_plan_option(lanes)
+    lanes.add_argument("--lanes", type=int, required=True)
+    add_actor_option(lanes)
+    lanes.set_defaults(handler=cmd_set_execution_lanes)
+
     issue = sub.add_parser("add-issue")
     add_plan_option(issue)
     issue.add_argument("--item")
@@ -182,23 +281,36 @@ def build_parser() -> argparse.ArgumentParser:
     switch.set_defaults(handler=cmd_switch)
 
     validate = sub.add_parser("validate")
+    validate.add_argument("--replay", action="store_true", help="also rebuild every plan from its event log and compare it with plan.json")
     validate.set_defaults(handler=cmd_validate)
     show = sub.add_parser("show")
     add_plan_option(show)
     show.set_defaults(handler=cmd_show)
     changes = sub.add_parser("changes")
     add_plan_option(changes)
+    changes.add_argument("--full-scan", action="store_true",
+                         help="look for untracked files across the whole work tree even where qing-plans.scanScope is planned")
     changes.set_defaults(handler=cmd_changes)
     history = sub.add_parser("history")
     add_plan_option(history)
     history.add_argument("--limit", type=int)
+    history.add_argument("--type", action="append")
+    history.add_argument("--item")
+    history.add_argument("--since")
+    history.add_argument("--until")
+    history.add_argument("--cursor")
     history.set_defaults(handler=cmd_history)
     resume = sub.add_parser("resume")
     add_plan_option(resume)
     resume.set_defaults(handler=cmd_resume)
     refresh = sub.add_parser("refresh-status")
     add_plan_option(refresh)
+    refresh.add_argument("--full", action="store_true", help="recompute every section instead of reusing unchanged ones")
+    refresh.add_argument("--wait", action="store_true", help="render nothing; wait until no deferred render is queued")
+    refresh.add_argument("--timeout", type=float, default=60, help="with --wait, seconds before giving up")
     refresh.set_defaults(handler=cmd_refresh_status)
+    worker = sub.add_parser("status-worker", help="render the status.json files that --defer-status queued, then exit")
+    worker.set_defaults(handler=cmd_status_worker)
     install = sub.add_parser("install-dashboard")
     install.set_defaults(handler=cmd_install_dashboard)
     serve = sub.add_parser("serve")
@@ -206,29 +318,124 @@ def build_parser() -> argparse.ArgumentParser:
     serve.add_argument("--port", type=int, default=DEFAULT_SERVE_PORT)
     serve.add_argument("--no-open", action="store_true", help="do not open a browser automatically")
     serve.set_defaults(handler=cmd_serve)
+
+    daemon = sub.add_parser("daemon", help="serve planctl commands for this repository from one warm process")
+    daemon.add_argument("--idle-timeout", type=float, default=0, help="exit after this many idle seconds; 0 never")
+    daemon.add_argument("--stop", action="store_true", help="stop the daemon serving this repository")
+    daemon.set_defaults(handler=cmd_daemon)
+    fleet = sub.add_parser("fleet", help="resume many repositories in parallel, streaming one NDJSON record per repository")
+    fleet.add_argument("--roots-file", required=True, help="one repository root per line; - reads stdin")
+    fleet.add_argument("--jobs", type=int, help="worker processes; defaults to the CPU count")
+    fleet.add_argument("--timeout", type=float, default=60, help="seconds before a repository's worker is killed")
+    fleet.add_argument("--index", type=Path, help="aggregate index path; defaults to ROOTS.fleet.json beside the roots file")
+    fleet.set_defaults(handler=cmd_fleet)
     migrate = sub.add_parser("migrate-store")
     migrate.add_argument("--dry-run", action="store_true")
     migrate.set_defaults(handler=cmd_migrate_store)
+    compact = sub.add_parser("compact-events", help="move per-file events into the segmented event log")
+    add_plan_option(compact)
+    compact.set_defaults(handler=cmd_compact_events)
+    recover = sub.add_parser("recover-plan", help="rebuild a plan's plan.json from its event log")
+    add_plan_option(recover)
+    recover.add_argument("--dry-run", action="store_true", help="report the differences without writing plan.json")
+    recover.set_defaults(handler=cmd_recover_plan)
+    batch = sub.add_parser("batch", help="apply a JSONL stream of mutating commands under one lock and one save")
+    batch.add_argument("--file", default="-", help="JSONL payload file; defaults to stdin")
+    batch.set_defaults(handler=cmd_batch)
+    for name, command in sub.choices.items():
+        if name in MUTATING_COMMANDS:
+            command.add_argument("--expect-revision", action="append", metavar="[plan=|map=|index=]N",
+                                 help="apply only if this revision still holds; otherwise exit 3 with the conflict")
     return parser
 
 
-def main() -> int:
-    parser = build_parser()
-    args = parser.parse_args()
-    root = Path(args.root).expanduser().resolve()
-    try:
+def profile_path(args: argparse.Namespace, root: Path) -> Path:
+    if args.profile_output:
+        return args.profile_output.expanduser().resolve()
+    # Beside the other git-ignored caches; a repository without a V2 store keeps its tree untouched.
+    directory = root / "qing-plans" / CACHE_DIR / "profiles" if (root / "qing-plans").is_dir() else Path(tempfile.gettempdir())
+    return directory / f"planctl-{args.command}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}.json"
+
+
+def execute(args: argparse.Namespace, root: Path) -> dict | None:
+    """Run one parsed command: select the store, take the locks it needs, and return its result."""
+    reset_git_observers()
+    # Only traces in the store's cache are pruned; --profile-output and the temp directory are the caller's.
+    kept = PROFILE_TRACES_KEPT if not args.profile_output and (root / "qing-plans").is_dir() else None
+    with profiling(args.command, trace_path=profile_path(args, root), memory=args.profile_memory, keep=kept) \
+            if args.profile else contextlib.nullcontext():
         reject_root_inside_store(root)
         select_store(root, args.command)
         if st._USING_LEGACY and args.command not in READ_ONLY_COMMANDS | {"migrate-store"}:
             die("legacy plans/ is read-only; migrate it before mutation")
-        needs_lock = args.command in MUTATING_COMMANDS and not (args.command == "migrate-store" and args.dry_run)
-        if needs_lock:
-            with repository_lock(root):
-                result = args.handler(args, root)
-        else:
-            result = args.handler(args, root)
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        needs_lock = args.command in MUTATING_COMMANDS and not (args.command == "migrate-store" and args.dry_run) \
+            and not (args.command == "refresh-status" and args.wait)
+        st._DEFER_STATUS = args.defer_status and args.command in MUTATING_COMMANDS - {"refresh-status", "migrate-store"}
+        configure_hash_cache(None if args.no_hash_cache or st._USING_LEGACY else store_dir(root) / CACHE_DIR / "hashes.json")
+        st._GENERATION = None
+        if args.lock_timeout is not None and args.lock_timeout < 0:
+            die("--lock-timeout must not be negative")
+        st._LOCK_TIMEOUT = args.lock_timeout
+        if args.command in READ_ONLY_COMMANDS:
+            pin_generation(root)
+        try:
+            if needs_lock:
+                # Revisions only grow, so one that has already moved fails without queueing
+                # for the locks; the comparison that counts is the one made holding them.
+                check_revisions(args, root)
+                with command_locks(args, root), store_generation(root):
+                    check_revisions(args, root)
+                    if not st._USING_LEGACY and index_path(root).exists():
+                        # Stores installed before the event index and caches existed lack their rules.
+                        ensure_store_gitignore(store_dir(root))
+                    return args.handler(args, root)
+            return args.handler(args, root)
+        finally:
+            flush_hash_cache()
+
+
+def apply_if_current(root: Path | str, argv: list[str], expect: dict[str, int]) -> dict:
+    """Compare-and-swap for callers that import planctl: run one mutating command only if
+    the `plan`, `map`, and `index` revisions named in `expect` still hold, e.g.
+    `apply_if_current(root, ["update-item", "--item", "i1", "--status", "in-progress"], {"index": 41})`.
+
+    Returns {"applied": True, "result": ...} or {"applied": False, "conflict": ...}; any
+    other failure raises PlanError.
+    """
+    if not argv or argv[0] not in MUTATING_COMMANDS:
+        die("apply_if_current runs mutating commands only")
+    try:
+        args = build_parser().parse_args(["--root", str(root), *argv, *(f"--expect-revision={name}={number}" for name, number in expect.items())])
+    except SystemExit:
+        die(f"invalid arguments for {argv[0]}")
+    try:
+        return {"applied": True, "result": execute(args, Path(args.root).expanduser().resolve())}
+    except PlanConflict as exc:
+        return {"applied": False, "conflict": exc.conflict}
+
+
+def write_result(result: dict, output_format: str) -> None:
+    if output_format == "json":
+        # Encoded and written chunk by chunk; indented output never takes the C encoder anyway.
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(json.dumps(result, ensure_ascii=False, separators=(",", ":") if output_format == "compact" else None))
+
+
+def main(argv: list[str] | None = None, *, parser: argparse.ArgumentParser | None = None) -> int:
+    parser = parser or build_parser()
+    args = parser.parse_args(argv)
+    try:
+        result = execute(args, Path(args.root).expanduser().resolve())
+        # A streaming command has already printed its records.
+        if result is not None:
+            write_result(result, args.format)
         return 0
+    except PlanConflict as exc:
+        write_result({"conflict": exc.conflict}, args.format)
+        print(f"planctl: {exc}", file=sys.stderr)
+        return 3
     except PlanError as exc:
         print(f"planctl: {exc}", file=sys.stderr)
         return 2
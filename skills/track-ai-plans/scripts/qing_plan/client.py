@@ -0,0 +1,95 @@
+"""Thin client for a resident `planctl daemon`.
+
+Imported by planctl.py before the runtime itself, so it must stay standard-library only
+and cheap: when no daemon answers, the caller falls back to running in-process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+LOCAL_COMMANDS = {"daemon", "serve", "fleet", "status-worker"}
+
+
+def socket_path(root: Path) -> Path:
+    # Sockets live outside the repository: they are per-machine, and AF_UNIX paths
+    # are limited to ~100 bytes, which a deep checkout would exceed.
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    key = hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:16]
+    return Path(runtime) / f"planctl-{os.getuid()}-{key}.sock"
+
+
+def code_fingerprint() -> list:
+    """Identify the runtime on disk, so a daemon started before a skill upgrade steps aside."""
+    return sorted([path.name, path.stat().st_mtime_ns] for path in Path(__file__).parent.glob("*.py"))
+
+
+def split_argv(argv: list[str]) -> tuple[str, str | None]:
+    root, position = ".", 0
+    while position < len(argv):
+        value = argv[position]
+        if value == "--root" and position + 1 < len(argv):
+            root, position = argv[position + 1], position + 2
+        elif value.startswith("--root="):
+            root, position = value.split("=", 1)[1], position + 1
+        elif value.startswith("-"):
+            return root, None
+        else:
+            return root, value
+    return root, None
+
+
+def reads_stdin(command: str, argv: list[str]) -> bool:
+    if command != "batch":
+        return False
+    source = "-"
+    for position, value in enumerate(argv):
+        if value == "--file" and position + 1 < len(argv):
+            source = argv[position + 1]
+        elif value.startswith("--file="):
+            source = value.split("=", 1)[1]
+    return source == "-"
+
+
+def request(path: Path, payload: dict) -> dict | None:
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(str(path))
+        except OSError:
+            return None
+        # Past this point the daemon may already have applied a mutation, so a lost
+        # connection is an error for the caller, never a silent in-process retry.
+        try:
+            connection.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            connection.shutdown(socket.SHUT_WR)
+            chunks = []
+            while chunk := connection.recv(65536):
+                chunks.append(chunk)
+            return json.loads(b"".join(chunks))
+        except (OSError, ValueError) as exc:
+            return {"exit": 2, "stdout": "", "stderr": f"planctl: lost the daemon connection ({exc}); "
+                                                         "check the plan before retrying\n"}
+
+
+def forward(argv: list[str]) -> int | None:
+    """Run `argv` on a daemon for its repository; None means run it in this process."""
+    # Lock timings describe this process's own waits, so they need it to run the command.
+    if os.environ.get("PLANCTL_NO_DAEMON") or os.environ.get("PLANCTL_LOCK_TIMING"):
+        return None
+    root, command = split_argv(argv)
+    if command is None or command in LOCAL_COMMANDS or reads_stdin(command, argv):
+        return None
+    response = request(socket_path(Path(root).expanduser().resolve()), {
+        "argv": argv, "cwd": os.getcwd(), "user": os.environ.get("USER"), "code": code_fingerprint()})
+    if response is None or response.get("stale"):
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit"]
@@ -8,7 +8,7 @@ from .git import *
 from .domain import *
 from .projection import *
 
-STORE_GITIGNORE = ".planctl.lock\n"
+STORE_GITIGNORE = ".planctl.lock\n.cache/\n*/events/index.ndjson\n*/events/index-meta.json\n"
 
 
 def bundled_dashboard() -> Path:
@@ -31,16 +31,45 @@ def install_store_assets(target_root: Path, *, overwrite: bool) -> list[str]:
     installed = []
     dashboard = target_root / "dashboard.html"
     if overwrite or not dashboard.exists():
+        written_paths().add(dashboard)
         shutil.copyfile(bundled_dashboard(), dashboard)
         dashboard.chmod(0o644)
     installed.append(str(dashboard))
     gitignore = target_root / ".gitignore"
-    if overwrite or not gitignore.exists():
+    if overwrite:
+        written_paths().add(gitignore)
         gitignore.write_text(STORE_GITIGNORE, encoding="utf-8")
+    else:
+        ensure_store_gitignore(target_root)
     installed.append(str(gitignore))
     return installed
 
 
+def ensure_store_gitignore(target_root: Path) -> None:
+    """Add the rules a store installed by an older planctl lacks, keeping every line it has.
+
+    `.gitignore` is only ever written whole, through a rename, so two mutations sharing the
+    store lock that both merge it leave the same file rather than duplicated lines.
+    """
+    gitignore = target_root / ".gitignore"
+    text = gitignore.read_text(encoding="utf-8") if gitignore.exists() else ""
+    present = {line.strip() for line in text.splitlines()}
+    missing = [line for line in STORE_GITIGNORE.splitlines() if line not in present]
+    if not missing:
+        return
+    if text and not text.endswith("\n"):
+        text += "\n"
+    written_paths().add(gitignore)
+    fd, temp_name = tempfile.mkstemp(prefix=".gitignore.", dir=target_root)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text + "".join(line + "\n" for line in missing))
+        os.replace(temp_name, gitignore)
+    finally:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+
+
 def install_assets(root: Path, *, overwrite: bool) -> list[str]:
     return install_store_assets(store_dir(root), overwrite=overwrite)
 
@@ -65,7 +94,15 @@ def cmd_serve(args: argparse.Namespace, root: Path) -> dict:
     if not dashboard.exists():
         die(f"no {dashboard_name} at {directory}; run install-dashboard (or create) first")
 
-    handler_cls = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(directory))
+    class GenerationHandler(http.server.SimpleHTTPRequestHandler):
+        # Each request resolves the newest published generation, so the dashboard never
+        # receives a document from the middle of a mutation.
+        def translate_path(self, path: str) -> str:
+            translated = Path(super().translate_path(path))
+            generation = None if st._USING_LEGACY else resolve_generation(root)
+            return str(generation.get(translated, translated) if generation else translated)
+
+    handler_cls = functools.partial(GenerationHandler, directory=str(directory))
     port = args.port
     try:
         httpd = http.server.ThreadingHTTPServer((args.host, port), handler_cls)
@@ -122,7 +159,9 @@ def cmd_create(args: argparse.Namespace, root: Path) -> dict:
         die("required documentation impact needs --doc-target")
     if args.doc_mode == "none" and not args.doc_reason:
         die("doc-mode=none needs --doc-reason")
-    if not map_path(root).exists():
+    if args.execution_lanes is not None and args.execution_lanes < 1:
+        die("--execution-lanes must be at least 1")
+    if not document_exists(map_path(root)):
         atomic_json(map_path(root), empty_project_map())
     project_map = load_project_map(root)
     timestamp = now()
@@ -137,6 +176,8 @@ def cmd_create(args: argparse.Namespace, root: Path) -> dict:
         "documentationImpact": doc_impact, "phases": [], "reviews": [], "amendments": [],
         "checkpoint": new_checkpoint(), "issues": [],
     }
+    if args.execution_lanes is not None:
+        plan["executionLanes"] = args.execution_lanes
     entry = {
         "slug": args.slug, "name": args.name, "state": "draft", "path": f"{args.slug}/plan.json",
         "createdAt": timestamp, "updatedAt": timestamp, "activatedAt": None,
@@ -145,9 +186,9 @@ def cmd_create(args: argparse.Namespace, root: Path) -> dict:
     index["plans"].append(entry)
     atomic_json(plan_path(root, args.slug), plan)
     event(root, args.slug, "plan-created", args.actor, args.actor_type,
-          {"goal": args.goal, "reviewPolicy": args.review_policy})
+          {"goal": args.goal, "reviewPolicy": args.review_policy, "executionLanes": execution_lanes(plan), "plan": plan})
     save_index(root, index)
-    install_assets(root, overwrite=False)
+    after_commit(lambda: install_assets(root, overwrite=False))
     return render_status(root, entry, plan, project_map)
 
 
@@ -285,7 +326,7 @@ def cmd_upsert_dependency(args: argparse.Namespace, root: Path) -> dict:
         die("the current plan owns project-map changes; amend it or wait until it is terminal")
     project_map = load_project_map(root)
     before = next((d.copy() for d in project_map["dependencies"] if d["moduleId"] == args.module and d["dependsOn"] == args.depends_on), None)
-    preview_map = copy.deepcopy(project_map)
+    _, preview_map = copy_on_write(plan, project_map, [{"op": "upsert-dependency", "moduleId": args.module, "dependsOn": args.depends_on}])
     upsert_dependency(preview_map, entry["slug"], args.module, args.depends_on, args.reason, args.evidence)
     cycle_node = module_dependency_cycle(preview_map)
     if cycle_node:
@@ -0,0 +1,111 @@
+"""Resident `planctl daemon`: one warm process serving a repository's commands over a Unix socket."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import socket
+import traceback
+
+from . import storage as st
+from .storage import *
+from .client import code_fingerprint, request, socket_path, split_argv
+
+
+def serve_request(payload: dict, main, parsers: dict, cache: dict) -> dict:
+    """Run one forwarded argv exactly as `planctl` would, capturing what it prints."""
+    os.chdir(payload["cwd"])
+    if payload.get("user"):
+        os.environ["USER"] = payload["user"]
+    # The parser bakes the default --actor from $USER, so keep one per caller identity.
+    parser = parsers.get(os.environ.get("USER"))
+    if parser is None:
+        from .cli import build_parser
+        parser = parsers[os.environ.get("USER")] = build_parser()
+    # Parsed documents are shared across requests only for read-only commands;
+    # a mutation always reads the files it is about to replace.
+    st._DOCUMENT_CACHE = cache if split_argv(payload["argv"])[1] in READ_ONLY_COMMANDS else None
+    stdout, stderr = io.StringIO(), io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                code = main(payload["argv"], parser=parser)
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+                if isinstance(exc.code, str):
+                    print(exc.code, file=sys.stderr)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+    finally:
+        st._DOCUMENT_CACHE = None
+    return {"exit": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def reply(connection: socket.socket, response: dict) -> None:
+    with contextlib.suppress(OSError):
+        connection.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
+
+def cmd_daemon(args: argparse.Namespace, root: Path) -> dict:
+    from .cli import main
+
+    path = socket_path(root)
+    if args.stop:
+        response = request(path, {"shutdown": True})
+        if response is None:
+            die(f"no planctl daemon is serving {root}")
+        return response
+    if not hasattr(socket, "AF_UNIX"):
+        die("planctl daemon requires Unix domain sockets")
+    if request(path, {"ping": True}) is not None:
+        die(f"a planctl daemon is already serving {root} at {path}")
+    with contextlib.suppress(FileNotFoundError):
+        path.unlink()
+    fingerprint, parsers, cache = code_fingerprint(), {}, {}
+    served, stopped_by = 0, "request"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o077)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(previous_umask)
+    server.listen(16)
+    server.settimeout(args.idle_timeout or None)
+    print(f"planctl: daemon serving {root} at {path}", file=sys.stderr)
+    try:
+        while True:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                stopped_by = "idle"
+                break
+            with connection:
+                connection.settimeout(None)
+                chunks = []
+                while chunk := connection.recv(65536):
+                    chunks.append(chunk)
+                try:
+                    payload = json.loads(b"".join(chunks))
+                except ValueError:
+                    continue
+                if payload.get("ping"):
+                    reply(connection, {"root": str(root)})
+                    continue
+                if payload.get("shutdown"):
+                    reply(connection, {"stopped": str(root), "served": served})
+                    break
+                if payload.get("code") != fingerprint:
+                    # The skill was upgraded under us: let the client run the new code in-process.
+                    reply(connection, {"stale": True})
+                    stopped_by = "upgrade"
+                    break
+                reply(connection, serve_request(payload, main, parsers, cache))
+                served += 1
+    except KeyboardInterrupt:
+        stopped_by = "interrupt"
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+    return {"daemon": str(root), "served": served, "stoppedBy": stopped_by}
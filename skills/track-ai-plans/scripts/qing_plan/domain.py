@@ -14,6 +14,171 @@ def item_map(plan: dict) -> dict[str, dict]:
     return {item["id"]: item for item in all_items(plan)}
 
 
+# int.bit_count arrived in Python 3.10.
+popcount = int.bit_count if hasattr(int, "bit_count") else lambda value: bin(value).count("1")
+
+
+class PlanIndex:
+    """One walk over a plan's phases answering the lookups projections and commands repeat.
+
+    It is a snapshot: build it after the mutations it should observe. `items` and
+    `phase_of` keep the last item per ID like `item_map`, `find` the first like
+    `find_item`; `consumers` is the reverse of `dependsOn`, and `owners` and
+    `move_sources` map declared paths back to the items that claim them.
+    """
+
+    def __init__(self, plan: dict) -> None:
+        self.order: list[dict] = []
+        self.items: dict[str, dict] = {}
+        self.phase_of: dict[str, str] = {}
+        self.located: dict[str, tuple[dict, dict]] = {}
+        self.by_status: dict[str, list[dict]] = {}
+        self.position: dict[int, int] = {}
+        self.changes: dict[int, list[dict]] = {}
+        self.owners: dict[str, list[str]] = {}
+        self.move_sources: dict[str, list[str]] = {}
+        for phase in plan.get("phases", []):
+            for item in phase.get("items", []):
+                item_id = item.get("id")
+                self.position[id(item)] = len(self.order)
+                self.order.append(item)
+                self.items[item_id] = item
+                self.phase_of[item_id] = phase.get("id")
+                self.located.setdefault(item_id, (phase, item))
+                status = item.get("status")
+                self.by_status.setdefault(status if isinstance(status, str) else None, []).append(item)
+                files = self.changes[id(item)] = flatten_changes(item)
+                for file in files:
+                    self.owners.setdefault(file.get("path"), []).append(item_id)
+                    if file.get("from"):
+                        self.move_sources.setdefault(file["from"], []).append(item_id)
+        self.consumers: dict[str, list[str]] = {}
+        for item in self.items.values():
+            for dependency in dict.fromkeys(item.get("dependsOn", [])):
+                self.consumers.setdefault(dependency, []).append(item.get("id"))
+
+    def find(self, item_id: str) -> tuple[dict, dict]:
+        if item_id not in self.located:
+            die(f"unknown item: {item_id}")
+        return self.located[item_id]
+
+    def files(self, item: dict) -> list[dict]:
+        return self.changes[id(item)] if id(item) in self.changes else flatten_changes(item)
+
+    def first(self, *statuses: str) -> dict | None:
+        candidates = [self.by_status[status][0] for status in statuses if self.by_status.get(status)]
+        return min(candidates, key=lambda item: self.position[id(item)]) if candidates else None
+
+    def all_done(self) -> bool:
+        return bool(self.order) and len(self.by_status.get("done", [])) == len(self.order)
+
+    def dependencies_done(self, item: dict) -> bool:
+        return all(self.items.get(dep, {}).get("status") == "done" for dep in item.get("dependsOn", []))
+
+    @functools.cached_property
+    def attempt_seconds(self) -> dict[str | None, list[float]]:
+        """Durations of finished execution attempts, by verifyKind and overall (None)."""
+        samples: dict[str | None, list[float]] = {None: []}
+        for item in self.order:
+            for attempt in item.get("executionAttempts") or []:
+                started, ended = parse_timestamp(attempt.get("startedAt")), parse_timestamp(attempt.get("endedAt"))
+                if started and ended and ended >= started:
+                    seconds = (ended - started).total_seconds()
+                    samples[None].append(seconds)
+                    samples.setdefault(item.get("verifyKind"), []).append(seconds)
+        return samples
+
+    def estimate(self, item: dict) -> float:
+        """Expected seconds for an unfinished item; 1 per item while no attempt has finished.
+
+        The median past attempt of the same verifyKind, else of every kind. A running item is
+        not credited with time already spent, so the forecast depends on the plan alone and a
+        status rebuild stays byte-identical.
+        """
+        samples = self.attempt_seconds.get(item.get("verifyKind")) or self.attempt_seconds[None]
+        return statistics.median(samples) if samples else 1.0
+
+    @functools.cached_property
+    def downstream(self) -> dict[str, dict]:
+        """For each unfinished item, the heaviest chain of unfinished work it heads.
+
+        `chain` sums estimates along the chain, `next` is its following item, `fanOut` counts
+        direct unfinished consumers and `unblocks` every transitive one. Items are visited
+        consumers-first without recursion, so long chains are safe; items on a dependency
+        cycle are left out.
+        """
+        unfinished = {item_id: item for item_id, item in self.items.items() if item.get("status") != "done"}
+        consumers = {item_id: [c for c in self.consumers.get(item_id, []) if c in unfinished] for item_id in unfinished}
+        waiting = {item_id: len(found) for item_id, found in consumers.items()}
+        bit = {item_id: 1 << number for number, item_id in enumerate(unfinished)}
+        queue = collections.deque(item_id for item_id in unfinished if not waiting[item_id])
+        result: dict[str, dict] = {}
+        while queue:
+            item_id = queue.popleft()
+            item, after = unfinished[item_id], consumers[item_id]
+            best = max(after, key=lambda c: (result[c]["chain"], -self.position[id(unfinished[c])]), default=None)
+            mask = 0
+            for consumer in after:
+                mask |= bit[consumer] | result[consumer]["mask"]
+            estimate = self.estimate(item)
+            result[item_id] = {"estimate": estimate, "chain": estimate + (result[best]["chain"] if best else 0.0),
+                               "length": 1 + (result[best]["length"] if best else 0), "next": best,
+                               "fanOut": len(after), "unblocks": popcount(mask), "mask": mask}
+            for dependency in dict.fromkeys(item.get("dependsOn", [])):
+                if dependency in waiting:
+                    waiting[dependency] -= 1
+                    if not waiting[dependency]:
+                        queue.append(dependency)
+        return result
+
+    def ready_queue(self) -> list[dict]:
+        """Dependency-ready items, heaviest downstream chain first, then most unblocked, then plan order."""
+        ready = [item for item in self.by_status.get("not-started", []) if self.dependencies_done(item)]
+        downstream = self.downstream
+
+        def rank(item: dict) -> tuple:
+            found = downstream.get(item.get("id"), {})
+            return -found.get("chain", 0.0), -found.get("unblocks", 0), self.position[id(item)]
+        return sorted(ready, key=rank)
+
+    def claims(self, item: dict) -> set[str]:
+        """Declared paths and move sources: everything a running item may touch."""
+        return {path for file in self.files(item) for path in (file.get("path"), file.get("from")) if path}
+
+    def overlaps(self, item: dict, others: list[dict]) -> dict[str, list[str]]:
+        claimed = self.claims(item)
+        shared = {other.get("id"): sorted(claimed & self.claims(other)) for other in others if other is not item}
+        return {other_id: paths for other_id, paths in shared.items() if paths}
+
+    def free_lanes(self, lanes: int) -> list[int]:
+        running = self.by_status.get("in-progress", [])
+        taken = {(item.get("execution") or {}).get("lane") for item in running}
+        # An item started before the plan opted into lanes has no number but still occupies one.
+        return [lane for lane in range(1, lanes + 1) if lane not in taken][:max(lanes - len(running), 0)]
+
+    def admissible(self, lanes: int) -> list[tuple[dict, int]]:
+        """Dependency-ready items that may start now, each with the lane it would take.
+
+        Greedy in ready-queue order: an item is admitted when its claims are disjoint from every
+        running item and from every item admitted before it.
+        """
+        free = self.free_lanes(lanes)
+        claimed = set().union(*(self.claims(item) for item in self.by_status.get("in-progress", [])))
+        admitted = []
+        for item in self.ready_queue():
+            if len(admitted) == len(free):
+                break
+            if self.dependencies_done(item) and not claimed & self.claims(item):
+                admitted.append((item, free[len(admitted)]))
+                claimed |= self.claims(item)
+        return admitted
+
+
+def execution_lanes(plan: dict) -> int:
+    lanes = plan.get("executionLanes")
+    return lanes if isinstance(lanes, int) and not isinstance(lanes, bool) and lanes > 0 else 1
+
+
 def find_phase(plan: dict, phase_id: str) -> dict:
     phase = next((phase for phase in plan.get("phases", []) if phase.get("id") == phase_id), None)
     if phase is None:
@@ -72,6 +237,83 @@ def parse_doc_target(value: str) -> dict:
     return {"pattern": pattern, "purpose": purpose}
 
 
+class PathMatcher:
+    """Every fnmatch pattern of a set compiled into one regex evaluated in a single pass.
+
+    Each distinct pattern becomes an optional lookahead with an empty capture group, so
+    one `match` reports all patterns that accept a path; labels map groups back to
+    module IDs or documentation targets. Semantics are exactly `fnmatch.fnmatch`.
+    """
+
+    def __init__(self, labelled: tuple[tuple[str, str], ...]) -> None:
+        groups: dict[str, list[str]] = {}
+        for label, pattern in labelled:
+            labels = groups.setdefault(os.path.normcase(pattern), [])
+            if label not in labels:
+                labels.append(label)
+        self.labels = list(groups.values())
+        self.regex = re.compile("".join(f"(?:(?={fnmatch.translate(pattern)})())?" for pattern in groups))
+
+    def match(self, path: str) -> list[str]:
+        found = self.regex.match(os.path.normcase(path))
+        matched: list[str] = []
+        for labels, group in zip(self.labels, found.groups()):
+            if group is not None:
+                matched.extend(label for label in labels if label not in matched)
+        return matched
+
+    def matches_any(self, path: str) -> bool:
+        return any(group is not None for group in self.regex.match(os.path.normcase(path)).groups())
+
+
+@functools.lru_cache(maxsize=32)
+def path_matcher(labelled: tuple[tuple[str, str], ...]) -> PathMatcher:
+    return PathMatcher(labelled)
+
+
+def module_matcher(project_map: dict) -> PathMatcher:
+    """Matcher over non-system module pathPatterns, reused while the map's patterns are unchanged."""
+    return path_matcher(tuple((module["id"], pattern) for module in project_map.get("modules", [])
+                              if not module["id"].startswith("_") for pattern in module.get("pathPatterns", [])))
+
+
+class ScanScope:
+    """Where a scoped change scan looks for untracked files.
+
+    `pathspecs` limit Git's walk to at least these paths; `contains` then applies the exact
+    `fnmatch` semantics of the rest of planctl, so a pathspec walk and a filtered full
+    status observe the same files.
+    """
+
+    def __init__(self, paths, patterns) -> None:
+        self.paths = tuple(sorted(set(paths)))
+        self.patterns = tuple(sorted(set(patterns)))
+        self.key = (self.paths, self.patterns)
+        self.literal = frozenset(self.paths)
+        self.matcher = path_matcher(tuple((pattern, pattern) for pattern in self.patterns))
+
+    def pathspecs(self) -> list[str]:
+        return [f":(top,literal){path}" for path in self.paths] + [f":(top){pattern}" for pattern in self.patterns]
+
+    def contains(self, path: str) -> bool:
+        # Like a literal pathspec, a declared path also covers everything below it.
+        parts = path.split("/")
+        return any("/".join(parts[:end]) in self.literal for end in range(1, len(parts) + 1)) or self.matcher.matches_any(path)
+
+
+def plan_scan_scope(root: Path, plan: dict, project_map: dict, plan_index: PlanIndex | None = None) -> ScanScope | None:
+    """The plan's declared paths and move sources, module pathPatterns, documentation targets,
+    and the store; None where the repository has not opted into scoped scans."""
+    if not git_observer(root).scoped:
+        return None
+    plan_index = plan_index or PlanIndex(plan)
+    patterns = [pattern for module in project_map.get("modules", []) if not module["id"].startswith("_")
+                for pattern in module.get("pathPatterns", [])]
+    patterns += [target["pattern"] for target in (plan.get("documentationImpact") or {}).get("targets", [])]
+    paths = [path for path in [*plan_index.owners, *plan_index.move_sources] if path]
+    return ScanScope([*paths, "qing-plans"], patterns)
+
+
 def matching_plan_review(plan: dict, project_map: dict) -> dict | None:
     matches = [r for r in plan.get("reviews", []) if r.get("targetType") == "plan" and
                r.get("targetRevision") == plan.get("revision") and r.get("projectMapRevision") == project_map.get("revision")]
@@ -150,7 +392,9 @@ def validate_project_map(project_map: dict) -> list[str]:
     return errors
 
 
-def validate_plan(entry: dict, plan: dict, project_map: dict) -> list[str]:
+def validate_plan(entry: dict, plan: dict, project_map: dict, *, items: set[str] | None = None) -> list[str]:
+    """Every error in `plan`; with `items`, per-item checks and the cycle walk cover only those
+    items and the items depending on them (see `validate_amendment`)."""
     slug, errors = entry.get("slug", "<unknown>"), []
     for key in ("schemaVersion", "slug", "revision", "goal", "planner", "reviewPolicy", "phases", "reviews", "amendments", "checkpoint", "issues"):
         if key not in plan:
@@ -159,18 +403,23 @@ def validate_plan(entry: dict, plan: dict, project_map: dict) -> list[str]:
         errors.append(f"{slug}: invalid schemaVersion or slug")
     if plan.get("reviewPolicy") not in REVIEW_POLICIES:
         errors.append(f"{slug}: invalid reviewPolicy")
+    if "executionLanes" in plan and execution_lanes(plan) != plan["executionLanes"]:
+        errors.append(f"{slug}: executionLanes must be a positive integer")
     phase_ids = [phase.get("id") for phase in plan.get("phases", [])]
     if len(phase_ids) != len(set(phase_ids)):
         errors.append(f"{slug}: duplicate phase id")
-    items, module_ids = all_items(plan), {m["id"] for m in project_map.get("modules", [])}
-    item_ids = [item.get("id") for item in items]
-    if len(item_ids) != len(set(item_ids)):
+    plan_index, module_ids = PlanIndex(plan), {m["id"] for m in project_map.get("modules", [])}
+    if len(plan_index.items) != len(plan_index.order):
         errors.append(f"{slug}: duplicate item id")
-    known = set(item_ids)
-    graph = {}
-    for item in items:
+    known = plan_index.items.keys()
+    running = plan_index.by_status.get("in-progress", [])
+    if "executionLanes" in plan and len(running) > execution_lanes(plan):
+        errors.append(f"{slug}: {len(running)} items in progress exceed executionLanes={execution_lanes(plan)}")
+    graph = {item.get("id"): item.get("dependsOn", []) for item in plan_index.order}
+    for item in plan_index.order:
         item_id = item.get("id")
-        graph[item_id] = item.get("dependsOn", [])
+        if items is not None and item_id not in items:
+            continue
         if item.get("status") not in ITEM_STATES or item.get("verifyKind") not in VERIFY_KINDS:
             errors.append(f"{slug}/{item_id}: invalid status or verifyKind")
         change_sets = item.get("changeSets", [])
@@ -216,7 +465,18 @@ def validate_plan(entry: dict, plan: dict, project_map: dict) -> list[str]:
             visit(dep)
         visiting.remove(node)
         visited.add(node)
-    for node in graph:
+    starts = graph
+    if items is not None:
+        # Only the checked items changed edges, so a new cycle runs through one of them and
+        # the full walk would first reach it from one of their dependents.
+        reach, pending = set(), [item_id for item_id in items if item_id in graph]
+        while pending:
+            node = pending.pop()
+            if node not in reach:
+                reach.add(node)
+                pending.extend(plan_index.consumers.get(node, []))
+        starts = [node for node in graph if node in reach]
+    for node in starts:
         visit(node)
     for amendment in plan.get("amendments", []):
         if amendment.get("kind") not in AMENDMENT_KINDS or amendment.get("status") not in {"pending-review", "applied", "rejected"}:
@@ -262,6 +522,53 @@ def validate_plan(entry: dict, plan: dict, project_map: dict) -> list[str]:
     return errors
 
 
+def amendment_touches(operations: list[dict]) -> tuple[set[str], set[str], set[str], set[tuple[str, str]]]:
+    """Phase IDs, item IDs, module IDs, and dependency keys that `operations` add or edit."""
+    phases = {op["phaseId"] for op in operations if op["op"] == "add-item"}
+    items = {op["id"] for op in operations if op["op"] == "add-item"}
+    items |= {op["itemId"] for op in operations if op["op"] in {"add-file", "remove-file"}}
+    modules = {op["id"] for op in operations if op["op"] == "upsert-module"}
+    dependencies = {(op["moduleId"], op["dependsOn"]) for op in operations if op["op"] == "upsert-dependency"}
+    return phases, items, modules, dependencies
+
+
+def copy_on_write(plan: dict, project_map: dict, operations: list[dict]) -> tuple[dict, dict]:
+    """Copies of `plan` and `project_map` that `operations` may be applied to, leaving both
+    originals untouched. Only the containers on each operation's path are copied; every
+    other phase, item, and map entry, verification and execution histories included, is shared.
+    """
+    phases, items, modules, dependencies = amendment_touches(operations)
+    preview_plan = {**plan, "phases": list(plan.get("phases", []))}
+    for position, phase in enumerate(preview_plan["phases"]):
+        edited = [number for number, item in enumerate(phase.get("items", [])) if item.get("id") in items]
+        if phase.get("id") not in phases and not edited:
+            continue
+        phase = preview_plan["phases"][position] = {**phase, "items": list(phase.get("items", []))}
+        for number in edited:
+            item = phase["items"][number]
+            phase["items"][number] = {**item, "changeSets": [{**change_set, "files": [dict(file) for file in change_set.get("files", [])]}
+                                                             for change_set in item.get("changeSets", [])]}
+    preview_map = {
+        **project_map,
+        "modules": [dict(module) if module.get("id") in modules else module for module in project_map.get("modules", [])],
+        "dependencies": [dict(dependency) if (dependency.get("moduleId"), dependency.get("dependsOn")) in dependencies else dependency
+                         for dependency in project_map.get("dependencies", [])],
+    }
+    return preview_plan, preview_map
+
+
+def validate_amendment(entry: dict, plan: dict, project_map: dict, operations: list[dict]) -> list[str]:
+    """Validate `plan` and `project_map` after `operations` were applied, re-checking only what
+    they can have broken: the items they add or edit and those items' dependents, and the map
+    only if an operation changed it. Operations never remove modules or items or edit other
+    items' dependencies, so when both documents were valid before, this equals
+    `validate_project_map` + `validate_plan`.
+    """
+    _, items, modules, dependencies = amendment_touches(operations)
+    return (validate_project_map(project_map) if modules or dependencies else []) + \
+        validate_plan(entry, plan, project_map, items=items)
+
+
 def validate_migration_manifest(root: Path) -> list[str]:
     legacy = root / "plans"
     manifest_path = store_dir(root) / "migration.json"
@@ -317,10 +624,19 @@ def validate_store(root: Path, index: dict) -> list[str]:
                 frozen = read_json(status_path(root, slug))
                 if frozen.get("schemaVersion") != SCHEMA_VERSION or frozen.get("plan", {}).get("state") != entry.get("state"):
                     errors.append(f"{slug}: invalid frozen status")
-        for event_path in sorted((store_dir(root) / slug / "events").glob("*.json")):
-            stored_event = read_json(event_path)
+                named = {phase["shard"] for phase in frozen.get("phases", []) if "shard" in phase}
+                stored = {f"{STATUS_SHARDS_DIR}/{path.name}" for path in (plan_path(root, slug).parent / STATUS_SHARDS_DIR).glob("*.json")}
+                for name in sorted(named - stored):
+                    errors.append(f"{slug}: frozen status is missing phase shard {name}")
+                for name in sorted(stored - named):
+                    errors.append(f"{slug}: phase shard {name} is not named by the frozen status")
+        seen_events = set()
+        for stored_event in iter_events(events_dir(root, slug)):
             if stored_event.get("schemaVersion") != SCHEMA_VERSION or stored_event.get("planSlug") != slug:
-                errors.append(f"{slug}: invalid event {event_path.name}")
+                errors.append(f"{slug}: invalid event {stored_event.get('eventId')}")
+            if stored_event.get("eventId") in seen_events:
+                errors.append(f"{slug}: duplicate event {stored_event.get('eventId')}")
+            seen_events.add(stored_event.get("eventId"))
     registered = set(slugs)
     for path in store_dir(root).glob("*/plan.json") if store_dir(root).exists() else []:
         if path.parent.name not in registered:
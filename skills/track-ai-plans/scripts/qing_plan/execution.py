@@ -8,6 +8,7 @@ from .git import *
 from .domain import *
 from .projection import *
 from .commands import install_assets
+from .replay import replay_check
 
 
 def capture_execution_start(root: Path, item: dict) -> dict:
@@ -54,9 +55,29 @@ def sync_execution_attempt(item: dict) -> None:
         attempts[-1] = copy.deepcopy(item["execution"])
 
 
+def lane_checkpoints(plan: dict, previous: dict, item_id: str | None = None, reason: str | None = None,
+                     next_step: str | None = None) -> list[dict]:
+    """One entry per running lane; a lane keeps its stop note until `checkpoint --item` replaces it."""
+    kept = {lane.get("itemId"): lane for lane in previous.get("lanes", [])}
+    lanes = []
+    for running in PlanIndex(plan).by_status.get("in-progress", []):
+        execution = running.get("execution") or {}
+        note = {"stopReason": reason, "nextAction": next_step} if running["id"] == item_id else kept.get(running["id"], {})
+        lanes.append({"lane": execution.get("lane"), "itemId": running["id"], "startedBy": execution.get("startedBy"),
+                      "startedAt": execution.get("startedAt"), "startHead": execution.get("startHead"),
+                      "stopReason": note.get("stopReason"), "nextAction": note.get("nextAction")})
+    return sorted(lanes, key=lambda lane: (lane["lane"] is None, lane["lane"] or 0))
+
+
+def item_state(item: dict) -> dict:
+    """What a state change leaves on an item, less the histories it appends to, for replay."""
+    return {key: item.get(key) for key in ("status", "reason", "updatedAt", "completedBy", "execution")}
+
+
 def update_checkpoint_for_item(root: Path, plan: dict, project_map: dict, item: dict, actor: str | None) -> None:
-    dirty = git_dirty_paths(root)
-    action = next((i for i in all_items(plan) if i["status"] == "in-progress"), None)
+    dirty = git_dirty_paths(root, plan_scan_scope(root, plan, project_map))
+    previous = plan.get("checkpoint") or {}
+    action = PlanIndex(plan).first("in-progress")
     plan["checkpoint"] = {
         "itemId": action["id"] if action else None,
         "lastCompletedItemId": item["id"] if item["status"] == "done" else plan.get("checkpoint", {}).get("lastCompletedItemId"),
@@ -66,6 +87,8 @@ def update_checkpoint_for_item(root: Path, plan: dict, project_map: dict, item:
         "handoff": {"readiness": "local-only", "dirtyPaths": dirty,
                     "note": "The checkpoint mutation itself must be committed before cross-device handoff"},
     }
+    if execution_lanes(plan) > 1:
+        plan["checkpoint"]["lanes"] = lane_checkpoints(plan, previous)
 
 
 def set_item_state(root: Path, plan: dict, project_map: dict, item: dict, state: str,
@@ -79,15 +102,25 @@ def set_item_state(root: Path, plan: dict, project_map: dict, item: dict, state:
     }
     if state not in allowed.get(item["status"], set()):
         die(f"invalid item transition: {item['status']} -> {state}")
-    if state in {"in-progress", "done"} and not dependencies_done(plan, item):
+    plan_index = PlanIndex(plan)
+    if state in {"in-progress", "done"} and not plan_index.dependencies_done(item):
         die("item dependencies are not done")
     if state == "in-progress":
-        running = [i["id"] for i in all_items(plan) if i["status"] == "in-progress" and i["id"] != item["id"]]
-        if running:
-            die(f"another item is in progress: {running[0]}")
+        lanes = execution_lanes(plan)
+        running = [i for i in plan_index.by_status.get("in-progress", []) if i["id"] != item["id"]]
+        if running and lanes == 1:
+            die(f"another item is in progress: {running[0]['id']}")
+        if len(running) >= lanes:
+            die(f"all {lanes} execution lanes are busy: {', '.join(i['id'] for i in running)}")
+        overlaps = plan_index.overlaps(item, running)
+        if overlaps:
+            other, paths = next(iter(overlaps.items()))
+            die(f"item {item['id']} shares declared paths with running item {other}: {', '.join(paths)}")
         if item["status"] not in {"not-started", "failed", "blocked"}:
             die(f"cannot start item from {item['status']}")
         item["execution"] = capture_execution_start(root, item)
+        if lanes > 1:
+            item["execution"].update({"lane": plan_index.free_lanes(lanes)[0], "startedBy": actor})
         item.setdefault("executionAttempts", []).append(item["execution"])
     elif state == "done":
         if item["status"] != "in-progress":
@@ -116,7 +149,8 @@ def cmd_update_item(args: argparse.Namespace, root: Path) -> dict:
     before = {"status": item["status"], "reason": item.get("reason")}
     set_item_state(root, plan, project_map, item, args.status, args.reason, args.actor)
     event(root, entry["slug"], "item-updated", args.actor, args.actor_type,
-          {"itemId": item["id"], "before": before, "after": {"status": item["status"], "reason": item.get("reason")}})
+          {"itemId": item["id"], "before": before, "after": {"status": item["status"], "reason": item.get("reason")},
+           "state": item_state(item), "checkpoint": plan["checkpoint"]})
     return save_plan(root, index, entry, plan, project_map)
 
 
@@ -140,7 +174,8 @@ def cmd_verify(args: argparse.Namespace, root: Path) -> dict:
         set_item_state(root, plan, project_map, item, "done", None, args.actor)
     elif args.result == "fail":
         set_item_state(root, plan, project_map, item, "failed", args.reason, args.actor)
-    event(root, entry["slug"], "item-verified", args.actor, args.actor_type, {"itemId": item["id"], "attempt": attempt})
+    event(root, entry["slug"], "item-verified", args.actor, args.actor_type,
+          {"itemId": item["id"], "attempt": attempt, "state": item_state(item), "checkpoint": plan["checkpoint"]})
     return save_plan(root, index, entry, plan, project_map)
 
 
@@ -150,19 +185,42 @@ def cmd_checkpoint(args: argparse.Namespace, root: Path) -> dict:
     if args.item:
         find_item(plan, args.item)
     project_map = load_project_map(root)
-    dirty = git_dirty_paths(root)
+    dirty = git_dirty_paths(root, plan_scan_scope(root, plan, project_map))
+    previous = plan.get("checkpoint") or {}
     plan["checkpoint"] = {
-        "itemId": args.item, "lastCompletedItemId": plan.get("checkpoint", {}).get("lastCompletedItemId"),
+        "itemId": args.item, "lastCompletedItemId": previous.get("lastCompletedItemId"),
         "planRevision": plan["revision"], "projectMapRevision": project_map["revision"],
         "branch": git_branch(root), "headCommit": git_head(root), "stopReason": args.reason,
         "nextAction": args.next_action, "createdBy": args.actor, "createdAt": now(),
         "handoff": {"readiness": "local-only", "dirtyPaths": dirty,
                     "note": "The checkpoint mutation itself must be committed before cross-device handoff"},
     }
+    if execution_lanes(plan) > 1:
+        plan["checkpoint"]["lanes"] = lane_checkpoints(plan, previous, args.item, args.reason, args.next_action)
     event(root, entry["slug"], "checkpoint-created", args.actor, args.actor_type, {"checkpoint": plan["checkpoint"]})
     return save_plan(root, index, entry, plan, project_map)
 
 
+def cmd_set_execution_lanes(args: argparse.Namespace, root: Path) -> dict:
+    index, entry, plan = selected_plan(args, root)
+    require_state(entry, CURRENT_STATES | {"draft"}, "set-execution-lanes")
+    if args.lanes < 1:
+        die("--lanes must be at least 1")
+    running = [i["id"] for i in PlanIndex(plan).by_status.get("in-progress", [])]
+    if len(running) > args.lanes:
+        die(f"{len(running)} items are in progress ({', '.join(running)}); stop some before lowering lanes to {args.lanes}")
+    before = execution_lanes(plan)
+    # Lanes schedule execution without changing scope, so the revision and its review stand.
+    plan["executionLanes"] = args.lanes
+    if args.lanes > 1:
+        plan["checkpoint"]["lanes"] = lane_checkpoints(plan, plan["checkpoint"])
+    else:
+        plan["checkpoint"].pop("lanes", None)
+    event(root, entry["slug"], "execution-lanes-changed", args.actor, args.actor_type,
+          {"before": before, "after": args.lanes, "checkpoint": plan["checkpoint"]})
+    return save_plan(root, index, entry, plan)
+
+
 def cmd_add_issue(args: argparse.Namespace, root: Path) -> dict:
     index, entry, plan = selected_plan(args, root)
     require_state(entry, {"active"}, "add-issue")
@@ -183,15 +241,16 @@ def cmd_resolve_issue(args: argparse.Namespace, root: Path) -> dict:
     if not issue or issue["status"] != "open":
         die("unknown or resolved issue")
     issue.update({"status": "resolved", "resolution": args.resolution, "resolvedAt": now()})
-    event(root, entry["slug"], "issue-resolved", args.actor, args.actor_type, {"issueId": args.issue, "resolution": args.resolution})
+    event(root, entry["slug"], "issue-resolved", args.actor, args.actor_type,
+          {"issueId": args.issue, "resolution": args.resolution, "resolvedAt": issue["resolvedAt"]})
     return save_plan(root, index, entry, plan)
 
 
 def completion_problems(status: dict, plan: dict) -> list[str]:
-    problems = []
-    if not plan.get("phases") or not all_items(plan):
+    problems, plan_index = [], PlanIndex(plan)
+    if not plan.get("phases") or not plan_index.order:
         problems.append("plan has no executable items")
-    remaining = [i["id"] for i in all_items(plan) if i["status"] != "done"]
+    remaining = [i["id"] for i in plan_index.order if i["status"] != "done"]
     if remaining:
         problems.append(f"remaining items={remaining}")
     open_issues = [i["id"] for i in plan["issues"] if i["status"] == "open"]
@@ -201,7 +260,7 @@ def completion_problems(status: dict, plan: dict) -> list[str]:
     if pending_amendments:
         problems.append(f"pending amendments={pending_amendments}")
     temp_cleanup = [a["cleanupItemId"] for a in plan["amendments"] if a["kind"] == "temporary" and a["status"] == "applied" and
-                    item_map(plan).get(a["cleanupItemId"], {}).get("status") != "done"]
+                    plan_index.items.get(a["cleanupItemId"], {}).get("status") != "done"]
     if temp_cleanup:
         problems.append(f"temporary cleanup incomplete={temp_cleanup}")
     if status["changeCoverage"]["unexpected"]:
@@ -309,48 +368,89 @@ def cmd_validate(args: argparse.Namespace, root: Path) -> dict:
                 "plans": len(index["plans"]), "currentPlanSlug": index.get("currentPlanSlug"),
                 "nextAction": "run migrate-store --dry-run"}
     index = load_index(root)
+    # Replay first: it can still report on a plan.json too damaged for validate_store to read.
+    replay = {entry["slug"]: replay_check(root, entry) for entry in index["plans"]} if args.replay else None
+    problems = [f"{slug}: {check['problem']}" for slug, check in (replay or {}).items() if check.get("problem")]
+    if problems:
+        die("; ".join(problems))
     errors = validate_store(root, index)
     if errors:
         die("; ".join(errors))
-    return {"valid": True, "store": "qing-plans", "schemaVersion": 2, "plans": len(index["plans"]),
-            "currentPlanSlug": index.get("currentPlanSlug"), "revision": index["revision"],
-            "legacySafeToDelete": bool((root / "plans").exists() and verified_migration(root))}
+    result = {"valid": True, "store": "qing-plans", "schemaVersion": 2, "plans": len(index["plans"]),
+              "currentPlanSlug": index.get("currentPlanSlug"), "revision": index["revision"],
+              "legacySafeToDelete": bool((root / "plans").exists() and verified_migration(root))}
+    if replay is not None:
+        result["replay"] = replay
+    return result
 
 
 def legacy_show(args: argparse.Namespace, root: Path) -> dict:
     index, entry, plan = selected_plan(args, root)
     path = status_path(root, entry["slug"])
     if path.exists():
-        result = read_json(path)
+        result = {**read_json(path)}
     else:
         result = {"schemaVersion": 1, "plan": {"slug": entry["slug"], "name": entry.get("name"), "goal": plan.get("goal"), "state": entry.get("state")}}
     result["legacyStore"] = {"path": "plans", "readOnly": True, "nextAction": "migrate-store --dry-run"}
     return result
 
 
-def cmd_show(args: argparse.Namespace, root: Path) -> dict:
+def plan_status(args: argparse.Namespace, root: Path) -> dict:
     if st._USING_LEGACY:
         return legacy_show(args, root)
     _, entry, plan = selected_plan(args, root)
     if entry["state"] in TERMINAL_STATES:
-        return read_json(status_path(root, entry["slug"]))
-    return status_projection(entry, plan, root, load_project_map(root))
+        return read_status(root, entry["slug"])
+    status = status_projection(entry, plan, root, load_project_map(root))
+    # Shown fresh either way; the lag tells a reader that status.json itself is behind.
+    lag = read_status_stamp(root, entry["slug"])
+    return {**status, "statusLag": lag} if lag else status
+
+
+def cmd_show(args: argparse.Namespace, root: Path) -> dict | None:
+    status = plan_status(args, root)
+    if args.format == "ndjson":
+        emit_records(status_records(status))
+        return None
+    return status
 
 
-def cmd_changes(args: argparse.Namespace, root: Path) -> dict:
-    status = cmd_show(args, root)
-    return {"changeCoverage": status.get("changeCoverage"), "documentationImpact": status.get("documentationImpact"),
-            "moduleImpact": status.get("projectMap")}
+def cmd_changes(args: argparse.Namespace, root: Path) -> dict | None:
+    git_observer(root).full_scan = args.full_scan
+    status = plan_status(args, root)
+    changes = {"changeCoverage": status.get("changeCoverage"), "documentationImpact": status.get("documentationImpact"),
+               "moduleImpact": status.get("projectMap")}
+    if args.format == "ndjson":
+        emit_records(change_records(changes))
+        return None
+    return changes
 
 
-def cmd_history(args: argparse.Namespace, root: Path) -> dict:
+def cmd_history(args: argparse.Namespace, root: Path) -> dict | None:
     _, entry, _ = selected_plan(args, root)
     if args.limit is not None and args.limit < 0:
         die("--limit must be non-negative")
-    events = [read_json(path) for path in sorted((store_dir(root) / entry["slug"] / "events").glob("*.json"))]
-    if args.limit is not None:
-        events = events[-args.limit:]
-    return {"planSlug": entry["slug"], "store": store_dir(root).name, "events": events}
+    bounds = {}
+    for name in ("since", "until"):
+        value = getattr(args, name)
+        if value is not None:
+            bounds[name] = event_sort_time(value) or die(f"--{name} must be an ISO-8601 timestamp")
+    directory = events_dir(root, entry["slug"])
+    entries, cursor = select_events(directory, types=args.type, item=args.item, cursor=args.cursor, limit=args.limit, **bounds)
+    if args.format == "ndjson":
+        # Events as the log holds them, then one summary line in place of the envelope.
+        def records():
+            count = 0
+            for event in read_events(directory, entries):
+                count += 1
+                yield event
+            yield {"type": "summary", "planSlug": entry["slug"], "store": store_dir(root).name, "events": count,
+                   "nextCursor": cursor}
+
+        emit_records(records())
+        return None
+    return {"planSlug": entry["slug"], "store": store_dir(root).name, "events": list(read_events(directory, entries)),
+            "nextCursor": cursor}
 
 
 def cmd_resume(args: argparse.Namespace, root: Path) -> dict:
@@ -377,9 +477,11 @@ def cmd_resume(args: argparse.Namespace, root: Path) -> dict:
     entry = find_entry(index, slug)
     plan = read_json(plan_path(root, slug))
     project_map = load_project_map(root)
-    status = read_json(status_path(root, entry["slug"])) if entry["state"] in TERMINAL_STATES else status_projection(entry, plan, root, project_map)
+    status = read_status(root, entry["slug"]) if entry["state"] in TERMINAL_STATES else status_projection(entry, plan, root, project_map)
     return {"store": "qing-plans", "plan": status["plan"], "summary": status["summary"],
-            "handoff": status["handoff"], "nextAction": status["nextActions"][0],
+            "revisions": {"plan": plan["revision"], "map": project_map["revision"], "index": index["revision"]},
+            "handoff": status["handoff"], "nextAction": status["nextActions"][0], "nextActions": status["nextActions"],
+            "schedule": status.get("schedule"),
             "openIssues": [i for i in status["issues"] if i["status"] == "open"] + status["derivedIssues"]}
 
 
@@ -395,4 +497,27 @@ def cmd_refresh_status(args: argparse.Namespace, root: Path) -> dict:
     _, entry, plan = selected_plan(args, root)
     if entry["state"] in TERMINAL_STATES:
         die("terminal status is frozen and cannot be refreshed")
-    return render_status(root, entry, plan, load_project_map(root))
+    if args.wait:
+        return wait_for_status(root, entry["slug"], args.timeout)
+    return render_status(root, entry, plan, load_project_map(root), full=args.full)
+
+
+def wait_for_status(root: Path, slug: str, timeout: float) -> dict:
+    """Block until no render is queued for `slug`, rendering the queue here when no worker runs."""
+    if timeout < 0:
+        die("--timeout must not be negative")
+    deadline = time.monotonic() + timeout
+    while True:
+        drain_status_queue(root)
+        stamp = read_status_stamp(root, slug)
+        if not status_stamp_path(root, slug).exists():
+            return read_status(root, slug)
+        if stamp and "failed" in stamp:
+            die(f"background status render failed: {stamp['failed']}; run refresh-status to retry")
+        if time.monotonic() >= deadline:
+            die(f"status.json is still behind plan revision {(stamp or {}).get('planRevision')} after {timeout:g}s")
+        time.sleep(0.05)
+
+
+def cmd_status_worker(args: argparse.Namespace, root: Path) -> dict:
+    return {"rendered": drain_status_queue(root)}
@@ -0,0 +1,156 @@
+"""`planctl fleet`: resume many repositories at once.
+
+Every root runs `resume` in its own worker process. The runtime keeps the selected store,
+Git observations, and caches in module globals (`_STORE_OVERRIDE` among them), so a
+process per root is what keeps one repository's state out of another's, and what lets a
+root that overruns its timeout be killed without disturbing the rest.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import multiprocessing
+import multiprocessing.connection
+import traceback
+
+from .storage import *
+
+FLEET_SCHEMA_VERSION = 1
+
+
+def read_roots(source: str) -> list[Path]:
+    """One repository per line; blank lines and `#` comments are skipped, relative paths
+    resolve against the roots file's directory, and duplicates are dropped."""
+    if source == "-":
+        text, base = sys.stdin.read(), Path.cwd()
+    else:
+        path = Path(source).expanduser()
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError as exc:
+            die(f"cannot read roots file {source}: {exc.strerror or exc}")
+        base = path.resolve().parent
+    roots = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            roots.setdefault((base / Path(line).expanduser()).resolve(), None)
+    return list(roots)
+
+
+def resume_root(root: str, connection) -> None:
+    """Worker body: run `planctl --root ROOT resume` and send back what it printed."""
+    from .cli import main
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            code = main(["--root", root, "resume"])
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    connection.send((code, stdout.getvalue(), stderr.getvalue()))
+    connection.close()
+
+
+def fleet_record(root: Path, code: int, stdout: str, stderr: str, elapsed: float) -> dict:
+    record = {"type": "repo", "root": str(root), "elapsedMs": round(elapsed * 1000)}
+    if code != 0:
+        lines = stderr.strip().splitlines()
+        message = lines[-1] if lines else f"exit {code}"
+        return {**record, "status": "error", "error": message[len("planctl: "):] if message.startswith("planctl: ") else message}
+    resume = json.loads(stdout)
+    handoff, plan = resume.get("handoff") or {}, resume.get("plan")
+    return {
+        **record, "status": "ok", "store": resume.get("store"), "readOnly": bool(resume.get("readOnly")),
+        "plan": {key: plan.get(key) for key in ("slug", "name", "state", "revision")} if plan else None,
+        "summary": resume.get("summary"), "nextAction": resume.get("nextAction"),
+        "portability": handoff.get("portability"), "warnings": handoff.get("warnings", []),
+        "openIssues": len(resume.get("openIssues") or []), "eta": (resume.get("schedule") or {}).get("eta"),
+        "unfinishedPlans": resume.get("unfinishedPlans"),
+    }
+
+
+def timeout_record(root: Path, elapsed: float, timeout: float) -> dict:
+    return {"type": "repo", "root": str(root), "elapsedMs": round(elapsed * 1000), "status": "timeout",
+            "error": f"no result within {timeout:g}s; worker killed"}
+
+
+def run_fleet(roots: list[Path], jobs: int, timeout: float | None, emit) -> dict[Path, dict]:
+    """Resume every root with at most `jobs` workers, calling `emit` as each one finishes."""
+    methods = multiprocessing.get_all_start_methods()
+    # Forking skips re-importing the runtime per root; the parent is single-threaded.
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    pending, running, records = list(roots), {}, {}
+
+    def finish(receiver, record: dict) -> None:
+        root, process, _ = running.pop(receiver)
+        receiver.close()
+        process.join()
+        records[root] = record
+        emit(record)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            root = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=resume_root, args=(str(root), sender), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (root, process, time.monotonic())
+        wait = None
+        if timeout:
+            wait = max(0.0, min(started + timeout for _, _, started in running.values()) - time.monotonic())
+        for receiver in multiprocessing.connection.wait(list(running), timeout=wait):
+            root, process, started = running[receiver]
+            try:
+                code, stdout, stderr = receiver.recv()
+            except EOFError:
+                process.join()
+                code, stdout, stderr = 1, "", f"worker exited with status {process.exitcode}"
+            finish(receiver, fleet_record(root, code, stdout, stderr, time.monotonic() - started))
+        if timeout:
+            for receiver, (root, process, started) in list(running.items()):
+                if time.monotonic() - started >= timeout:
+                    process.kill()
+                    finish(receiver, timeout_record(root, time.monotonic() - started, timeout))
+    return records
+
+
+def fleet_index(roots: list[Path], records: dict[Path, dict], source: str) -> dict:
+    repositories = [records[root] for root in roots]
+    counts = {status: sum(record["status"] == status for record in repositories) for status in ("ok", "error", "timeout")}
+    plans = [record["plan"] for record in repositories if record.get("plan")]
+    return {
+        "schemaVersion": FLEET_SCHEMA_VERSION, "generatedAt": now(), "rootsFile": source,
+        "totals": {"repositories": len(repositories), **counts,
+                   "activePlans": sum(plan.get("state") == "active" for plan in plans),
+                   "openIssues": sum(record.get("openIssues") or 0 for record in repositories)},
+        "repositories": repositories,
+    }
+
+
+def cmd_fleet(args: argparse.Namespace, root: Path) -> None:
+    if args.jobs is not None and args.jobs < 1:
+        die("--jobs must be at least 1")
+    if args.timeout is not None and args.timeout <= 0:
+        die("--timeout must be positive")
+    roots = read_roots(args.roots_file)
+    if not roots:
+        die("roots file lists no repositories")
+
+    def emit(record: dict) -> None:
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+    records = run_fleet(roots, args.jobs or min(len(roots), os.cpu_count() or 1), args.timeout, emit)
+    index = fleet_index(roots, records, args.roots_file)
+    target = args.index
+    if target is None and args.roots_file != "-":
+        source = Path(args.roots_file).expanduser()
+        target = source.with_name(f"{source.stem}.fleet.json")
+    if target is not None:
+        write_json(target.expanduser().resolve(), index)
+    emit({"type": "summary", **index["totals"], "index": str(target.expanduser().resolve()) if target else None})
@@ -2,32 +2,314 @@
 
 from __future__ import annotations
 
+from . import storage as st
 from .storage import *
 
 
+TRUE_VALUES = {"true", "yes", "on", "1"}
+
+
 def run_git(root: Path, args: list[str]) -> subprocess.CompletedProcess:
-    return subprocess.run(["git", "-C", str(root), *args], capture_output=True, text=True)
+    # Every call only reads. Without optional locks `git status` never refreshes the index,
+    # so planctl cannot contend for index.lock with the agent's own Git commands.
+    return subprocess.run(["git", "--no-optional-locks", "-C", str(root), *args], capture_output=True, text=True)
+
+
+class GitObserver:
+    """What one planctl command reads from Git, gathered lazily and at most once.
+
+    Branch, HEAD, upstream, ahead/behind, and every dirty or untracked path come from a
+    single `git status --porcelain=v2 --branch -z`. Files planctl itself writes later in
+    the command are folded into the dirty set instead of asking Git again.
+
+    A repository with `git config qing-plans.scanScope planned` still sees every tracked
+    change, but looks for untracked files only inside the scan scope a caller passes (see
+    `plan_scan_scope`); `full_scan` overrides that for one command.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.full_scan = False
+        self._toplevel: str | None = None
+        self._config: dict[str, str] | None = None
+        self._statuses: dict = {}
+        self._tracked: dict | None = None
+        self._changes: dict[tuple, dict] = {}
+
+    def invalidate(self) -> None:
+        """Forget observations after the command moved files Git can see wholesale (migration)."""
+        self._statuses, self._tracked, self._changes = {}, None, {}
+        reset_written_paths()
+
+    def require_root(self) -> None:
+        if self._toplevel is None:
+            result = run_git(self.root, ["rev-parse", "--show-toplevel"])
+            if result.returncode != 0:
+                die("ROOT must be a Git repository with an initial commit")
+            self._toplevel = result.stdout.strip()
+        reported = Path(self._toplevel).resolve()
+        if reported != self.root.resolve():
+            die(f"--root must be Git top-level: {reported}")
+
+    def config(self) -> dict[str, str]:
+        if self._config is None:
+            result = run_git(self.root, ["config", "--get-regexp", r"^(core\.untrackedcache|feature\.manyfiles|qing-plans\.scanscope)$"])
+            self._config = dict(line.partition(" ")[::2] for line in result.stdout.splitlines())
+        return self._config
+
+    @property
+    def scoped(self) -> bool:
+        return not self.full_scan and self.config().get("qing-plans.scanscope", "").lower() == "planned"
+
+    def untracked_cache(self) -> bool:
+        config = self.config()
+        implied = "true" if config.get("feature.manyfiles", "").lower() in TRUE_VALUES else ""
+        return config.get("core.untrackedcache", implied).lower() in TRUE_VALUES
+
+    def read_status(self, untracked: str) -> dict:
+        result = run_git(self.root, ["status", "--porcelain=v2", "--branch", "-z", f"--untracked-files={untracked}"])
+        if result.returncode != 0:
+            die(f"git status failed: {result.stderr.strip()}")
+        return parse_status_v2(result.stdout)
+
+    def status(self, scope=None) -> dict:
+        key = scope.key if scope is not None and self.scoped else None
+        if key not in self._statuses:
+            self._statuses[key] = self.read_status("all") if key is None else self.scoped_status(scope)
+        return self._statuses[key]
+
+    def tracked_status(self) -> dict:
+        if self._tracked is None:
+            self._tracked = self.read_status("no")
+        return self._tracked
+
+    def scoped_status(self, scope) -> dict:
+        """Every tracked change, but untracked files only inside `scope`.
+
+        Git ignores its untracked cache for a pathspec-limited walk, so where that cache is
+        on, one unscoped status is filtered instead; otherwise only the scope is walked.
+        """
+        if None in self._statuses or self.untracked_cache():
+            base = self.status()
+            found = base["untracked"]
+        else:
+            base = self.tracked_status()
+            result = run_git(self.root, ["ls-files", "-z", "--others", "--exclude-standard", "--", *scope.pathspecs()])
+            if result.returncode != 0:
+                die(f"git ls-files failed: {result.stderr.strip()}")
+            found = [path for path in result.stdout.split("\0") if path]
+        untracked = [path for path in found if scope.contains(path)]
+        dropped = set(base["untracked"]) - set(untracked)
+        return {**base, "untracked": untracked, "paths": sorted(set(base["paths"]) - dropped | set(untracked))}
+
+    def header(self) -> dict:
+        # Any status carries branch, HEAD, and upstream; a scoped repository learns them
+        # without walking untracked files.
+        if None not in self._statuses and self.scoped and not self.untracked_cache():
+            return self.tracked_status()
+        return self.status()
+
+    @property
+    def head(self) -> str:
+        oid = self.header()["oid"]
+        if not oid or oid == "(initial)":
+            die("repository needs an initial commit")
+        return oid
+
+    @property
+    def branch(self) -> str:
+        head = self.header()["head"]
+        return "" if head in {None, "(detached)"} else head
+
+    def dirty_paths(self, scope=None) -> list[str]:
+        written = set()
+        for path in written_paths():
+            if not path.exists():
+                continue
+            with contextlib.suppress(ValueError):
+                written.add(path.resolve().relative_to(self.root.resolve()).as_posix())
+        return sorted(set(self.status(scope)["paths"]) | written)
+
+    def untracked_paths(self, scope=None) -> list[str]:
+        return self.status(scope)["untracked"]
+
+    def push_state(self) -> dict:
+        status = self.header()
+        # An upstream whose ref is gone reports no ahead/behind, just as `rev-parse @{u}` fails for it.
+        if status["upstream"] is None or status["ahead"] is None:
+            return {"status": "no-upstream", "upstream": None, "ahead": None, "behind": None}
+        return {"status": "pushed" if status["ahead"] == 0 else "unpushed", "upstream": status["upstream"],
+                "ahead": status["ahead"], "behind": status["behind"]}
+
+    def fingerprint(self, baseline: str, scope=None) -> str:
+        """Identify everything change_map(baseline, scope) depends on without running git diff.
+
+        Status records carry HEAD and index object IDs; the size and mtime of each dirty
+        tracked file stand in for working-tree content, which rename detection reads.
+        """
+        tracked = []
+        for record, *paths in self.status(scope)["records"]:
+            if all(is_tool_storage_path(path) for path in paths):
+                continue
+            stats = []
+            for path in paths:
+                try:
+                    stat = (self.root / path).stat()
+                    stats.append([stat.st_size, stat.st_mtime_ns])
+                except OSError:
+                    stats.append(None)
+            tracked.append([record, stats])
+        untracked = [path for path in self.untracked_paths(scope) if not is_tool_storage_path(path)]
+        scanned = scope.key if scope is not None and self.scoped else None
+        return fingerprint([baseline, self.head, tracked, untracked] + ([scanned] if scanned else []))
+
+    def change_map(self, baseline: str, scope=None) -> dict[str, dict]:
+        """Baseline-to-working-tree changes: cached committed part plus the live working-tree delta."""
+        key = (baseline, scope.key if scope is not None and self.scoped else None)
+        if key not in self._changes:
+            self.require_root()
+            changes = self.committed_changes(baseline)
+            if any(not is_tool_storage_path(path) for path in self.status(scope)["tracked"]):
+                result = run_git(self.root, ["diff", "--find-renames", "--name-status", "HEAD"])
+                if result.returncode != 0:
+                    die(f"git diff failed for HEAD: {result.stderr.strip()}")
+                changes = compose_changes(changes, parse_name_status(result.stdout))
+            for path in self.untracked_paths(scope):
+                changes[path] = {"action": "create", "from": None}
+            self._changes[key] = {path: info for path, info in changes.items() if not is_tool_storage_path(path)}
+        return self._changes[key]
+
+    def committed_changes(self, baseline: str) -> dict[str, dict]:
+        # Both ends are commits, so the diff can never change: it is keyed by the pair
+        # and a new HEAD or baseline simply looks up (or computes) another entry.
+        head = self.head
+        cache = change_cache_path(self.root, baseline, head)
+        if cache is not None:
+            with contextlib.suppress(OSError, ValueError, KeyError):
+                return dict(json.loads(cache.read_text(encoding="utf-8"))["changes"])
+        result = run_git(self.root, ["diff", "--find-renames", "--name-status", baseline, head])
+        if result.returncode != 0:
+            die(f"git diff failed for {baseline}: {result.stderr.strip()}")
+        changes = parse_name_status(result.stdout)
+        if cache is not None:
+            with contextlib.suppress(OSError):
+                write_json(cache, {"schemaVersion": 1, "baselineCommit": baseline, "head": head, "changes": changes})
+                for stale in sorted(cache.parent.glob("*.json"), key=lambda path: path.stat().st_mtime_ns)[:-CHANGE_CACHE_ENTRIES]:
+                    stale.unlink()
+        return dict(changes)
+
+
+def change_cache_path(root: Path, baseline: str, head: str) -> Path | None:
+    store = store_dir(root)
+    if st._USING_LEGACY or not (store / "index.json").exists() or not re.fullmatch(r"[0-9a-f]{7,64}", baseline):
+        return None
+    return store / CACHE_DIR / "changes" / f"{baseline}-{head}.json"
+
+
+def compose_changes(committed: dict[str, dict], delta: dict[str, dict]) -> dict[str, dict]:
+    """Combine baseline->HEAD and HEAD->working-tree name-status maps into baseline->working-tree.
+
+    Paths the working tree did not touch keep their committed entry; a touched path is
+    resolved against where its HEAD version came from in the baseline.
+    """
+    changes = dict(committed)
+
+    def origin(path: str) -> str | None:
+        # The baseline path whose content `path` holds at HEAD, or None when HEAD created it.
+        info = committed.get(path)
+        if info is None or info["action"] == "modify":
+            return path
+        return info["from"] if info["action"] == "move" else None
+
+    def in_baseline(path: str) -> bool:
+        info = committed.get(path)
+        return info is not None and info["action"] == "delete" or \
+            any(other["action"] == "move" and other["from"] == path for other in committed.values())
+
+    for path, info in delta.items():
+        if info["action"] == "modify":
+            changes.setdefault(path, {"action": "modify", "from": None})
+        elif info["action"] == "delete":
+            source = origin(path)
+            changes.pop(path, None)
+            if source is not None:
+                changes[source] = {"action": "delete", "from": None}
+        elif info["action"] == "create":
+            if in_baseline(path):
+                for target, other in committed.items():
+                    if other["action"] == "move" and other["from"] == path:
+                        changes[target] = {"action": "create", "from": None}
+                changes[path] = {"action": "modify", "from": None}
+            else:
+                changes[path] = {"action": "create", "from": info["from"]}
+        else:
+            source = origin(info["from"])
+            changes.pop(info["from"], None)
+            changes[path] = {"action": "create", "from": None} if source is None else {"action": "move", "from": source}
+    return changes
+
+
+_OBSERVERS: dict[Path, GitObserver] = {}
+
+
+def git_observer(root: Path) -> GitObserver:
+    if root not in _OBSERVERS:
+        _OBSERVERS[root] = GitObserver(root)
+    return _OBSERVERS[root]
+
+
+def reset_git_observers() -> None:
+    """Start a command with no remembered Git state."""
+    _OBSERVERS.clear()
+    reset_written_paths()
+
+
+def parse_status_v2(output: str) -> dict:
+    status = {"oid": None, "head": None, "upstream": None, "ahead": None, "behind": None,
+              "paths": [], "tracked": [], "untracked": [], "records": []}
+    records = output.split("\0")
+    position = 0
+    while position < len(records):
+        record = records[position]
+        position += 1
+        if record.startswith("# branch."):
+            key, _, value = record[len("# branch."):].partition(" ")
+            if key == "ab":
+                ahead, behind = value.split()
+                status["ahead"], status["behind"] = int(ahead), abs(int(behind))
+            elif key in {"oid", "head", "upstream"}:
+                status[key] = value
+        elif record.startswith("1 "):
+            status["paths"].append(record.split(" ", 8)[8])
+            status["tracked"].append(status["paths"][-1])
+            status["records"].append([record, status["paths"][-1]])
+        elif record.startswith("2 "):
+            # The original path of a rename or copy follows as its own NUL-terminated record.
+            status["paths"].append(record.split(" ", 9)[9])
+            status["tracked"].extend([status["paths"][-1], records[position]])
+            status["records"].append([record + "\0" + records[position], status["paths"][-1], records[position]])
+            position += 1
+        elif record.startswith("u "):
+            status["paths"].append(record.split(" ", 10)[10])
+            status["tracked"].append(status["paths"][-1])
+            status["records"].append([record, status["paths"][-1]])
+        elif record.startswith("? "):
+            status["paths"].append(record[2:])
+            status["untracked"].append(record[2:])
+    status["paths"] = sorted(set(status["paths"]))
+    return status
 
 
 def require_git_root(root: Path) -> None:
-    result = run_git(root, ["rev-parse", "--show-toplevel"])
-    if result.returncode != 0:
-        die("ROOT must be a Git repository with an initial commit")
-    reported = Path(result.stdout.strip()).resolve()
-    if reported != root.resolve():
-        die(f"--root must be Git top-level: {reported}")
+    git_observer(root).require_root()
 
 
 def git_head(root: Path) -> str:
-    result = run_git(root, ["rev-parse", "HEAD"])
-    if result.returncode != 0:
-        die("repository needs an initial commit")
-    return result.stdout.strip()
+    return git_observer(root).head
 
 
 def git_branch(root: Path) -> str:
-    result = run_git(root, ["branch", "--show-current"])
-    return result.stdout.strip() if result.returncode == 0 else ""
+    return git_observer(root).branch
 
 
 def git_is_ancestor(root: Path, ancestor: str, descendant: str) -> bool:
@@ -47,16 +329,19 @@ def is_tool_storage_path(path: str) -> bool:
     )
 
 
-def raw_dirty_paths(root: Path) -> list[str]:
-    result = run_git(root, ["status", "--porcelain=v1", "--untracked-files=all"])
-    if result.returncode != 0:
-        die(f"git status failed: {result.stderr.strip()}")
-    paths = (line[3:].split(" -> ", 1)[-1] for line in result.stdout.splitlines())
-    return sorted({path for path in paths if path})
+def raw_dirty_paths(root: Path, scope=None) -> list[str]:
+    return git_observer(root).dirty_paths(scope)
+
 
+def git_dirty_paths(root: Path, scope=None) -> list[str]:
+    return [path for path in raw_dirty_paths(root, scope) if not is_tool_storage_path(path)]
 
-def git_dirty_paths(root: Path) -> list[str]:
-    return [path for path in raw_dirty_paths(root) if not is_tool_storage_path(path)]
+
+def is_runtime_artifact(path: str) -> bool:
+    """Machine-local files planctl keeps beside the store; they never travel with a handoff."""
+    parts = path.split("/")
+    return path in {"plans/.planctl.lock", "qing-plans/.planctl.lock"} or path.startswith(f"qing-plans/{CACHE_DIR}/") or (
+        len(parts) == 4 and parts[0] == "qing-plans" and parts[2] == "events" and parts[3] in {"index.ndjson", "index-meta.json"})
 
 
 def migration_dirty_paths(root: Path) -> list[str]:
@@ -64,23 +349,13 @@ def migration_dirty_paths(root: Path) -> list[str]:
     return [path for path in raw_dirty_paths(root) if path != "plans/.planctl.lock"]
 
 
-def handoff_dirty_paths(root: Path) -> list[str]:
+def handoff_dirty_paths(root: Path, scope=None) -> list[str]:
     """Return every uncommitted path that another computer would not receive."""
-    ignored = {"plans/.planctl.lock", "qing-plans/.planctl.lock"}
-    return [path for path in raw_dirty_paths(root) if path not in ignored]
+    return [path for path in raw_dirty_paths(root, scope) if not is_runtime_artifact(path)]
 
 
 def git_push_state(root: Path) -> dict:
-    upstream = run_git(root, ["rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"])
-    if upstream.returncode != 0:
-        return {"status": "no-upstream", "upstream": None, "ahead": None, "behind": None}
-    name = upstream.stdout.strip()
-    counts = run_git(root, ["rev-list", "--left-right", "--count", f"{name}...HEAD"])
-    if counts.returncode != 0:
-        return {"status": "unknown", "upstream": name, "ahead": None, "behind": None}
-    behind, ahead = (int(value) for value in counts.stdout.split())
-    return {"status": "pushed" if ahead == 0 else "unpushed", "upstream": name,
-            "ahead": ahead, "behind": behind}
+    return git_observer(root).push_state()
 
 
 def capture_activation_baseline(root: Path) -> str:
@@ -107,30 +382,71 @@ def parse_name_status(output: str) -> dict[str, dict]:
     return changes
 
 
-def git_change_map(root: Path, baseline: str | None) -> dict[str, dict]:
+def git_change_map(root: Path, baseline: str | None, scope=None) -> dict[str, dict]:
     if not baseline:
         return {}
-    require_git_root(root)
-    result = run_git(root, ["diff", "--find-renames", "--name-status", baseline])
-    if result.returncode != 0:
-        die(f"git diff failed for {baseline}: {result.stderr.strip()}")
-    changes = parse_name_status(result.stdout)
-    untracked = run_git(root, ["ls-files", "--others", "--exclude-standard"])
-    if untracked.returncode != 0:
-        die(f"untracked scan failed: {untracked.stderr.strip()}")
-    for path in untracked.stdout.splitlines():
-        if path:
-            changes[path] = {"action": "create", "from": None}
-    return {path: info for path, info in changes.items() if not is_tool_storage_path(path)}
+    return git_observer(root).change_map(baseline, scope)
+
+
+_HASH_CACHE: dict = {"path": None, "entries": None, "dirty": False}
+
+
+def configure_hash_cache(path: Path | None) -> None:
+    """Point sha256_file at a persistent cache for this command, or disable it with None."""
+    _HASH_CACHE.update({"path": path, "entries": None, "dirty": False})
+
+
+def hash_cache_entries() -> dict | None:
+    if _HASH_CACHE["path"] is None:
+        return None
+    if _HASH_CACHE["entries"] is None:
+        try:
+            data = json.loads(_HASH_CACHE["path"].read_text(encoding="utf-8"))
+            _HASH_CACHE["entries"] = data["entries"] if data.get("schemaVersion") == 1 else {}
+        except (OSError, ValueError, KeyError, AttributeError):
+            _HASH_CACHE["entries"] = {}
+    return _HASH_CACHE["entries"]
+
+
+def flush_hash_cache() -> None:
+    path = _HASH_CACHE["path"]
+    # Only a store that exists gets a cache; a failed first `create` must leave nothing behind.
+    if not _HASH_CACHE["dirty"] or path is None or not (path.parent.parent / "index.json").exists():
+        return
+    entries = _HASH_CACHE["entries"]
+    for key in list(entries)[:max(0, len(entries) - HASH_CACHE_ENTRIES)]:
+        del entries[key]
+    with contextlib.suppress(OSError):
+        write_json(path, {"schemaVersion": 1, "entries": entries})
+    _HASH_CACHE["dirty"] = False
 
 
 def sha256_file(path: Path) -> str | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
     if not path.is_file():
         return None
+    entries = hash_cache_entries()
+    key = str(path)
+    if entries is not None:
+        cached = entries.pop(key, None)
+        # Like Git's racy-clean check: a file modified within the timestamp granularity of
+        # its hashing could change again without moving mtime, so such entries are re-read.
+        if cached and cached[:3] == [stat.st_size, stat.st_mtime_ns, stat.st_ino] and \
+                cached[3] - stat.st_mtime_ns > RACY_MTIME_NS:
+            entries[key] = cached
+            _HASH_CACHE["dirty"] = True
+            return cached[4]
+    hashed_at = time.time_ns()
     digest = hashlib.sha256()
     with path.open("rb") as handle:
         for chunk in iter(lambda: handle.read(1024 * 1024), b""):
             digest.update(chunk)
+    if entries is not None:
+        entries[key] = [stat.st_size, stat.st_mtime_ns, stat.st_ino, hashed_at, digest.hexdigest()]
+        _HASH_CACHE["dirty"] = True
     return digest.hexdigest()
 
 
@@ -84,9 +84,9 @@ def migrated_item_observations(item: dict) -> list[dict]:
 
 
 def migrated_frozen_status(entry: dict, plan: dict, old_status: dict | None, project_map: dict) -> dict:
-    items = all_items(plan)
-    item_lookup = item_map(plan)
-    map_view = project_map_projection(plan, project_map)
+    plan_index = PlanIndex(plan)
+    items, item_lookup = plan_index.order, plan_index.items
+    map_view = project_map_projection(plan, project_map, plan_index)
     phases = [
         {**phase, "items": [
             {**item, "readiness": item_readiness(item, item_lookup)[0], "blockedBy": item_readiness(item, item_lookup)[1],
@@ -104,7 +104,7 @@ def migrated_frozen_status(entry: dict, plan: dict, old_status: dict | None, pro
                     "changedModules": len(map_view["directModules"]), "affectedModules": len(map_view["affectedModules"])},
         "handoff": {**plan["checkpoint"], "portability": "unknown", "warnings": ["Migrated terminal snapshot; V1 attribution is preserved as unknown"],
                     "nextAction": {"type": "terminal", "message": entry["state"]}},
-        "phases": phases, "phaseGraph": phase_graph_projection(plan),
+        "phases": phases, "phaseGraph": phase_graph_projection(plan, plan_index),
         "changeCoverage": (old_status or {}).get("changeCoverage", {}),
         "documentationImpact": (old_status or {}).get("documentationImpact", {}),
         "projectMap": map_view, "reviews": plan["reviews"], "amendments": [],
@@ -118,7 +118,7 @@ def migration_inventory(old: Path) -> dict:
     index = read_json(old / "index.json")
     return {
         "plans": len(index.get("plans", [])),
-        "events": sum(1 for path in files if path.parent.name == "events" and path.suffix == ".json"),
+        "events": sum(sum(1 for _ in iter_events(directory)) for directory in sorted(old.glob("*/events"))),
         "files": [{"path": str(path.relative_to(old)), "sha256": sha256_file(path)} for path in files],
     }
 
@@ -152,11 +152,10 @@ def cmd_migrate_store(args: argparse.Namespace, root: Path) -> dict:
             slug = entry["slug"]
             converted = convert_legacy_plan(read_json(old / slug / "plan.json"), entry)
             atomic_json(stage / slug / "plan.json", converted)
-            for source in sorted((old / slug / "events").glob("*.json")):
-                data = read_json(source)
-                data["legacySchemaVersion"] = data.get("schemaVersion")
-                data["schemaVersion"] = 2
-                atomic_json(stage / slug / "events" / source.name, data)
+            converted_events = [{**data, "legacySchemaVersion": data.get("schemaVersion"), "schemaVersion": 2}
+                                for data in iter_events(old / slug / "events")]
+            if converted_events:
+                write_event_records(stage / slug / "events", converted_events)
             old_status_path = old / slug / "status.json"
             if entry["state"] in TERMINAL_STATES:
                 old_status = read_json(old_status_path) if old_status_path.exists() else None
@@ -177,6 +176,7 @@ def cmd_migrate_store(args: argparse.Namespace, root: Path) -> dict:
             die("staged V2 validation failed: " + "; ".join(errors))
         os.replace(stage, new)
         st._STORE_OVERRIDE = new
+        git_observer(root).invalidate()
         for entry in new_index["plans"]:
             if entry["state"] not in TERMINAL_STATES:
                 render_status(root, entry, read_json(new / entry["slug"] / "plan.json"), project_map)
@@ -188,3 +188,48 @@ def cmd_migrate_store(args: argparse.Namespace, root: Path) -> dict:
             shutil.rmtree(stage)
         if not new.exists():
             st._STORE_OVERRIDE, st._USING_LEGACY = old_override, old_flag
+
+
+def compact_plan_events(directory: Path) -> dict:
+    """Fold per-file events into segments, oldest first, keeping every eventId.
+
+    Re-running after an interruption is safe: events already in a segment are not appended
+    again, and the per-file copies are only deleted once the segments are fsync'd.
+    """
+    files = legacy_event_files(directory)
+    if not files:
+        return {"converted": 0, "segments": len(event_segment_files(directory))}
+    segmented = [record for path in event_segment_files(directory) for record in segment_records(path)]
+    known = {record["eventId"] for record in segmented}
+    legacy = [record for record in (read_json(path) for path in files) if record.get("eventId") not in known]
+    occurred = lambda record: record.get("occurredAt") or ""
+    if segmented and legacy and min(map(occurred, legacy)) < max(map(occurred, segmented)):
+        # Events were appended to segments before the old files were converted. Rewrite the
+        # log beside the current one so it stays in occurrence order, then swap files in.
+        staging = directory / ".compact"
+        shutil.rmtree(staging, ignore_errors=True)
+        merged = {record["eventId"]: record for record in sorted(segmented + legacy, key=lambda r: (occurred(r), r["eventId"]))}
+        write_event_records(staging, list(merged.values()))
+        rewritten = {path.name for path in event_segment_files(staging)}
+        for path in event_segment_files(staging) + [staging / EVENT_MANIFEST]:
+            os.replace(path, directory / path.name)
+        for path in event_segment_files(directory):
+            if path.name not in rewritten:
+                path.unlink()
+        # The staged event index describes the staging directory; the next reader rebuilds it here.
+        shutil.rmtree(staging)
+    elif legacy:
+        write_event_records(directory, legacy)
+    for path in files:
+        path.unlink()
+    return {"converted": len(files), "segments": len(event_segment_files(directory))}
+
+
+def cmd_compact_events(args: argparse.Namespace, root: Path) -> dict:
+    index = load_index(root)
+    slugs = [args.plan] if args.plan else [entry["slug"] for entry in index["plans"]]
+    plans = []
+    for slug in slugs:
+        find_entry(index, slug)
+        plans.append({"slug": slug, **compact_plan_events(events_dir(root, slug))})
+    return {"compacted": True, "plans": plans, "convertedEvents": sum(plan["converted"] for plan in plans)}
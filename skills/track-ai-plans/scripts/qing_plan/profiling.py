@@ -0,0 +1,160 @@
+"""`planctl --profile`: time the expensive layers of one command without changing its output.
+
+Modules import each other with `from .x import *`, so a helper such as `read_json` is bound
+in every module namespace. Profiling swaps the binding everywhere it points at the original
+function and restores it afterwards; nothing is patched unless `--profile` is given.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+PROFILED = {
+    "git": ["run_git"],
+    "json": ["read_json", "atomic_json", "write_json"],
+    "hash": ["sha256_file"],
+    "validate": [],  # every validate_* function in domain.py
+    "projection": ["compute_change_coverage", "compute_documentation_impact", "project_map_projection",
+                   "phase_graph_projection", "next_action", "handoff_projection", "status_projection", "render_status"],
+}
+
+_ACTIVE: Profiler | None = None
+
+
+class Profiler:
+    """Chrome trace-event spans plus per-function counters for one command."""
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.origin = time.perf_counter_ns()
+        self.events: list[dict] = []
+        self.totals: dict[tuple[str, str], list] = {}
+        self.peak_bytes: int | None = None
+
+    def record(self, name: str, category: str, started_ns: int, ended_ns: int, args: dict | None = None) -> None:
+        duration = ended_ns - started_ns
+        self.events.append({"name": name, "cat": category, "ph": "X", "ts": (started_ns - self.origin) / 1000,
+                            "dur": duration / 1000, "pid": os.getpid(), "tid": threading.get_ident(), **({"args": args} if args else {})})
+        total = self.totals.setdefault((category, name), [0, 0, 0])
+        total[0] += 1
+        total[1] += duration
+        total[2] = max(total[2], duration)
+
+    def wrap(self, name: str, category: str, function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, category, started, time.perf_counter_ns(), span_args(name, args))
+        return timed
+
+    def trace(self, wall_ns: int) -> dict:
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": f"planctl {self.command}"}},
+                  {"name": self.command, "cat": "command", "ph": "X", "ts": 0, "dur": wall_ns / 1000, "pid": os.getpid(),
+                   "tid": threading.get_ident()}]
+        metadata = {"command": self.command, "wallMs": round(wall_ns / 1e6, 3)}
+        if self.peak_bytes is not None:
+            metadata["tracemallocPeakBytes"] = self.peak_bytes
+        return {"traceEvents": events + self.events, "displayTimeUnit": "ms", "otherData": metadata}
+
+    def summary(self, wall_ns: int, trace_path: Path | None) -> str:
+        rows = sorted(self.totals.items(), key=lambda row: -row[1][1])
+        width = max([len(name) for (_, name) in self.totals] + [8])
+        lines = [f"planctl profile: {self.command} {wall_ns / 1e6:.1f} ms wall"]
+        if self.peak_bytes is not None:
+            lines[0] += f", tracemalloc peak {self.peak_bytes / 1024 / 1024:.1f} MiB"
+        lines.append(f"  {'category':<10} {'function':<{width}} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}")
+        for (category, name), (calls, total, longest) in rows:
+            lines.append(f"  {category:<10} {name:<{width}} {calls:>6} {total / 1e6:>10.2f} {total / calls / 1e6:>9.3f} {longest / 1e6:>9.2f}")
+        by_category: dict[str, int] = {}
+        for (category, _), (_, total, _) in self.totals.items():
+            by_category[category] = by_category.get(category, 0) + total
+        if by_category:
+            # Categories nest (projection calls git and json), so these are inclusive times.
+            lines.append("  inclusive: " + ", ".join(f"{category} {total / 1e6:.1f} ms"
+                                                     for category, total in sorted(by_category.items(), key=lambda row: -row[1])))
+        if trace_path:
+            lines.append(f"  trace: {trace_path}")
+        return "\n".join(lines)
+
+
+def span_args(name: str, args: tuple) -> dict | None:
+    """A short label for a span: the git subcommand or the file name, never file contents."""
+    if name == "run_git" and len(args) > 1:
+        return {"argv": " ".join(str(value) for value in args[1][:3])}
+    if args and isinstance(args[0], Path):
+        return {"path": args[0].name}
+    return None
+
+
+def active_profiler() -> Profiler | None:
+    return _ACTIVE
+
+
+def install(profiler: Profiler) -> list[tuple[object, str, object]]:
+    """Bind wrapped helpers in every loaded qing_plan module; returns what to restore."""
+    domain = sys.modules.get(f"{__package__}.domain")
+    targets = {name: category for category, names in PROFILED.items() for name in names}
+    targets.update({name: "validate" for name in vars(domain) if name.startswith("validate_")} if domain else {})
+    originals: dict[str, object] = {}
+    for module_name in ("storage", "git", "domain", "projection"):
+        module = sys.modules.get(f"{__package__}.{module_name}")
+        for name in targets:
+            function = vars(module).get(name) if module else None
+            if function is not None and getattr(function, "__module__", None) == module.__name__:
+                originals[name] = function
+    wrapped = {name: profiler.wrap(name, targets[name], function) for name, function in originals.items()}
+    patched = []
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith(f"{__package__}.") or module is None:
+            continue
+        for name, function in wrapped.items():
+            if vars(module).get(name) is originals[name]:
+                patched.append((module, name, originals[name]))
+                setattr(module, name, function)
+    return patched
+
+
+@contextlib.contextmanager
+def profiling(command: str, *, trace_path: Path | None, memory: bool, keep: int | None = None):
+    """Profile the enclosed command; writes the trace file and the stderr summary on exit.
+
+    With `keep`, only the newest `keep` planctl traces in the trace's directory are kept.
+    """
+    global _ACTIVE
+    profiler = Profiler(command)
+    patched = install(profiler)
+    started_memory = memory and not tracemalloc.is_tracing()
+    if started_memory:
+        tracemalloc.start()
+    _ACTIVE = profiler
+    started = time.perf_counter_ns()
+    try:
+        yield profiler
+    finally:
+        wall = time.perf_counter_ns() - started
+        _ACTIVE = None
+        if memory:
+            profiler.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if started_memory:
+                tracemalloc.stop()
+        for module, name, original in patched:
+            setattr(module, name, original)
+        if trace_path:
+            trace_path.parent.mkdir(parents=True, exist_ok=True)
+            trace_path.write_text(json.dumps(profiler.trace(wall)) + "\n", encoding="utf-8")
+            if keep:
+                traces = sorted(trace_path.parent.glob("planctl-*.json"), key=lambda path: path.stat().st_mtime_ns)
+                for stale in traces[:-keep]:
+                    stale.unlink(missing_ok=True)
+        print(profiler.summary(wall, trace_path), file=sys.stderr)
@@ -2,17 +2,18 @@
 
 from __future__ import annotations
 
+from . import storage as st
 from .storage import *
 from .git import *
 from .domain import *
 
 
-def compute_change_coverage(plan: dict, change_map: dict[str, dict]) -> dict:
-    covered, item_observations = set(), {}
-    for item in all_items(plan):
+def compute_change_coverage(plan: dict, change_map: dict[str, dict], plan_index: PlanIndex | None = None) -> dict:
+    plan_index = plan_index or PlanIndex(plan)
+    covered, item_observations = plan_index.owners.keys(), {}
+    for item in plan_index.order:
         observations = []
-        for expected in flatten_changes(item):
-            covered.add(expected["path"])
+        for expected in plan_index.files(item):
             observed = change_map.get(expected["path"])
             if observed is None:
                 state = "pending"
@@ -29,11 +30,12 @@ def compute_change_coverage(plan: dict, change_map: dict[str, dict]) -> dict:
                 "observedFrom": observed.get("from") if observed else None, "observedState": state,
             })
         item_observations[item["id"]] = observations
-    doc_patterns = [target["pattern"] for target in (plan.get("documentationImpact") or {}).get("targets", [])]
+    documentation = path_matcher(tuple((target["pattern"], target["pattern"])
+                                       for target in (plan.get("documentationImpact") or {}).get("targets", [])))
     off_plan = [
         {"path": path, "action": info["action"]}
         for path, info in sorted(change_map.items())
-        if path not in covered and not any(fnmatch.fnmatch(path, pattern) for pattern in doc_patterns)
+        if path not in covered and not documentation.matches_any(path)
     ]
     observations = [value for values in item_observations.values() for value in values]
     return {
@@ -51,8 +53,14 @@ def compute_documentation_impact(plan: dict, changes: dict[str, dict], has_basel
     if not has_baseline:
         return {"status": "skipped", **impact, "message": "plan is not active"}
     matched, missing = [], []
-    for target in impact.get("targets", []):
-        paths = [path for path in changes if fnmatch.fnmatch(path, target["pattern"])]
+    targets = impact.get("targets", [])
+    matcher = path_matcher(tuple((str(position), target["pattern"]) for position, target in enumerate(targets)))
+    paths_by_target: dict[str, list[str]] = {str(position): [] for position in range(len(targets))}
+    for path in changes:
+        for position in matcher.match(path):
+            paths_by_target[position].append(path)
+    for position, target in enumerate(targets):
+        paths = paths_by_target[str(position)]
         (matched if paths else missing).append({"pattern": target["pattern"], "matchedPaths": paths} if paths else target["pattern"])
     ok = not missing if impact.get("coverage") == "all" else bool(matched)
     return {
@@ -67,9 +75,10 @@ def module_relations(project_map: dict, module_id: str) -> tuple[list[str], list
     return upstream, downstream
 
 
-def project_map_projection(plan: dict, project_map: dict) -> dict:
-    direct_ids = {change.get("moduleId", "_unmapped") for item in all_items(plan) for change in item.get("changeSets", [])}
-    if any(item.get("noFileImpact") is True for item in all_items(plan)):
+def project_map_projection(plan: dict, project_map: dict, plan_index: PlanIndex | None = None) -> dict:
+    plan_index = plan_index or PlanIndex(plan)
+    direct_ids = {change.get("moduleId", "_unmapped") for item in plan_index.order for change in item.get("changeSets", [])}
+    if any(item.get("noFileImpact") is True for item in plan_index.order):
         direct_ids.add("_cross-cutting")
     direct = sorted(direct_ids)
     affected = set()
@@ -83,12 +92,12 @@ def project_map_projection(plan: dict, project_map: dict) -> dict:
         modules.append({**module, "upstream": upstream, "downstream": downstream,
                         "impact": "changed" if module["id"] in direct else "affected" if module["id"] in affected else "unchanged"})
     warnings = []
-    normal = [m for m in project_map.get("modules", []) if not m["id"].startswith("_")]
-    for item in all_items(plan):
-        for file in flatten_changes(item):
+    matcher = module_matcher(project_map)
+    for item in plan_index.order:
+        for file in plan_index.files(item):
             if file.get("moduleId") == "_unmapped":
                 warnings.append({"type": "unmapped", "itemId": item["id"], "path": file["path"]})
-            matches = [m["id"] for m in normal if any(fnmatch.fnmatch(file["path"], p) for p in m.get("pathPatterns", []))]
+            matches = matcher.match(file["path"])
             if len(matches) > 1:
                 warnings.append({"type": "ambiguous", "itemId": item["id"], "path": file["path"], "modules": matches})
             elif matches and file.get("moduleId") not in matches:
@@ -98,19 +107,11 @@ def project_map_projection(plan: dict, project_map: dict) -> dict:
             "affectedModules": sorted(affected), "warnings": warnings}
 
 
-def phase_graph_projection(plan: dict) -> dict:
+def phase_graph_projection(plan: dict, plan_index: PlanIndex | None = None) -> dict:
     """Project phase flow plus the task graph owned by each phase."""
+    plan_index = plan_index or PlanIndex(plan)
     phases = plan.get("phases", [])
-    items = {
-        item["id"]: item
-        for phase in phases
-        for item in phase.get("items", [])
-    }
-    item_phase = {
-        item["id"]: phase["id"]
-        for phase in phases
-        for item in phase.get("items", [])
-    }
+    item_phase = plan_index.phase_of
     dependencies: set[tuple[str, str]] = set()
     for phase in phases:
         for item in phase.get("items", []):
@@ -128,7 +129,7 @@ def phase_graph_projection(plan: dict) -> dict:
     projected = []
     for order, phase in enumerate(phases):
         phase_items = phase.get("items", [])
-        files = [file for item in phase_items for file in flatten_changes(item)]
+        files = [file for item in phase_items for file in plan_index.files(item)]
         modules = {file.get("moduleId") for file in files if file.get("moduleId")}
         if any(item.get("noFileImpact") is True for item in phase_items):
             modules.add("_cross-cutting")
@@ -141,13 +142,11 @@ def phase_graph_projection(plan: dict) -> dict:
                     internal_dependencies.append(edge)
                 else:
                     incoming_dependencies.append({**edge, "fromPhaseId": dependency_phase})
-            for consumer in items.values():
-                if item["id"] not in consumer.get("dependsOn", []):
-                    continue
-                consumer_phase = item_phase.get(consumer["id"])
+            for consumer_id in plan_index.consumers.get(item["id"], []):
+                consumer_phase = item_phase.get(consumer_id)
                 if consumer_phase != phase["id"]:
                     outgoing_dependencies.append({
-                        "itemId": item["id"], "consumerId": consumer["id"], "toPhaseId": consumer_phase,
+                        "itemId": item["id"], "consumerId": consumer_id, "toPhaseId": consumer_phase,
                     })
         projected.append({
             "id": phase["id"], "title": phase.get("title"), "order": order,
@@ -182,11 +181,6 @@ def phase_graph_projection(plan: dict) -> dict:
     }
 
 
-def dependencies_done(plan: dict, item: dict) -> bool:
-    items = item_map(plan)
-    return all(items.get(dep, {}).get("status") == "done" for dep in item.get("dependsOn", []))
-
-
 def item_readiness(item: dict, items: dict[str, dict]) -> tuple[str, list[str]]:
     if item["status"] != "not-started":
         return item["status"], []
@@ -194,7 +188,7 @@ def item_readiness(item: dict, items: dict[str, dict]) -> tuple[str, list[str]]:
     return ("blocked", blockers) if blockers else ("ready", [])
 
 
-def next_action(entry: dict, plan: dict, project_map: dict | None = None) -> dict:
+def next_action(entry: dict, plan: dict, project_map: dict | None = None, plan_index: PlanIndex | None = None) -> dict:
     if entry["state"] in TERMINAL_STATES:
         return {"type": "terminal", "message": f"Plan is {entry['state']} and frozen"}
     if entry["state"] == "draft":
@@ -209,22 +203,77 @@ def next_action(entry: dict, plan: dict, project_map: dict | None = None) -> dic
     pending = next((a for a in plan.get("amendments", []) if a.get("status") == "pending-review"), None)
     if pending:
         return {"type": "amendment-gate", "id": pending["id"], "message": "Review or apply the pending amendment"}
-    running = next((i for i in all_items(plan) if i["status"] == "in-progress"), None)
+    plan_index = plan_index or PlanIndex(plan)
+    running = plan_index.first("in-progress")
     if running:
         return {"type": "continue-item", "id": running["id"], "message": running["title"]}
-    stopped = next((i for i in all_items(plan) if i["status"] in {"failed", "blocked"}), None)
+    stopped = plan_index.first("failed", "blocked")
     if stopped:
         return {"type": "address-item", "id": stopped["id"], "message": stopped.get("reason") or stopped["title"]}
-    items = item_map(plan)
-    ready = next((i for i in all_items(plan) if item_readiness(i, items)[0] == "ready"), None)
+    ready = next(iter(plan_index.ready_queue()), None)
     if ready:
         return {"type": "start-item", "id": ready["id"], "message": ready["title"]}
-    if all_items(plan) and all(i["status"] == "done" for i in all_items(plan)):
+    if plan_index.all_done():
         return {"type": "completion-check", "message": "Run completion checks"}
     return {"type": "plan-empty", "message": "Add executable items before activation"}
 
 
-def handoff_projection(root: Path, entry: dict, plan: dict, project_map: dict) -> dict:
+def schedule_projection(plan: dict, plan_index: PlanIndex | None = None) -> dict:
+    """Ranked ready queue, critical path, and a completion forecast for the unfinished items.
+
+    Estimates come from past execution attempts (see `PlanIndex.estimate`); without any,
+    chains are measured in items and no ETA is given.
+    """
+    plan_index = plan_index or PlanIndex(plan)
+    downstream, lanes = plan_index.downstream, execution_lanes(plan)
+    timed = bool(plan_index.attempt_seconds[None])
+
+    def seconds(value: float) -> float | None:
+        return round(value, 1) if timed else None
+
+    queue = []
+    for rank, item in enumerate(plan_index.ready_queue(), 1):
+        found = downstream.get(item["id"], {})
+        queue.append({"id": item["id"], "rank": rank, "chainItems": found.get("length", 1), "fanOut": found.get("fanOut", 0),
+                      "unblocks": found.get("unblocks", 0), "estimateSeconds": seconds(found.get("estimate", 0.0)),
+                      "chainSeconds": seconds(found.get("chain", 0.0))})
+    path, step = [], max(downstream, key=lambda item_id: (downstream[item_id]["chain"], -plan_index.position[id(plan_index.items[item_id])]),
+                         default=None)
+    while step:
+        path.append(step)
+        step = downstream[step]["next"]
+    critical = downstream[path[0]]["chain"] if path else 0.0
+    remaining = sum(found["estimate"] for found in downstream.values())
+    # Neither the longest chain nor the total work spread over every lane can finish sooner.
+    span = max(critical, remaining / lanes)
+    eta = {"seconds": round(span), "lanes": lanes} if timed and downstream else None
+    return {"basis": "execution-history" if timed else "item-count", "samples": len(plan_index.attempt_seconds[None]),
+            "readyQueue": queue, "criticalPath": {"items": path, "seconds": seconds(critical)},
+            "remaining": {"items": len(downstream), "seconds": seconds(remaining)}, "eta": eta}
+
+
+def next_actions(entry: dict, plan: dict, project_map: dict | None = None, plan_index: PlanIndex | None = None) -> list[dict]:
+    """`next_action` first; with execution lanes, every running, stopped, and admissible item.
+
+    Start actions carry the lane they would take and never share a declared path with a
+    running item or with each other, so an orchestrator can hand them out at once.
+    """
+    plan_index = plan_index or PlanIndex(plan)
+    action = next_action(entry, plan, project_map, plan_index)
+    lanes = execution_lanes(plan)
+    if lanes == 1 or action["type"] not in {"continue-item", "address-item", "start-item"}:
+        return [action]
+    actions = [{"type": "continue-item", "id": item["id"], "message": item["title"], "lane": (item.get("execution") or {}).get("lane")}
+               for item in plan_index.by_status.get("in-progress", [])]
+    actions += [{"type": "address-item", "id": item["id"], "message": item.get("reason") or item["title"]}
+                for item in sorted(plan_index.by_status.get("failed", []) + plan_index.by_status.get("blocked", []),
+                                   key=lambda item: plan_index.position[id(item)])]
+    actions += [{"type": "start-item", "id": item["id"], "message": item["title"], "lane": lane}
+                for item, lane in plan_index.admissible(lanes)]
+    return actions
+
+
+def handoff_projection(root: Path, entry: dict, plan: dict, project_map: dict, plan_index: PlanIndex | None = None) -> dict:
     checkpoint = plan.get("checkpoint") or {}
     current_head = git_head(root) if entry.get("baselineCommit") else None
     current_branch = git_branch(root) if entry.get("baselineCommit") else None
@@ -238,7 +287,7 @@ def handoff_projection(root: Path, entry: dict, plan: dict, project_map: dict) -
         # signals a real problem.
         if not git_is_ancestor(root, checkpoint["headCommit"], current_head):
             warnings.append("HEAD has diverged from the checkpoint commit (not a descendant of it); inspect commits before continuing")
-    dirty_paths = handoff_dirty_paths(root) if entry.get("baselineCommit") else []
+    dirty_paths = handoff_dirty_paths(root, plan_scan_scope(root, plan, project_map, plan_index)) if entry.get("baselineCommit") else []
     push = git_push_state(root) if entry.get("baselineCommit") else {"status": "unknown"}
     if push.get("status") == "no-upstream":
         warnings.append("branch has no upstream; another computer may not be able to fetch this checkpoint")
@@ -252,67 +301,285 @@ def handoff_projection(root: Path, entry: dict, plan: dict, project_map: dict) -
         **checkpoint, "currentBranch": current_branch, "currentHead": current_head,
         "currentPlanRevision": plan.get("revision"), "currentProjectMapRevision": project_map.get("revision"),
         "portability": portable, "currentDirtyPaths": dirty_paths, "push": push, "warnings": warnings,
-        "nextAction": next_action(entry, plan, project_map),
+        "nextAction": next_action(entry, plan, project_map, plan_index),
     }
 
 
-def status_projection(entry: dict, plan: dict, root: Path, project_map: dict) -> dict:
+REUSABLE_SECTIONS = ("changeCoverage", "documentationImpact", "phases", "derivedIssues", "projectMap", "phaseGraph")
+
+
+def status_section_keys(entry: dict, plan: dict, root: Path, project_map: dict) -> dict:
+    """Fingerprint the inputs of each expensive status section.
+
+    A section whose key matches the one recorded for the previous status.json is copied
+    from it instead of being recomputed; handoff, summary, and next action always are.
+    """
+    baseline = entry.get("baselineCommit")
+    phases = fingerprint(plan.get("phases", []))
+    documentation = fingerprint(plan.get("documentationImpact"))
+    observed = [baseline, git_observer(root).fingerprint(baseline, plan_scan_scope(root, plan, project_map)) if baseline else None]
+    return {
+        "changeCoverage": fingerprint([phases, documentation, observed]),
+        "documentationImpact": fingerprint([documentation, observed]),
+        "phases": fingerprint([phases, documentation, observed]),
+        "derivedIssues": fingerprint([phases, documentation, observed]),
+        "projectMap": fingerprint([phases, fingerprint(project_map)]),
+        "phaseGraph": phases,
+    }
+
+
+def status_keys_path(root: Path, slug: str) -> Path:
+    return store_dir(root) / CACHE_DIR / "status" / f"{slug}.json"
+
+
+def previous_status_sections(root: Path, slug: str, keys: dict) -> dict:
+    """Sections of the status.json on disk whose recorded input keys still match."""
+    try:
+        recorded = json.loads(status_keys_path(root, slug).read_text(encoding="utf-8"))
+        if recorded.get("statusSha256") != hashlib.sha256(json_bytes(read_json(status_path(root, slug)))).hexdigest():
+            # The keys describe one exact status.json; an edited, merged, or pulled file is not trusted.
+            return {}
+        status = read_status(root, slug)
+    except (OSError, ValueError, PlanError):
+        return {}
+    return {name: status[name] for name in REUSABLE_SECTIONS
+            if name in status and recorded.get("keys", {}).get(name) == keys[name]}
+
+
+def status_projection(entry: dict, plan: dict, root: Path, project_map: dict, *, keys: dict | None = None,
+                      reuse: bool = True) -> dict:
     # Terminal transitions call this exactly once to freeze the final observed tree.
     # Later reads use status.json and never recompute it.
-    changes = git_change_map(root, entry.get("baselineCommit")) if entry.get("baselineCommit") else {}
-    coverage = compute_change_coverage(plan, changes)
-    items = item_map(plan)
-    phases = []
-    for phase in plan.get("phases", []):
-        projected_items = []
-        for item in phase.get("items", []):
-            readiness, blockers = item_readiness(item, items)
-            projected_items.append({**item, "readiness": readiness, "blockedBy": blockers,
-                                    "observations": coverage["items"].get(item["id"], [])})
-        phases.append({**phase, "items": projected_items})
+    keys = keys or status_section_keys(entry, plan, root, project_map)
+    previous = previous_status_sections(root, entry["slug"], keys) if reuse else {}
+    plan_index = PlanIndex(plan)
+    items = plan_index.items
+    scope = plan_scan_scope(root, plan, project_map, plan_index)
+    changes = None
+
+    def observed_changes() -> dict:
+        nonlocal changes
+        if changes is None:
+            changes = git_change_map(root, entry.get("baselineCommit"), scope) if entry.get("baselineCommit") else {}
+        return changes
+
+    if "changeCoverage" in previous:
+        coverage = previous["changeCoverage"]
+    else:
+        coverage = compute_change_coverage(plan, observed_changes(), plan_index)
+        if scope is not None:
+            # Off-plan untracked files outside the scope go unseen; say so where they would be listed.
+            coverage["scanScope"] = "planned"
+    if "phases" in previous:
+        phases = previous["phases"]
+    else:
+        phases = []
+        for phase in plan.get("phases", []):
+            projected_items = []
+            for item in phase.get("items", []):
+                readiness, blockers = item_readiness(item, items)
+                projected_items.append({**item, "readiness": readiness, "blockedBy": blockers,
+                                        "observations": coverage["items"].get(item["id"], [])})
+            phases.append({**phase, "items": projected_items})
     done = sum(item["status"] == "done" for item in items.values())
     open_issues = [issue for issue in plan.get("issues", []) if issue.get("status") == "open"]
-    derived = []
-    for item in all_items(plan):
-        if item["status"] == "done":
+    derived = previous.get("derivedIssues")
+    if derived is None:
+        derived = []
+        for item in plan_index.by_status.get("done", []):
             for obs in coverage["items"].get(item["id"], []):
                 if obs["observedState"] != "change-observed":
                     derived.append({"type": "planned-file-mismatch", "severity": "critical", "itemId": item["id"], "observation": obs})
             attempts = item.get("executionAttempts") or ([item["execution"]] if item.get("execution") else [])
             attempt_observations = [observed for attempt in attempts for observed in attempt.get("observedFiles", [])]
-            for planned in flatten_changes(item):
+            for planned in plan_index.files(item):
                 matches = [observed for observed in attempt_observations if observed.get("path") == planned["path"]]
                 if not any(observed.get("observedAction") == planned.get("action") for observed in matches):
                     derived.append({"type": "item-attribution-mismatch", "severity": "critical", "itemId": item["id"],
                                     "observation": matches[-1] if matches else {"path": planned["path"], "plannedAction": planned["action"], "observedAction": None}})
-    map_view = project_map_projection(plan, project_map)
-    action = next_action(entry, plan, project_map)
+    map_view = previous.get("projectMap") or project_map_projection(plan, project_map, plan_index)
+    actions = next_actions(entry, plan, project_map, plan_index)
     return {
         "schemaVersion": SCHEMA_VERSION, "generatedAt": now(),
         "plan": {"slug": entry["slug"], "name": entry["name"], "goal": plan["goal"], "state": entry["state"],
-                 "revision": plan.get("revision"), "reviewPolicy": plan.get("reviewPolicy"), "baselineCommit": entry.get("baselineCommit")},
+                 "revision": plan.get("revision"), "updatedAt": entry.get("updatedAt"), "reviewPolicy": plan.get("reviewPolicy"),
+                 "baselineCommit": entry.get("baselineCommit")},
         "summary": {"completedItems": done, "totalItems": len(items), "openIssues": len(open_issues) + len(derived),
                     "changedModules": len(map_view["directModules"]), "affectedModules": len(map_view["affectedModules"])},
-        "handoff": handoff_projection(root, entry, plan, project_map), "phases": phases,
-        "phaseGraph": phase_graph_projection(plan),
-        "changeCoverage": coverage, "documentationImpact": compute_documentation_impact(plan, changes, bool(entry.get("baselineCommit"))),
+        "handoff": handoff_projection(root, entry, plan, project_map, plan_index), "phases": phases,
+        "phaseGraph": previous.get("phaseGraph") or phase_graph_projection(plan, plan_index),
+        "schedule": schedule_projection(plan, plan_index),
+        "changeCoverage": coverage,
+        "documentationImpact": previous["documentationImpact"] if "documentationImpact" in previous else
+        compute_documentation_impact(plan, observed_changes(), bool(entry.get("baselineCommit"))),
         "projectMap": map_view, "reviews": plan.get("reviews", []), "amendments": plan.get("amendments", []),
-        "issues": plan.get("issues", []), "derivedIssues": derived, "nextActions": [action],
+        "issues": plan.get("issues", []), "derivedIssues": derived, "nextActions": actions,
     }
 
 
-def render_status(root: Path, entry: dict, plan: dict, project_map: dict) -> dict:
-    status = status_projection(entry, plan, root, project_map)
-    atomic_json(status_path(root, entry["slug"]), status)
+def status_records(status: dict):
+    """A status document as NDJSON rows: everything but the phases, then each phase followed by its items."""
+    yield {"type": "status", **{key: value for key, value in status.items() if key != "phases"}}
+    for phase in status.get("phases", []):
+        yield {"type": "phase", **{key: value for key, value in phase.items() if key != "items"}}
+        for item in phase.get("items", []):
+            yield {"type": "item", "phaseId": phase.get("id"), **item}
+
+
+def change_records(changes: dict):
+    """`changes` as NDJSON rows: the totals, one row per item's observations, one per off-plan change."""
+    coverage = changes.get("changeCoverage") or {}
+    yield {"type": "changes", **changes,
+           "changeCoverage": {key: value for key, value in coverage.items() if key not in {"items", "offPlanChanges"}}}
+    for item_id, observations in coverage.get("items", {}).items():
+        yield {"type": "item", "itemId": item_id, "observations": observations}
+    for change in coverage.get("offPlanChanges", []):
+        yield {"type": "off-plan-change", **change}
+
+
+def shard_status(slug: str, status: dict) -> tuple[dict, dict[str, dict]]:
+    """Split a status document into the summary status.json holds and one shard per phase.
+
+    Each phase keeps its own fields in the summary, with `shard` naming the file of its
+    items in their place; a shard is named by the SHA-256 of its bytes, so one that did not
+    change keeps its name and is neither rewritten nor fetched again by the dashboard. The
+    per-item coverage repeats each item's `observations` and is left to the shards too.
+    """
+    shards, phases = {}, []
+    for phase in status.get("phases", []):
+        shard = {"schemaVersion": SCHEMA_VERSION, "planSlug": slug, "phaseId": phase.get("id"), "items": phase.get("items", [])}
+        name = f"{STATUS_SHARDS_DIR}/{hashlib.sha256(json_bytes(shard)).hexdigest()}.json"
+        shards[name] = shard
+        phases.append({(key if key != "items" else "shard"): (value if key != "items" else name) for key, value in phase.items()})
+    coverage = status.get("changeCoverage") or {}
+    coverage = {(key if key != "items" else "itemsInShards"): (value if key != "items" else True) for key, value in coverage.items()}
+    return {**status, "phases": phases, "changeCoverage": coverage}, shards
+
+
+def collect_status_shards(directory: Path, keep: set[str], *, grace: float = GENERATION_GRACE_SECONDS) -> None:
+    """Drop shards status.json no longer names once a pinned reader could no longer want them."""
+    cutoff = time.time() - grace
+    for path in (directory / STATUS_SHARDS_DIR).glob("*.json"):
+        with contextlib.suppress(OSError):
+            if f"{STATUS_SHARDS_DIR}/{path.name}" not in keep and path.stat().st_mtime < cutoff:
+                path.unlink()
+
+
+def render_status(root: Path, entry: dict, plan: dict, project_map: dict, *, full: bool = False) -> dict:
+    deferred = {"plan": {"slug": entry["slug"], "state": entry["state"], "revision": plan.get("revision"),
+                         "updatedAt": entry.get("updatedAt")}, "statusDeferred": True}
+    if defer_status_render(entry["slug"]):
+        return deferred
+    # A terminal status is the frozen final observation, and a plan without status.json yet
+    # has nothing a reader could show meanwhile; both render now even under --defer-status.
+    if st._DEFER_STATUS and entry["state"] not in TERMINAL_STATES and document_exists(status_path(root, entry["slug"])):
+        after_commit(lambda: queue_status_render(root, entry, plan, project_map))
+        return {**deferred, "statusQueued": True}
+    keys = status_section_keys(entry, plan, root, project_map)
+    status = status_projection(entry, plan, root, project_map, keys=keys, reuse=not full)
+    summary, shards = shard_status(entry["slug"], status)
+    directory = status_path(root, entry["slug"]).parent
+    for name, shard in shards.items():
+        # Named by content: a shard already on disk holds exactly these bytes.
+        if not (directory / name).exists():
+            atomic_json(directory / name, shard)
+    atomic_json(status_path(root, entry["slug"]), summary)
+    record = {"statusSha256": hashlib.sha256(json_bytes(summary)).hexdigest(), "keys": keys}
+    # Recorded only once status.json itself is on disk, so the pair can never disagree silently.
+    after_commit(lambda: write_status_keys(root, entry["slug"], record))
+    # A frozen status never renders again, so nothing later would collect what it leaves behind.
+    grace = 0 if entry["state"] in TERMINAL_STATES else GENERATION_GRACE_SECONDS
+    after_commit(lambda: collect_status_shards(directory, set(shards), grace=grace))
+    after_commit(lambda: status_stamp_path(root, entry["slug"]).unlink(missing_ok=True))
     return status
 
 
+def write_status_keys(root: Path, slug: str, record: dict) -> None:
+    if st._USING_LEGACY or not index_path(root).exists():
+        return
+    with contextlib.suppress(OSError):
+        write_json(status_keys_path(root, slug), record)
+
+
+def status_stamp_path(root: Path, slug: str) -> Path:
+    return store_dir(root) / CACHE_DIR / "status" / f"{slug}.pending.json"
+
+
+def read_status_stamp(root: Path, slug: str) -> dict | None:
+    try:
+        return json.loads(status_stamp_path(root, slug).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def pending_status_slugs(root: Path) -> list[str]:
+    """Plans whose status.json waits on the worker; a failed render stays put until refreshed."""
+    directory = store_dir(root) / CACHE_DIR / "status"
+    slugs = sorted(path.name[:-len(".pending.json")] for path in directory.glob("*.pending.json"))
+    return [slug for slug in slugs if "failed" not in (read_status_stamp(root, slug) or {})]
+
+
+def queue_status_render(root: Path, entry: dict, plan: dict, project_map: dict) -> None:
+    """Stamp status.json as behind this plan and map revision, then make sure a worker will render it.
+
+    Stamps coalesce: however many mutations queue a plan before the worker reaches it, it is
+    rendered once, from whatever the store holds by then.
+    """
+    previous = read_status_stamp(root, entry["slug"]) or {}
+    if "failed" in previous:
+        previous = {}
+    write_json(status_stamp_path(root, entry["slug"]), {
+        "planSlug": entry["slug"], "planRevision": plan.get("revision"), "projectMapRevision": project_map.get("revision"),
+        "planUpdatedAt": entry.get("updatedAt"), "pendingSince": previous.get("pendingSince") or now(),
+        "requests": previous.get("requests", 0) + 1})
+    start_status_worker(root)
+
+
+def start_status_worker(root: Path) -> None:
+    # The stamp is already on disk. A worker holding the lock rescans after releasing it, so
+    # either it sees this stamp or the lock is free here and a new worker starts.
+    if os.environ.get("PLANCTL_NO_STATUS_WORKER"):
+        return
+    with try_named_lock(root, "status-worker") as idle:
+        pass
+    if idle:
+        subprocess.Popen([sys.executable, str(Path(__file__).resolve().parent.parent / "planctl.py"), "--root", str(root),
+                          "status-worker"], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+
+
+def render_queued_status(root: Path, slug: str) -> None:
+    with repository_lock(root, shared=True), named_lock(root, f"plan-{slug}"), store_generation(root):
+        path = status_stamp_path(root, slug)
+        if not path.exists():
+            return
+        try:
+            entry = find_entry(load_index(root), slug)
+            render_status(root, entry, read_json(plan_path(root, slug)), load_project_map(root))
+        except PlanError as exc:
+            write_json(path, {**(read_status_stamp(root, slug) or {"planSlug": slug}), "failed": str(exc)})
+
+
+def drain_status_queue(root: Path) -> list[str]:
+    """Render every queued status until the queue stays empty; leave it to a running worker instead."""
+    rendered = []
+    while pending_status_slugs(root):
+        with try_named_lock(root, "status-worker") as owner:
+            if not owner:
+                break
+            while slugs := pending_status_slugs(root):
+                for slug in slugs:
+                    render_queued_status(root, slug)
+                    rendered.append(slug)
+    return rendered
+
+
 def save_plan(root: Path, index: dict, entry: dict, plan: dict, project_map: dict | None = None) -> dict:
     timestamp = now()
     plan["updatedAt"] = timestamp
     entry["updatedAt"] = timestamp
     atomic_json(plan_path(root, entry["slug"]), plan)
-    if project_map is not None:
+    if project_map is not None and may_write_project_map():
         atomic_json(map_path(root), project_map)
     save_index(root, index)
     return render_status(root, entry, plan, project_map or load_project_map(root))
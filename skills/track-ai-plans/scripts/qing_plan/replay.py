@@ -0,0 +1,299 @@
+"""Rebuild plan documents by folding their event logs, resuming from periodic snapshots."""
+
+from __future__ import annotations
+
+from . import storage as st
+from .storage import *
+
+REPLAY_DIR = "replay"
+REPLAY_FORMAT = 1
+REPLAY_SNAPSHOT_EVENTS = 1000
+REPLAY_SNAPSHOTS_KEPT = 2
+# Stamped by save_plan (and left alone by switch), never recorded by an event.
+UNREPLAYED_FIELDS = ("updatedAt",)
+
+
+class ReplayGap(PlanError):
+    """The log holds an event written before events recorded everything replay needs."""
+
+
+class PlanFold:
+    """A plan being rebuilt, with item and phase lookups kept current as events add to it."""
+
+    def __init__(self, plan: dict) -> None:
+        self.plan = plan
+        self.phases = {phase["id"]: phase for phase in plan["phases"]}
+        self.items = {item["id"]: item for phase in plan["phases"] for item in phase["items"]}
+
+    def add_phase(self, phase: dict) -> None:
+        self.plan["phases"].append(phase)
+        self.phases[phase["id"]] = phase
+        self.items.update((item["id"], item) for item in phase["items"])
+
+    def add_item(self, phase_id: str, item: dict) -> None:
+        self.phases[phase_id]["items"].append(item)
+        self.items[item["id"]] = item
+
+    def bump(self) -> None:
+        self.plan["revision"] = int(self.plan.get("revision", 0)) + 1
+
+
+def recorded(record: dict, *keys: str) -> list:
+    details = record["details"]
+    missing = [key for key in keys if key not in details]
+    if missing:
+        raise ReplayGap(f"event {record.get('eventId')} ({record.get('type')}) predates replay and lacks {', '.join(missing)}")
+    return [details[key] for key in keys]
+
+
+def fold_item_state(fold: PlanFold, item_id: str, state: dict) -> None:
+    """Mirror set_item_state: a start opens an execution attempt, a stop closes the latest."""
+    item = fold.items[item_id]
+    started = state["status"] == "in-progress" and item["status"] != "in-progress"
+    stopped = item["status"] == "in-progress" and state["status"] != "in-progress" and state.get("execution")
+    item.update(state)
+    if started:
+        item.setdefault("executionAttempts", []).append(copy.deepcopy(state["execution"]))
+    elif stopped and item.get("executionAttempts"):
+        item["executionAttempts"][-1] = copy.deepcopy(state["execution"])
+
+
+def fold_amendment(fold: PlanFold, amendment: dict, items: list[dict]) -> None:
+    """Apply an amendment's plan operations; the items it added or edited come recorded whole."""
+    recorded_items = {item["id"]: item for item in items}
+    for operation in amendment["operations"]:
+        if operation["op"] == "add-phase":
+            fold.add_phase({"id": operation["id"], "title": operation["title"], "purpose": operation["purpose"], "items": []})
+        elif operation["op"] == "add-item":
+            fold.add_item(operation["phaseId"], recorded_items[operation["id"]])
+        elif operation["op"] == "set-documentation-impact":
+            fold.plan["documentationImpact"] = operation["value"]
+    for item_id, item in recorded_items.items():
+        if fold.items[item_id] is not item:
+            fold.items[item_id].clear()
+            fold.items[item_id].update(item)
+    fold.bump()
+
+
+def fold_event(fold: PlanFold | None, record: dict) -> PlanFold:
+    """Apply one event to the plan rebuilt so far and return the fold."""
+    kind, details = record.get("type"), record.get("details") or {}
+    if kind == "plan-created":
+        return PlanFold(recorded(record, "plan")[0])
+    if fold is None:
+        raise ReplayGap(f"event {record.get('eventId')} ({kind}) precedes plan-created")
+    plan = fold.plan
+    if kind == "documentation-impact-changed":
+        plan["documentationImpact"] = details["after"]
+        fold.bump()
+    elif kind == "phase-added":
+        fold.add_phase(details["after"])
+        fold.bump()
+    elif kind == "item-added":
+        fold.add_item(details["phaseId"], details["after"])
+        fold.bump()
+    elif kind == "plan-reviewed":
+        plan["reviews"].append(details)
+    elif kind in {"project-module-upserted", "project-dependency-upserted"}:
+        fold.bump()
+    elif kind == "amendment-proposed":
+        plan["amendments"].append(details["amendment"])
+        if details["amendment"]["status"] == "applied":
+            fold_amendment(fold, details["amendment"], *recorded(record, "items"))
+    elif kind == "amendment-reviewed":
+        amendment, = recorded(record, "amendment")
+        plan["reviews"].append(details["review"])
+        position = next(number for number, value in enumerate(plan["amendments"]) if value["id"] == amendment["id"])
+        plan["amendments"][position] = amendment
+        if amendment["status"] == "applied":
+            fold_amendment(fold, amendment, *recorded(record, "items"))
+    elif kind in {"item-updated", "item-verified"}:
+        state, checkpoint = recorded(record, "state", "checkpoint")
+        if kind == "item-verified":
+            fold.items[details["itemId"]]["verificationAttempts"].append(details["attempt"])
+        fold_item_state(fold, details["itemId"], state)
+        plan["checkpoint"] = checkpoint
+    elif kind == "checkpoint-created":
+        plan["checkpoint"] = details["checkpoint"]
+    elif kind == "execution-lanes-changed":
+        plan["executionLanes"] = details["after"]
+        plan["checkpoint"], = recorded(record, "checkpoint")
+    elif kind == "issue-opened":
+        plan["issues"].append(details)
+    elif kind == "issue-resolved":
+        resolved_at, = recorded(record, "resolvedAt")
+        issue = next(issue for issue in plan["issues"] if issue["id"] == details["issueId"])
+        issue.update({"status": "resolved", "resolution": details["resolution"], "resolvedAt": resolved_at})
+    elif kind == "plan-transitioned":
+        if details.get("toState") == "paused":
+            plan["checkpoint"]["stopReason"] = details.get("reason")
+    elif kind == "plan-replaced":
+        plan["checkpoint"]["stopReason"] = details.get("reason")
+    elif kind != "plan-activated":
+        raise ReplayGap(f"event {record.get('eventId')} has a type replay does not know: {kind}")
+    return fold
+
+
+def snapshot_dir(root: Path, slug: str) -> Path:
+    return store_dir(root) / CACHE_DIR / REPLAY_DIR / slug
+
+
+def tail_records(directory: Path, manifest: dict, cursor: dict | None):
+    """Yield (event, cursor) after `cursor`, oldest first. A cursor names the segment and the
+    byte span of the event's line; per-file legacy events, which always come first, have none."""
+    if cursor is None:
+        for path in legacy_event_files(directory):
+            yield read_json(path), None
+    segments = manifest["segments"]
+    start = 0 if cursor is None else next(number for number, segment in enumerate(segments) if segment["file"] == cursor["file"])
+    offset = 0 if cursor is None else cursor["offset"]
+    for segment in segments[start:]:
+        with (directory / segment["file"]).open("rb") as handle:
+            handle.seek(offset)
+            for line in handle:
+                if not line.endswith(b"\n") or offset + len(line) > segment["bytes"]:
+                    break
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), {"file": segment["file"], "offset": offset, "length": len(line)}
+        offset = 0
+
+
+def load_snapshot(root: Path, slug: str, directory: Path, manifest: dict) -> dict | None:
+    """The newest snapshot whose last event still sits where it was read from.
+
+    The log is append-only, so that one check vouches for everything before it; a rewritten
+    or rebuilt log simply makes every snapshot miss and replay starts from the beginning.
+    """
+    segments = {segment["file"]: segment for segment in manifest["segments"]}
+    for path in sorted(snapshot_dir(root, slug).glob("*.json"), reverse=True):
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+            cursor = snapshot["cursor"]
+            if snapshot.get("format") != REPLAY_FORMAT or cursor["offset"] > segments[cursor["file"]]["bytes"]:
+                continue
+            with (directory / cursor["file"]).open("rb") as handle:
+                handle.seek(cursor["offset"] - cursor["length"])
+                if json.loads(handle.read(cursor["length"])).get("eventId") == snapshot["lastEventId"]:
+                    return snapshot
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return None
+
+
+def write_snapshot(root: Path, slug: str, plan: dict, events: int, record: dict, cursor: dict) -> None:
+    directory = snapshot_dir(root, slug)
+    directory.mkdir(parents=True, exist_ok=True)
+    # A disposable cache read only by replay: compact, and never compared with what is there.
+    snapshot = {"format": REPLAY_FORMAT, "events": events, "lastEventId": record["eventId"], "cursor": cursor, "plan": plan}
+    fd, temp_name = tempfile.mkstemp(prefix=".snapshot.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        os.replace(temp_name, directory / f"{events:09d}.json")
+    finally:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+    for stale in sorted(directory.glob("*.json"))[:-REPLAY_SNAPSHOTS_KEPT]:
+        stale.unlink(missing_ok=True)
+
+
+def replay_plan(root: Path, slug: str, *, snapshots: bool = True) -> tuple[dict, dict]:
+    """Fold a plan's event log into its plan document; returns the plan and replay counts.
+
+    Snapshots sit at multiples of REPLAY_SNAPSHOT_EVENTS. Replay resumes from the newest
+    valid one and writes only the last boundary it passes, so a later replay folds fewer
+    than REPLAY_SNAPSHOT_EVENTS events plus whatever was appended since. Raises ReplayGap
+    when the log predates replay. `updatedAt` is left as the last snapshot or creation had it.
+    """
+    directory = events_dir(root, slug)
+    manifest = load_event_manifest(directory) if directory.exists() else empty_event_manifest()
+    snapshot = load_snapshot(root, slug, directory, manifest) if snapshots else None
+    fold = PlanFold(snapshot["plan"]) if snapshot else None
+    events = snapshot["events"] if snapshot else 0
+    total = len(legacy_event_files(directory)) + sum(segment["events"] for segment in manifest["segments"])
+    boundary = total - total % REPLAY_SNAPSHOT_EVENTS if snapshots and not st._USING_LEGACY else 0
+    for record, cursor in tail_records(directory, manifest, snapshot["cursor"] if snapshot else None):
+        fold = fold_event(fold, record)
+        events += 1
+        if events == boundary and cursor:
+            write_snapshot(root, slug, fold.plan, events, record, cursor)
+    if fold is None:
+        raise ReplayGap(f"{slug} has no plan-created event to replay from")
+    return fold.plan, {"events": events, "fromSnapshot": snapshot["events"] if snapshot else 0}
+
+
+def plan_differences(expected, actual, path: str = "", limit: int = 10) -> list[str]:
+    """JSON paths where `actual` departs from `expected`, at most `limit` of them."""
+    if type(expected) is not type(actual):
+        return [path or "$"]
+    if isinstance(expected, dict):
+        differences = []
+        for key in sorted(expected.keys() | actual.keys()):
+            if key not in expected or key not in actual:
+                differences.append(f"{path}.{key}" if path else key)
+            else:
+                differences.extend(plan_differences(expected[key], actual[key], f"{path}.{key}" if path else key, limit))
+            if len(differences) >= limit:
+                break
+        return differences[:limit]
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return [f"{path}[length]"]
+        differences = []
+        for position, (left, right) in enumerate(zip(expected, actual)):
+            differences.extend(plan_differences(left, right, f"{path}[{position}]", limit))
+            if len(differences) >= limit:
+                break
+        return differences[:limit]
+    return [] if expected == actual else [path or "$"]
+
+
+def replayed_fields(plan: dict) -> dict:
+    return {key: value for key, value in plan.items() if key not in UNREPLAYED_FIELDS}
+
+
+def replay_check(root: Path, entry: dict) -> dict:
+    """Compare a plan.json with the replay of its events.
+
+    Holds the plan's lock (below a shared store lock, as mutations take them) so a concurrent
+    mutation cannot land between its events and its plan document, and reads plan.json from
+    disk rather than from a pinned generation that may predate the newest events.
+    """
+    slug = entry["slug"]
+    with repository_lock(root, shared=True), named_lock(root, f"plan-{slug}"):
+        try:
+            replayed, counts = replay_plan(root, slug)
+        except ReplayGap as exc:
+            return {"replayable": False, "reason": str(exc)}
+        try:
+            stored = json.loads(plan_path(root, slug).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            return {"replayable": True, **counts, "consistent": False,
+                    "problem": f"plan.json is unreadable ({exc}); `recover-plan --plan {slug}` rebuilds it from the event log"}
+    differences = plan_differences(replayed_fields(replayed), replayed_fields(stored) if isinstance(stored, dict) else stored)
+    result = {"replayable": True, **counts, "consistent": not differences}
+    if differences:
+        result.update(differences=differences, problem=f"plan.json departs from its event log at {', '.join(differences)}; "
+                                                      f"`recover-plan --plan {slug}` rebuilds it from the log")
+    return result
+
+
+def cmd_recover_plan(args: argparse.Namespace, root: Path) -> dict:
+    index = load_index(root)
+    slug = args.plan or index.get("currentPlanSlug") or die("recover-plan needs --plan when there is no current plan")
+    entry = find_entry(index, slug)
+    try:
+        plan, counts = replay_plan(root, slug)
+    except ReplayGap as exc:
+        die(f"cannot recover {slug} from its event log: {exc}")
+    plan["updatedAt"] = entry["updatedAt"]
+    try:
+        stored = json.loads(plan_path(root, slug).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        stored = None
+    differences = plan_differences(plan, stored) if isinstance(stored, dict) else ["$"]
+    if differences and not args.dry_run:
+        atomic_json(plan_path(root, slug), plan)
+    return {"planSlug": slug, "recovered": bool(differences) and not args.dry_run, "dryRun": args.dry_run,
+            **counts, "revision": plan["revision"], "differences": differences}
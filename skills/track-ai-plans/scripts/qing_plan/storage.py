@@ -4,18 +4,23 @@
 from __future__ import annotations
 
 import argparse
+import base64
+import collections
 import copy
 import contextlib
 import datetime as dt
 import fnmatch
+import functools
 import hashlib
 import json
 import os
 import re
 import shutil
+import statistics
 import subprocess
 import sys
 import tempfile
+import time
 import uuid
 from pathlib import Path
 
@@ -24,6 +29,8 @@ try:
 except ImportError:  # pragma: no cover - qing-plans targets Unix Codex runtimes.
     fcntl = None
 
+from .profiling import active_profiler
+
 
 SCHEMA_VERSION = 2
 LEGACY_SCHEMA_VERSION = 1
@@ -39,13 +46,32 @@ REVIEW_POLICIES = {"none", "single"}
 AMENDMENT_KINDS = {"scope", "corrective", "temporary"}
 DOC_MODES = {"required", "none"}
 DOC_COVERAGE = {"all", "any"}
-READ_ONLY_COMMANDS = {"validate", "show", "changes", "history", "resume", "serve"}
+READ_ONLY_COMMANDS = {"validate", "show", "changes", "history", "resume", "serve", "fleet"}
 MUTATING_COMMANDS = {
     "create", "set-documentation-impact", "add-phase", "add-item", "review-plan",
     "upsert-module", "upsert-dependency", "propose-amendment", "review-amendment",
-    "update-item", "verify", "checkpoint", "add-issue", "resolve-issue", "transition",
-    "switch", "refresh-status", "install-dashboard", "migrate-store",
+    "update-item", "verify", "checkpoint", "set-execution-lanes", "add-issue", "resolve-issue", "transition",
+    "switch", "refresh-status", "install-dashboard", "migrate-store", "batch", "compact-events", "recover-plan",
 }
+# Commands that add, switch, or retire plans, or may write several of them at once.
+STORE_EXCLUSIVE_COMMANDS = {"create", "transition", "switch", "install-dashboard", "migrate-store", "batch"}
+REVISION_NAMES = ("plan", "map", "index")
+PROJECT_MAP_COMMANDS = {"upsert-module", "upsert-dependency", "propose-amendment", "review-amendment"}
+BATCH_EXCLUDED_COMMANDS = {"batch", "install-dashboard", "migrate-store", "compact-events", "recover-plan"}
+EVENT_MANIFEST = "manifest.json"
+EVENT_SEGMENT_BYTES = 1024 * 1024
+EVENT_INDEX = "index.ndjson"
+EVENT_INDEX_META = "index-meta.json"
+CACHE_DIR = ".cache"
+GENERATIONS_DIR = "generations"
+GENERATION_GRACE_SECONDS = 300
+STATUS_SHARDS_DIR = "phases"
+LOCKS_DIR = "locks"
+HASH_CACHE_ENTRIES = 10000
+CHANGE_CACHE_ENTRIES = 8
+DOCUMENT_CACHE_ENTRIES = 256
+PROFILE_TRACES_KEPT = 20
+RACY_MTIME_NS = 2_000_000_000
 SYSTEM_MODULES = {
     "_unmapped": {"name": "Unmapped", "description": "Legacy or not-yet-classified paths", "pathPatterns": [],
                   "reason": "System fallback for incomplete classification", "evidence": "Qing Plans V2 schema"},
@@ -55,12 +81,29 @@ SYSTEM_MODULES = {
 
 _STORE_OVERRIDE: Path | None = None
 _USING_LEGACY = False
+_TRANSACTION: dict | None = None
+_DOCUMENT_CACHE: dict | None = None
+_GENERATION: dict[Path, Path] | None = None
+_WRITTEN_PATHS: set[Path] = set()
+_LOCKS: dict | None = None
+_LOCK_TIMEOUT: float | None = None
+_LOCK_WAITS: list[tuple[str, str, int]] = []
+_DEFER_STATUS = False
 
 
 class PlanError(Exception):
     pass
 
 
+class PlanConflict(PlanError):
+    """`--expect-revision` no longer matches the store; `conflict` says which revisions moved."""
+
+    def __init__(self, conflict: dict) -> None:
+        moved = ", ".join(f"{name} is {conflict['actual'][name]}, expected {conflict['expected'][name]}" for name in conflict["stale"])
+        super().__init__(f"revision conflict: {moved}; re-read the plan and retry")
+        self.conflict = conflict
+
+
 def now() -> str:
     return dt.datetime.now(dt.timezone.utc).isoformat().replace("+00:00", "Z")
 
@@ -70,21 +113,96 @@ def die(message: str) -> None:
 
 
 def read_json(path: Path) -> dict:
+    if _TRANSACTION is not None and path in _TRANSACTION["documents"]:
+        return _TRANSACTION["documents"][path]
+    source = path
+    if _GENERATION is not None and path in _GENERATION and _GENERATION[path].exists():
+        source = _GENERATION[path]
+    key = None
+    if _DOCUMENT_CACHE is not None:
+        # A resident daemon serving a read-only command: every write goes through
+        # os.replace, so an unchanged (mtime, size, inode) is an unchanged document.
+        try:
+            stat = source.stat()
+        except FileNotFoundError:
+            die(f"missing file: {path}")
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = _DOCUMENT_CACHE.pop(path, None)
+        if cached is not None and cached[0] == key:
+            # Reinserting keeps the dict in least-recently-used order; callers get their
+            # own copy, so nothing they change leaks into the next request.
+            _DOCUMENT_CACHE[path] = cached
+            return copy.deepcopy(cached[1])
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        data = json.loads(source.read_text(encoding="utf-8"))
     except FileNotFoundError:
         die(f"missing file: {path}")
     except json.JSONDecodeError as exc:
         die(f"invalid JSON in {path}: {exc}")
+    if _TRANSACTION is not None:
+        _TRANSACTION["documents"][path] = data
+    if key is not None:
+        _DOCUMENT_CACHE[path] = (key, copy.deepcopy(data))
+        for stale in list(_DOCUMENT_CACHE)[:max(0, len(_DOCUMENT_CACHE) - DOCUMENT_CACHE_ENTRIES)]:
+            del _DOCUMENT_CACHE[stale]
+    return data
+
+
+def document_exists(path: Path) -> bool:
+    if _TRANSACTION is not None and path in _TRANSACTION["dirty"]:
+        return True
+    if _GENERATION is not None and path in _GENERATION:
+        return True
+    return path.exists()
 
 
 def atomic_json(path: Path, data: dict) -> None:
+    if _TRANSACTION is not None:
+        _TRANSACTION["documents"][path] = data
+        _TRANSACTION["dirty"].pop(path, None)
+        _TRANSACTION["dirty"][path] = True
+        return
+    write_json(path, data)
+
+
+def json_bytes(data) -> bytes:
+    """The exact bytes write_json stores for `data`."""
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+def emit_records(records) -> None:
+    """Write `records` to stdout as NDJSON as they are produced, never holding the whole output."""
+    for record in records:
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def fingerprint(value) -> str:
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def written_paths() -> set[Path]:
+    """Files this command has written so far; Git observations treat them as dirty."""
+    return _WRITTEN_PATHS
+
+
+def reset_written_paths() -> None:
+    _WRITTEN_PATHS.clear()
+
+
+def write_json(path: Path, data: dict) -> None:
+    payload = json_bytes(data)
+    with contextlib.suppress(OSError):
+        # Rewriting identical bytes would only churn mtimes and make Git observers
+        # count an unchanged document as dirty.
+        if path.read_bytes() == payload:
+            return
+    _WRITTEN_PATHS.add(path)
     path.parent.mkdir(parents=True, exist_ok=True)
     fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as handle:
-            json.dump(data, handle, ensure_ascii=False, indent=2)
-            handle.write("\n")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
         os.replace(temp_name, path)
     finally:
         if os.path.exists(temp_name):
@@ -111,6 +229,27 @@ def status_path(root: Path, slug: str) -> Path:
     return store_dir(root) / slug / "status.json"
 
 
+def read_status(root: Path, slug: str) -> dict:
+    """status.json with every phase shard read back in: the whole document `show` prints.
+
+    A summary names each phase's shard where the phase's `items` would be, and marks the
+    per-item coverage it leaves to the shards the same way; a status written before shards
+    existed is returned as it is.
+    """
+    path = status_path(root, slug)
+    status = read_json(path)
+    if not any("shard" in phase for phase in status.get("phases", [])):
+        return status
+    phases = [{(key if key != "shard" else "items"): (value if key != "shard" else read_json(path.parent / value)["items"])
+               for key, value in phase.items()} for phase in status["phases"]]
+    coverage = status.get("changeCoverage") or {}
+    if "itemsInShards" in coverage:
+        observations = {item["id"]: item["observations"] for phase in phases for item in phase["items"]}
+        coverage = {(key if key != "itemsInShards" else "items"): (value if key != "itemsInShards" else observations)
+                    for key, value in coverage.items()}
+    return {**status, "phases": phases, "changeCoverage": coverage}
+
+
 def map_path(root: Path) -> Path:
     return store_dir(root) / "project-map.json"
 
@@ -173,7 +312,7 @@ def empty_project_map() -> dict:
 
 def load_index(root: Path, *, allow_missing: bool = False) -> dict:
     path = index_path(root)
-    if not path.exists():
+    if not document_exists(path):
         if allow_missing:
             return empty_index()
         die(f"no plan store in {path.parent}; run `create` to start the first plan")
@@ -186,7 +325,7 @@ def load_index(root: Path, *, allow_missing: bool = False) -> dict:
 
 def load_project_map(root: Path, *, allow_missing: bool = False) -> dict:
     path = map_path(root)
-    if not path.exists():
+    if not document_exists(path):
         if allow_missing:
             return empty_project_map()
         die(f"missing file: {path}")
@@ -209,14 +348,137 @@ def selected_plan(args: argparse.Namespace, root: Path) -> tuple[dict, dict, dic
     return index, entry, read_json(plan_path(root, slug))
 
 
+def expected_revisions(values: list[str] | None) -> dict[str, int]:
+    """Parse repeated `--expect-revision` values: N (the plan), plan=N, map=N, or index=N."""
+    expected = {}
+    for value in values or []:
+        name, _, number = value.rpartition("=")
+        name = name or "plan"
+        if name not in REVISION_NAMES or not number.isdigit():
+            die(f"--expect-revision takes N, plan=N, map=N, or index=N, not {value!r}")
+        if expected.setdefault(name, int(number)) != int(number):
+            die(f"--expect-revision names two {name} revisions")
+    return expected
+
+
+def check_revisions(args: argparse.Namespace, root: Path) -> None:
+    """Compare the revisions a mutation was prepared against with the store's, or raise PlanConflict.
+
+    `plan` is the review revision, which moves only with draft edits and applied
+    amendments; `index` moves with every mutation of any plan.
+    """
+    expected = expected_revisions(getattr(args, "expect_revision", None))
+    if not expected:
+        return
+    index = load_index(root, allow_missing=True)
+    slug = getattr(args, "plan", None) or index.get("currentPlanSlug")
+    actual = {}
+    if "plan" in expected:
+        if not slug or not document_exists(plan_path(root, slug)):
+            die("--expect-revision plan=N needs an existing plan; pass --plan")
+        actual["plan"] = read_json(plan_path(root, slug)).get("revision")
+    if "map" in expected:
+        actual["map"] = load_project_map(root, allow_missing=True).get("revision")
+    if "index" in expected:
+        actual["index"] = index.get("revision")
+    stale = [name for name in REVISION_NAMES if name in expected and actual[name] != expected[name]]
+    if stale:
+        raise PlanConflict({"command": args.command, "plan": slug, "expected": expected, "actual": actual, "stale": stale})
+
+
 def save_index(root: Path, index: dict) -> None:
-    index["revision"] = int(index.get("revision", 0)) + 1
-    index["updatedAt"] = now()
-    atomic_json(index_path(root), index)
+    if _LOCKS is None or _LOCKS["store"] == "exclusive":
+        index["revision"] = int(index.get("revision", 0)) + 1
+        index["updatedAt"] = now()
+        atomic_json(index_path(root), index)
+        return
+    # Plan-scoped mutations share the store, so another plan's entry may have changed
+    # since this command read the index. Rewrite only the entries of the plans held.
+    with named_lock(root, "index"):
+        mine = {entry["slug"]: entry for entry in index["plans"] if entry["slug"] in _LOCKS["plans"]}
+        current = read_json(index_path(root))
+        current["plans"] = [mine.get(entry["slug"], entry) for entry in current["plans"]]
+        index.clear()
+        index.update(current)
+        index["revision"] = int(index.get("revision", 0)) + 1
+        index["updatedAt"] = now()
+        atomic_json(index_path(root), index)
+
+
+@contextlib.contextmanager
+def transaction(*, defer_status: bool = False):
+    """Buffer every document write of one or more commands until the block succeeds.
+
+    Reads inside the block return the buffered (or first-read) object, so consecutive
+    commands see each other's changes without touching disk. Any exception discards the
+    buffer, which is what makes a failed batch leave the store exactly as it found it.
+    """
+    global _TRANSACTION
+    if _TRANSACTION is not None:
+        yield _TRANSACTION
+        return
+    _TRANSACTION = {"documents": {}, "dirty": {}, "appends": {}, "after_commit": [], "defer_status": defer_status,
+                    "renders": []}
+    try:
+        yield _TRANSACTION
+        pending = _TRANSACTION
+    finally:
+        _TRANSACTION = None
+    # The registry goes last: a crash mid-flush then leaves plan files ahead of an index
+    # that does not reference them yet, never an index pointing at unwritten plans.
+    for directory, records in pending["appends"].items():
+        write_event_records(directory, records)
+    dirty = sorted(pending["dirty"], key=lambda path: path.name == "index.json")
+    for path in dirty:
+        write_json(path, pending["documents"][path])
+    for callback in pending["after_commit"]:
+        callback()
+
+
+def after_commit(callback) -> None:
+    """Run `callback` once buffered documents are on disk, or immediately outside a transaction."""
+    if _TRANSACTION is None:
+        callback()
+    else:
+        _TRANSACTION["after_commit"].append(callback)
+
+
+def defer_status_render(slug: str) -> bool:
+    """Queue one status render for the end of a batch instead of rendering per command."""
+    if _TRANSACTION is None or not _TRANSACTION["defer_status"]:
+        return False
+    if slug not in _TRANSACTION["renders"]:
+        _TRANSACTION["renders"].append(slug)
+    return True
+
+
+def acquire_lock(handle, name: str, *, shared: bool = False) -> None:
+    """flock `handle`, honouring --lock-timeout and recording the wait for --profile."""
+    mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    started = time.perf_counter_ns()
+    if _LOCK_TIMEOUT is None:
+        fcntl.flock(handle.fileno(), mode)
+    else:
+        deadline, delay = time.monotonic() + _LOCK_TIMEOUT, 0.001
+        while True:
+            try:
+                fcntl.flock(handle.fileno(), mode | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    die(f"timed out after {_LOCK_TIMEOUT:g}s waiting for the {name} lock; another planctl command holds it")
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.1)
+    ended = time.perf_counter_ns()
+    _LOCK_WAITS.append((name, "shared" if shared else "exclusive", ended - started))
+    profiler = active_profiler()
+    if profiler is not None:
+        profiler.record(name, "lock", started, ended, {"mode": "shared" if shared else "exclusive"})
 
 
 @contextlib.contextmanager
-def repository_lock(root: Path):
+def repository_lock(root: Path, *, shared: bool = False):
     if fcntl is None:
         die("plan mutations require fcntl locking")
     lock_path = store_dir(root) / ".planctl.lock"
@@ -224,7 +486,7 @@ def repository_lock(root: Path):
     lock_path.parent.mkdir(parents=True, exist_ok=True)
     try:
         with lock_path.open("a+", encoding="utf-8") as handle:
-            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            acquire_lock(handle, "store", shared=shared)
             try:
                 yield
             finally:
@@ -239,11 +501,532 @@ def repository_lock(root: Path):
             lock_path.parent.rmdir()
 
 
+@contextlib.contextmanager
+def named_lock(root: Path, name: str):
+    """An exclusive lock below the store lock, kept with the machine-local caches."""
+    directory = store_dir(root) / CACHE_DIR / LOCKS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / f"{name}.lock").open("a+", encoding="utf-8") as handle:
+        acquire_lock(handle, name)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def try_named_lock(root: Path, name: str):
+    """Like `named_lock`, but yield False at once instead of waiting while another process holds it."""
+    directory = store_dir(root) / CACHE_DIR / LOCKS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / f"{name}.lock").open("a+", encoding="utf-8") as handle:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def plan_lock_slugs(args: argparse.Namespace, root: Path) -> list[str]:
+    """The plans a plan-scoped mutation may write. `currentPlanSlug` is stable here: only
+    store-exclusive commands move it."""
+    path = index_path(root)
+    if not path.is_file():
+        return []
+    index = read_json(path)
+    slugs = {entry.get("slug") for entry in index.get("plans", [])}
+    if args.command == "compact-events" and not args.plan:
+        return sorted(slugs)
+    slug = getattr(args, "plan", None) or index.get("currentPlanSlug")
+    # An unknown slug takes no lock; the command itself rejects it.
+    return [slug] if slug in slugs else []
+
+
+@contextlib.contextmanager
+def command_locks(args: argparse.Namespace, root: Path):
+    """Take the locks one mutation needs, always in the same order.
+
+    Commands that add, switch, or retire plans, or may touch any of them, hold the store
+    lock exclusively. Every other mutation shares it and holds an exclusive lock per plan
+    it writes (by slug), then the project-map lock if it may change the map. The index lock
+    comes last and only around the registry write itself; see `save_index`.
+    """
+    global _LOCKS
+    exclusive = _USING_LEGACY or args.command in STORE_EXCLUSIVE_COMMANDS
+    _LOCKS = {"store": "exclusive" if exclusive else "shared", "plans": set(), "projectMap": exclusive}
+    _LOCK_WAITS.clear()
+    try:
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(repository_lock(root, shared=not exclusive))
+            if not exclusive:
+                for slug in plan_lock_slugs(args, root):
+                    stack.enter_context(named_lock(root, f"plan-{slug}"))
+                    _LOCKS["plans"].add(slug)
+                if args.command in PROJECT_MAP_COMMANDS:
+                    stack.enter_context(named_lock(root, "project-map"))
+                    _LOCKS["projectMap"] = True
+            yield
+    finally:
+        _LOCKS = None
+        if os.environ.get("PLANCTL_LOCK_TIMING"):
+            for name, mode, waited in _LOCK_WAITS:
+                print(f"planctl: lock {name} ({mode}) waited {waited / 1e6:.1f} ms", file=sys.stderr)
+
+
+def may_write_project_map() -> bool:
+    """False for a plan-scoped command that did not take the project-map lock: its copy of
+    the map is unchanged by contract and may already be stale."""
+    return _LOCKS is None or _LOCKS["projectMap"]
+
+
+def generations_dir(root: Path) -> Path:
+    return store_dir(root) / CACHE_DIR / GENERATIONS_DIR
+
+
+def generation_documents(store: Path) -> list[Path]:
+    """The JSON documents one mutation may rewrite together; event logs are append-only."""
+    found = [store / name for name in ("index.json", "project-map.json", "migration.json")]
+    found += sorted(store.glob("*/plan.json")) + sorted(store.glob("*/status.json"))
+    return [path for path in found if path.is_file()]
+
+
+def document_identity(stat: os.stat_result) -> str:
+    return f"{stat.st_ino}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def read_generation_pointer(root: Path) -> dict | None:
+    try:
+        pointer = json.loads((generations_dir(root) / "current.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return pointer if isinstance(pointer, dict) and isinstance(pointer.get("documents"), dict) else None
+
+
+def resolve_generation(root: Path) -> dict[Path, Path] | None:
+    """Map each store document to its copy in the newest published generation.
+
+    None means read the documents themselves: there is no generation yet, or files were
+    changed outside planctl (a pull, a checkout, an editor) since it was published.
+    """
+    pointer = read_generation_pointer(root)
+    if pointer is None:
+        return None
+    store, directory = store_dir(root), generations_dir(root)
+    if pointer.get("settled"):
+        for relative, identity in pointer["documents"].items():
+            try:
+                current = document_identity((store / relative).stat())
+            except OSError:
+                current = None
+            if current != identity:
+                # A writer that started after the pointer was read changes the files too,
+                # but it also rewrites the pointer first; then the pinned generation holds.
+                again = read_generation_pointer(root)
+                if again is None or again.get("serial") == pointer.get("serial"):
+                    return None
+                break
+    return {store / relative: directory / f"{identity}.json" for relative, identity in pointer["documents"].items()}
+
+
+def pin_generation(root: Path) -> None:
+    """Serve this command's document reads from one generation, without the lock."""
+    global _GENERATION
+    _GENERATION = None if _USING_LEGACY else resolve_generation(root)
+
+
+def publish_generation(root: Path, *, settled: bool, writers: list[str] | None = None) -> None:
+    """Record the documents on disk as a generation and point readers at it (lock held).
+
+    A mutation publishes unsettled before it writes anything, which leaves readers on the
+    previous generation, and settled once every document is on disk. Each generation keeps
+    a hard link (a copy where links are unsupported) to the exact file it names; writes
+    always replace files, so a linked file never changes underneath a reader.
+    """
+    store, directory = store_dir(root), generations_dir(root)
+    if _USING_LEGACY or not (store / "index.json").is_file():
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    documents = {}
+    for path in generation_documents(store):
+        identity = document_identity(path.stat())
+        kept = directory / f"{identity}.json"
+        if not kept.exists():
+            try:
+                os.link(path, kept)
+            except OSError:
+                shutil.copy2(path, kept)
+        documents[path.relative_to(store).as_posix()] = identity
+    pointer = read_generation_pointer(root) or {"generation": 0, "serial": 0, "documents": None}
+    writers = writers or []
+    if pointer["documents"] == documents and pointer.get("settled") == settled and pointer.get("writers", []) == writers:
+        return
+    generation = pointer["generation"] + (pointer["documents"] != documents)
+    write_json(directory / "current.json", {"schemaVersion": 1, "generation": generation, "serial": pointer["serial"] + 1,
+                                            "settled": settled, "writers": writers, "publishedAt": now(), "documents": documents})
+    if generation != pointer["generation"]:
+        collect_generations(directory, generation, documents)
+
+
+def collect_generations(directory: Path, generation: int, documents: dict) -> None:
+    """Drop generations superseded more than the grace period ago and files only they named."""
+    history_path = directory / "history.json"
+    try:
+        history = json.loads(history_path.read_text(encoding="utf-8"))["generations"]
+    except (OSError, ValueError, KeyError, TypeError):
+        history = []
+    timestamp = time.time()
+    for record in history:
+        record["supersededAt"] = record.get("supersededAt") or timestamp
+    history = [record for record in history if timestamp - record["supersededAt"] < GENERATION_GRACE_SECONDS]
+    history.append({"generation": generation, "supersededAt": None, "identities": sorted(set(documents.values()))})
+    write_json(history_path, {"schemaVersion": 1, "generations": history})
+    referenced = {f"{identity}.json" for record in history for identity in record["identities"]}
+    for path in directory.iterdir():
+        if path.name not in referenced and path.name not in {"current.json", "history.json"} and not path.name.startswith("."):
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+
+def writer_alive(token: str) -> bool:
+    try:
+        os.kill(int(token.split(":", 1)[0]), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+def register_writer(root: Path, token: str, *, joining: bool) -> None:
+    """Track in-flight mutations in the pointer under the index lock.
+
+    Plan-scoped mutations run side by side, so only the first to start publishes the
+    unsettled generation and only the last to finish publishes the settled one; in
+    between, readers stay on the documents as they stood before any of them wrote.
+    A writer that died mid-mutation is dropped when the next one registers.
+    """
+    if _USING_LEGACY or not (store_dir(root) / "index.json").is_file():
+        return
+    with named_lock(root, "index"):
+        pointer = read_generation_pointer(root)
+        others = [writer for writer in (pointer or {}).get("writers", []) if writer != token and writer_alive(writer)]
+        if others and not pointer.get("settled"):
+            pointer.update(writers=others + [token] if joining else others, serial=pointer["serial"] + 1, publishedAt=now())
+            write_json(generations_dir(root) / "current.json", pointer)
+        else:
+            publish_generation(root, settled=not joining, writers=[token] if joining else [])
+
+
+@contextlib.contextmanager
+def store_generation(root: Path):
+    """Bracket one mutation so lock-free readers see its documents all at once or not at all."""
+    token = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    register_writer(root, token, joining=True)
+    try:
+        yield
+    finally:
+        register_writer(root, token, joining=False)
+
+
+def events_dir(root: Path, slug: str) -> Path:
+    return store_dir(root) / slug / "events"
+
+
+def empty_event_manifest() -> dict:
+    return {"schemaVersion": SCHEMA_VERSION, "format": "ndjson-segments", "maxSegmentBytes": EVENT_SEGMENT_BYTES,
+            "segments": []}
+
+
+def legacy_event_files(directory: Path) -> list[Path]:
+    """Per-file events written before the segmented log, oldest first."""
+    return sorted(path for path in directory.glob("*.json") if path.name not in {EVENT_MANIFEST, EVENT_INDEX_META})
+
+
+def event_segment_files(directory: Path) -> list[Path]:
+    return sorted(directory.glob("segment-*.ndjson"))
+
+
+def segment_records(path: Path):
+    """Stream one segment. A trailing line without newline is an unacknowledged torn append."""
+    with path.open("rb") as handle:
+        for line in handle:
+            if not line.endswith(b"\n"):
+                return
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_events(directory: Path):
+    for path in legacy_event_files(directory):
+        yield read_json(path)
+    for path in event_segment_files(directory):
+        try:
+            yield from segment_records(path)
+        except json.JSONDecodeError as exc:
+            die(f"invalid event line in {path}: {exc}")
+
+
+def rebuild_event_manifest(directory: Path, *, repair: bool = False) -> dict:
+    """Recount the segments, leaving out a torn final line.
+
+    Only a writer holding the plan lock passes `repair`, which truncates the torn tail so the
+    next append starts on a line boundary; a reader may be racing an append and never writes.
+    """
+    manifest = empty_event_manifest()
+    for path in event_segment_files(directory):
+        data = path.read_bytes()
+        if data and not data.endswith(b"\n"):
+            data = data[:data.rfind(b"\n") + 1]
+            if repair:
+                with path.open("r+b") as handle:
+                    handle.truncate(len(data))
+        ids = [json.loads(line)["eventId"] for line in data.splitlines() if line.strip()]
+        manifest["segments"].append({"file": path.name, "events": len(ids), "bytes": len(data),
+                                     "firstEventId": ids[0] if ids else None, "lastEventId": ids[-1] if ids else None})
+    return manifest
+
+
+def load_event_manifest(directory: Path, *, repair: bool = False) -> dict:
+    path = directory / EVENT_MANIFEST
+    if not path.exists():
+        return rebuild_event_manifest(directory, repair=repair)
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    segments = manifest.get("segments", [])
+    on_disk = event_segment_files(directory)
+    if [segment["file"] for segment in segments] != [path.name for path in on_disk] or \
+            (segments and on_disk[-1].stat().st_size != segments[-1]["bytes"]):
+        # A crash between an fsync'd append and its manifest update leaves the manifest
+        # behind the segments; the segments are the source of truth.
+        return rebuild_event_manifest(directory, repair=repair)
+    return manifest
+
+
+def write_event_records(directory: Path, records: list[dict]) -> None:
+    """Append events to the newest segment, rolling over by size, then fsync and update the manifest."""
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = load_event_manifest(directory, repair=True)
+    # Only extend an index that matches the log as it stands; a stale one is rebuilt by its next reader.
+    fresh = not manifest["segments"] and not legacy_event_files(directory)
+    indexed = fresh or event_index_fresh(directory, manifest)
+    segments, limit = manifest["segments"], manifest.get("maxSegmentBytes", EVENT_SEGMENT_BYTES)
+    pending: dict[str, list[bytes]] = {}
+    appended: list[dict] = []
+    for record in records:
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        if not segments or (segments[-1]["events"] and segments[-1]["bytes"] + len(line) > limit):
+            segments.append({"file": f"segment-{len(segments) + 1:06d}.ndjson", "events": 0, "bytes": 0,
+                             "firstEventId": record["eventId"], "lastEventId": None})
+        segment = segments[-1]
+        pending.setdefault(segment["file"], []).append(line)
+        appended.append(event_index_entry(record, segment["file"], segment["bytes"], len(line)))
+        segment.update({"events": segment["events"] + 1, "bytes": segment["bytes"] + len(line),
+                        "lastEventId": record["eventId"]})
+        segment["firstEventId"] = segment["firstEventId"] or record["eventId"]
+    for name, lines in pending.items():
+        _WRITTEN_PATHS.add(directory / name)
+        with (directory / name).open("ab") as handle:
+            handle.write(b"".join(lines))
+            handle.flush()
+            os.fsync(handle.fileno())
+    write_json(directory / EVENT_MANIFEST, manifest)
+    if indexed:
+        extend_event_index(directory, manifest, appended, start=fresh)
+
+
+def event_item_ids(record: dict) -> list[str]:
+    """Plan items an event is about, for `history --item`."""
+    details = record.get("details") if isinstance(record.get("details"), dict) else {}
+    ids = [details.get("itemId")]
+    if record.get("type") == "item-added" and isinstance(details.get("after"), dict):
+        ids.append(details["after"].get("id"))
+    amendment = details.get("amendment") if isinstance(details.get("amendment"), dict) else {}
+    for operation in amendment.get("operations") or []:
+        if isinstance(operation, dict):
+            ids.append(operation.get("itemId") or (operation.get("id") if operation.get("op") == "add-item" else None))
+    return sorted({value for value in ids if isinstance(value, str) and value})
+
+
+def parse_timestamp(value) -> dt.datetime | None:
+    try:
+        parsed = dt.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=dt.timezone.utc) if parsed.tzinfo is None else parsed
+
+
+def event_sort_time(value) -> str:
+    """Normalise an ISO timestamp so plain string comparison orders it correctly."""
+    parsed = parse_timestamp(value)
+    return parsed.astimezone(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ") if parsed else ""
+
+
+def event_index_entry(record: dict, file: str, offset: int | None, length: int | None) -> dict:
+    return {"eventId": record.get("eventId"), "type": record.get("type"), "items": event_item_ids(record),
+            "at": event_sort_time(record.get("occurredAt")), "file": file, "offset": offset, "length": length}
+
+
+def event_index_state(directory: Path, manifest: dict) -> dict:
+    return {"legacyFiles": [path.name for path in legacy_event_files(directory)],
+            "segments": {segment["file"]: segment["bytes"] for segment in manifest["segments"]}}
+
+
+def event_index_fresh(directory: Path, manifest: dict) -> bool:
+    try:
+        meta = json.loads((directory / EVENT_INDEX_META).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    index = directory / EVENT_INDEX
+    return meta.get("state") == event_index_state(directory, manifest) and index.exists() and \
+        index.stat().st_size == meta.get("bytes")
+
+
+def rebuild_event_index(directory: Path, manifest: dict, *, persist: bool) -> list[dict]:
+    entries = [event_index_entry(read_json(path), path.name, None, None) for path in legacy_event_files(directory)]
+    for segment in manifest["segments"]:
+        offset = 0
+        with (directory / segment["file"]).open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n") or offset + len(line) > segment["bytes"]:
+                    break
+                if line.strip():
+                    entries.append(event_index_entry(json.loads(line), segment["file"], offset, len(line)))
+                offset += len(line)
+    if persist:
+        data = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in entries).encode("utf-8")
+        fd, temp_name = tempfile.mkstemp(prefix=f".{EVENT_INDEX}.", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_name, directory / EVENT_INDEX)
+        finally:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+        write_json(directory / EVENT_INDEX_META, {"state": event_index_state(directory, manifest), "bytes": len(data)})
+    return entries
+
+
+def extend_event_index(directory: Path, manifest: dict, entries: list[dict], *, start: bool = False) -> None:
+    data = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in entries).encode("utf-8")
+    with (directory / EVENT_INDEX).open("wb" if start else "ab") as handle:
+        handle.write(data)
+        size = handle.tell()
+    write_json(directory / EVENT_INDEX_META, {"state": event_index_state(directory, manifest), "bytes": size})
+
+
+def iter_event_index(directory: Path):
+    """Yield the sidecar index of a plan's events oldest first, rebuilding it when missing or stale.
+
+    The index is a disposable, git-ignored cache: the segments stay the source of truth,
+    and a legacy read-only store gets an in-memory index without writing anything. A fresh
+    index is read line by line, so nothing holds the whole of it.
+    """
+    if not directory.exists():
+        return
+    manifest = load_event_manifest(directory)
+    if event_index_fresh(directory, manifest):
+        with (directory / EVENT_INDEX).open("rb") as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    yield from rebuild_event_index(directory, manifest, persist=not _USING_LEGACY)
+
+
+def load_event_index(directory: Path) -> list[dict]:
+    return list(iter_event_index(directory))
+
+
+def read_indexed_event(directory: Path, entry: dict, handles: dict) -> dict:
+    if entry["offset"] is None:
+        return read_json(directory / entry["file"])
+    if entry["file"] not in handles:
+        handles[entry["file"]] = (directory / entry["file"]).open("rb")
+    handle = handles[entry["file"]]
+    handle.seek(entry["offset"])
+    return json.loads(handle.read(entry["length"]))
+
+
+def event_cursor(position: int, entry: dict) -> str:
+    token = json.dumps({"before": position, "eventId": entry["eventId"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(token.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def cursor_position(directory: Path, cursor: str) -> int:
+    try:
+        token = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        position = int(token["before"])
+    except (ValueError, TypeError, KeyError):
+        die("invalid --cursor")
+    for number, entry in enumerate(iter_event_index(directory)):
+        if number == position:
+            if entry["eventId"] == token.get("eventId"):
+                return position
+            break
+    die("--cursor no longer matches the event log; start again without --cursor")
+
+
+def query_events(directory: Path, **query) -> tuple[list[dict], str | None]:
+    """Return matching events oldest first, reading only their records, plus a cursor for the older page."""
+    entries, cursor = select_events(directory, **query)
+    return list(read_events(directory, entries)), cursor
+
+
+def select_events(directory: Path, *, types: list[str] | None = None, item: str | None = None,
+                  since: str | None = None, until: str | None = None, cursor: str | None = None,
+                  limit: int | None = None) -> tuple:
+    """Matching index entries oldest first, plus a cursor for the older page.
+
+    With `limit` the newest matches are selected, holding no more than that many; passing
+    the returned cursor back pages towards the start of the log. Without it the entries
+    are produced as the index is read. `since`/`until` are inclusive normalised timestamps.
+    """
+    end = None if cursor is None else cursor_position(directory, cursor)
+    wanted = set(types or [])
+
+    def matching():
+        for position, entry in enumerate(iter_event_index(directory)):
+            if end is not None and position >= end:
+                return
+            if (not wanted or entry["type"] in wanted) and (item is None or item in entry["items"]) and \
+                    (since is None or entry["at"] >= since) and (until is None or entry["at"] <= until):
+                yield position, entry
+
+    if limit is None:
+        return (entry for _, entry in matching()), None
+    newest = collections.deque(matching(), maxlen=limit + 1)
+    more = len(newest) > limit
+    selected = list(newest)[len(newest) - limit:] if limit else []
+    return [entry for _, entry in selected], (event_cursor(*selected[0]) if more and selected else None)
+
+
+def read_events(directory: Path, entries):
+    """Read the selected events one at a time, so a caller can stream a log of any length."""
+    handles: dict = {}
+    try:
+        for entry in entries:
+            yield read_indexed_event(directory, entry, handles)
+    finally:
+        for handle in handles.values():
+            handle.close()
+
+
+def append_events(directory: Path, records: list[dict]) -> None:
+    if _TRANSACTION is not None:
+        # Copy now: later steps of the batch keep mutating the documents these details point into.
+        _TRANSACTION["appends"].setdefault(directory, []).extend(copy.deepcopy(records))
+        return
+    write_event_records(directory, records)
+
+
 def event(root: Path, slug: str, event_type: str, actor: str | None, actor_type: str, details: dict) -> None:
     timestamp = now()
     event_id = f"{timestamp.replace(':', '-')}-{event_type}-{uuid.uuid4().hex[:8]}"
-    atomic_json(store_dir(root) / slug / "events" / f"{event_id}.json", {
+    append_events(events_dir(root, slug), [{
         "schemaVersion": SCHEMA_VERSION, "eventId": event_id, "occurredAt": timestamp,
         "type": event_type, "planSlug": slug, "actor": actor, "actorType": actor_type,
         "details": details,
-    })
+    }])
@@ -141,6 +141,12 @@ git init --bare -q "$TEST_ROOT/v2-remote.git"
 git -C "$V2" remote add origin "$TEST_ROOT/v2-remote.git"
 git -C "$V2" push -qu origin HEAD
 check "committed code and plan checkpoint become portable" "$(P resume | python3 -c 'import json,sys;d=json.load(sys.stdin);print(d["handoff"]["portability"],len(d["handoff"]["currentDirtyPaths"]))')" "portable 0"
+mkdir -p "$V2/scratch dir"
+printf 'x\n' >"$V2/scratch dir/a b.txt"
+check "one porcelain v2 status yields upstream, ahead/behind, and unquoted dirty paths" \
+  "$(P resume | python3 -c 'import json,sys;h=json.load(sys.stdin)["handoff"];print(h["currentDirtyPaths"],h["push"]["upstream"],h["push"]["ahead"],h["push"]["behind"])')" \
+  "['scratch dir/a b.txt'] origin/$(git -C "$V2" branch --show-current) 0 0"
+rm -r "$V2/scratch dir"
 P transition --state completed --reason "All verified" --actor-type human >/dev/null
 check "terminal freeze retains final observed file/module impact" \
   "$(P show --plan demo-plan | python3 -c 'import json,sys;d=json.load(sys.stdin);print(d["changeCoverage"]["observed"],d["summary"]["changedModules"],d["nextActions"][0]["type"])')" \
@@ -151,6 +157,25 @@ P show --plan demo-plan >/dev/null
 check "terminal status stays frozen" "$(shasum -a 256 "$V2/qing-plans/demo-plan/status.json" | cut -d' ' -f1)" "$FROZEN"
 expect_die "terminal plan is immutable" P add-issue --plan demo-plan --title Later --detail Later --next-action Later
 P validate >/dev/null
+check "frozen status.json names a content-hashed shard per phase and show reassembles the items" \
+  "$(P show --plan demo-plan | python3 -c 'import hashlib, json, pathlib, sys
+d = pathlib.Path(sys.argv[1]); s = json.loads((d / "status.json").read_text()); full = json.load(sys.stdin)
+names = [p["shard"] for p in s["phases"]]
+print(all(hashlib.sha256((d / n).read_bytes()).hexdigest() == pathlib.Path(n).stem for n in names), "items" in s["phases"][0],
+      [i["id"] for p in full["phases"] for i in p["items"]] == list(full["changeCoverage"]["items"]), s["changeCoverage"]["itemsInShards"])' \
+  "$V2/qing-plans/demo-plan")" \
+  "True False True True"
+check "a completed plan keeps exactly the phase shards its frozen status names" \
+  "$(python3 -c 'import json, pathlib, sys; d = pathlib.Path(sys.argv[1])
+print(sorted(f"phases/{p.name}" for p in (d / "phases").iterdir()) == sorted(p["shard"] for p in json.loads((d / "status.json").read_text())["phases"]))' \
+  "$V2/qing-plans/demo-plan")" "True"
+printf '{}\n' >"$V2/qing-plans/demo-plan/phases/stray.json"
+expect_die "validate reports a phase shard the frozen status does not name" P validate
+rm "$V2/qing-plans/demo-plan/phases/stray.json"
+shard="$(python3 -c 'import json, sys; print(json.load(open(sys.argv[1]))["phases"][0]["shard"])' "$V2/qing-plans/demo-plan/status.json")"
+mv "$V2/qing-plans/demo-plan/$shard" "$TEST_ROOT/shard.json"
+expect_die "validate reports a frozen status whose phase shard is missing" P validate
+mv "$TEST_ROOT/shard.json" "$V2/qing-plans/demo-plan/$shard"
 
 ###############################################################################
 # none: automatic temporary amendment and cleanup completion gate.
@@ -345,6 +370,425 @@ F create --slug first-plan --name First --goal "Start the store" \
 check "create still builds the store and installs the viewer" \
   "$(test -f "$FRESH/qing-plans/index.json" && test -f "$FRESH/qing-plans/dashboard.html" && echo yes)" "yes"
 
+###############################################################################
+# batch: many mutations under one lock, one save, and all-or-nothing rollback.
+###############################################################################
+BATCH="$TEST_ROOT/batch"
+new_repo "$BATCH"
+B() { python3 "$PLANCTL" --root "$BATCH" "$@"; }
+cat >"$TEST_ROOT/batch.jsonl" <<'JSONL'
+{"command": "create", "slug": "batch-plan", "name": "Batch", "goal": "Author in one pass", "review-policy": "none", "actor": "planner", "actor-type": "agent"}
+{"command": "upsert-module", "plan": "batch-plan", "id": "core", "name": "Core", "description": "Core", "path-pattern": ["core/**"], "reason": "r", "evidence": "e", "actor": "planner"}
+{"command": "add-phase", "plan": "batch-plan", "id": "p1", "title": "Work", "purpose": "Work", "actor": "planner"}
+["add-item", "--plan", "batch-plan", "--phase", "p1", "--id", "a", "--title", "A", "--purpose", "A", "--module", "core", "--change-reason", "A", "--file", "core/a.txt:create", "--verify-kind", "test", "--actor", "planner"]
+{"command": "add-item", "plan": "batch-plan", "phase": "p1", "id": "b", "title": "B", "purpose": "B", "depends-on": "a", "no-file-impact": true, "verify-kind": "manual", "actor": "planner"}
+JSONL
+check "batch applies every line and renders status once at the end" \
+  "$(B batch --file "$TEST_ROOT/batch.jsonl" | python3 -c 'import json,sys;d=json.load(sys.stdin);print(d["applied"],[s["summary"]["totalItems"] for s in d["statuses"]])')" "5 [2]"
+batch_events() { B history --plan batch-plan | python3 -c 'import json,sys;print(len(json.load(sys.stdin)["events"]))'; }
+check "batch keeps one audit event per command" "$(batch_events)" "5"
+batch_plan_hash="$(shasum -a 256 "$BATCH/qing-plans/batch-plan/plan.json" | cut -d' ' -f1)"
+expect_die "a failing batch line rejects the whole batch" B batch --file - <<'JSONL'
+{"command": "add-phase", "plan": "batch-plan", "id": "p2", "title": "Two", "purpose": "Two", "actor": "planner"}
+{"command": "add-phase", "plan": "batch-plan", "id": "p2", "title": "Two", "purpose": "Two", "actor": "planner"}
+JSONL
+check "a rolled-back batch leaves plan and events untouched" \
+  "$(shasum -a 256 "$BATCH/qing-plans/batch-plan/plan.json" | cut -d' ' -f1)/$(batch_events)" \
+  "$batch_plan_hash/5"
+
+###############################################################################
+# Segmented event log: one NDJSON segment per size window, legacy files converted.
+###############################################################################
+check "events append to an NDJSON segment with a manifest instead of one file each" \
+  "$(ls "$BATCH/qing-plans/batch-plan/events" | grep -v '^index' | tr '\n' ' ')" "manifest.json segment-000001.ndjson "
+python3 - "$BATCH/qing-plans/batch-plan/events" <<'PY'
+import json, sys
+from pathlib import Path
+directory = Path(sys.argv[1])
+for stamp, suffix in [("2020-01-01T00:00:00Z", "a"), ("2020-01-02T00:00:00Z", "b")]:
+    event_id = f"{stamp.replace(':', '-')}-legacy-note-{suffix}"
+    (directory / f"{event_id}.json").write_text(json.dumps({
+        "schemaVersion": 2, "eventId": event_id, "occurredAt": stamp, "type": "legacy-note",
+        "planSlug": "batch-plan", "actor": "old", "actorType": "agent", "details": {}}), encoding="utf-8")
+PY
+check "history streams legacy per-file events before segments" "$(B history --plan batch-plan --limit 7 | python3 -c 'import json,sys;print([e["type"] for e in json.load(sys.stdin)["events"]][:2])')" "['legacy-note', 'legacy-note']"
+B compact-events >/dev/null
+check "compact-events folds per-file events into segments in occurrence order with their eventIds" \
+  "$(ls "$BATCH/qing-plans/batch-plan/events" | grep -v '^index' | tr '\n' ' ')/$(B history --plan batch-plan | python3 -c 'import json,sys;e=json.load(sys.stdin)["events"];print(len(e),e[0]["eventId"],e==sorted(e,key=lambda r:r["occurredAt"]))')" \
+  "manifest.json segment-000001.ndjson /7 2020-01-01T00-00-00Z-legacy-note-a True"
+B validate >/dev/null
+check "segmented events validate" "$?" "0"
+
+###############################################################################
+# Event history index: filtered and paged history reads only matching records.
+###############################################################################
+H() { B history --plan batch-plan "$@" | python3 -c 'import json,sys;d=json.load(sys.stdin);print(" ".join(e["type"] for e in d["events"]))'; }
+check "history filters by event type" "$(H --type item-added --type phase-added)" "phase-added item-added item-added"
+check "history filters by item" "$(H --item b)" "item-added"
+check "history filters by time range" "$(H --until 2020-12-31)/$(H --since 2021-01-01 --type plan-created)" \
+  "legacy-note legacy-note/plan-created"
+history_ids() { python3 -c 'import json,sys;d=json.load(sys.stdin);print(" ".join(e["eventId"] for e in d["events"]),d["nextCursor"] or "")'; }
+page="$(B history --plan batch-plan --limit 3 | history_ids)"
+cursor="${page##* }"
+page2="$(B history --plan batch-plan --limit 3 --cursor "$cursor" | history_ids)"
+page3="$(B history --plan batch-plan --limit 3 --cursor "${page2##* }" | history_ids)"
+check "cursor pages walk back through the whole log once" \
+  "${page3% } ${page2% *} ${page% *}" "$(B history --plan batch-plan | history_ids | sed 's/ $//')"
+expect_die "a malformed history cursor is rejected" B history --plan batch-plan --cursor not-a-cursor
+check "the event index is git-ignored and not a handoff blocker" \
+  "$(git -C "$BATCH" check-ignore -q qing-plans/batch-plan/events/index.ndjson && echo ignored)" "ignored"
+rm "$BATCH/qing-plans/batch-plan/events/index.ndjson"
+check "a missing event index is rebuilt from the segments" \
+  "$(H --item a)/$(test -f "$BATCH/qing-plans/batch-plan/events/index.ndjson" && echo rebuilt)" "item-added/rebuilt"
+B add-phase --plan batch-plan --id p3 --title Indexed --purpose "Appended after the rebuild" --actor planner --actor-type agent >/dev/null
+check "appending events extends a fresh index in place" \
+  "$(python3 -c "import sys; sys.path.insert(0, '$SCRIPT_DIR'); from pathlib import Path; from qing_plan.storage import *; d = Path('$BATCH/qing-plans/batch-plan/events'); m = load_event_manifest(d); print(event_index_fresh(d, m), load_event_index(d) == rebuild_event_index(d, m, persist=False))")" \
+  "True True"
+segment="$(ls "$BATCH"/qing-plans/batch-plan/events/segment-*.ndjson | tail -n 1)"
+before="$(batch_events)"
+printf '{"eventId": "torn' >>"$segment"
+torn_size="$(wc -c <"$segment")"
+check "a read-only history skips a torn final line without truncating the segment" \
+  "$(batch_events)/$(wc -c <"$segment")" "$before/$torn_size"
+B add-phase --plan batch-plan --id p4 --title Repaired --purpose "Appended after a torn line" --actor planner --actor-type agent >/dev/null
+check "the next locked append drops the torn line before writing" \
+  "$(batch_events)/$(python3 -c 'import json, sys; [json.loads(l) for l in open(sys.argv[1], "rb")]; print("parsed")' "$segment")" "$((before + 1))/parsed"
+printf '.planctl.lock\n# kept by hand\n' >"$BATCH/qing-plans/.gitignore"
+B add-phase --plan batch-plan --id p5 --title Ignored --purpose "Written to a store with a baseline .gitignore" --actor planner --actor-type agent >/dev/null
+B add-phase --plan batch-plan --id p6 --title Again --purpose "A second write adds nothing more" --actor planner --actor-type agent >/dev/null
+check "a mutation adds missing ignore rules to an existing store's .gitignore once" \
+  "$(grep -c . "$BATCH/qing-plans/.gitignore")/$(grep -c 'kept by hand' "$BATCH/qing-plans/.gitignore")/$(git -C "$BATCH" check-ignore qing-plans/batch-plan/events/index-meta.json qing-plans/.cache | wc -l | tr -d " ")" \
+  "5/1/2"
+
+###############################################################################
+# daemon: one warm process serves the same payloads; the CLI falls back in-process.
+###############################################################################
+DAEMON="$TEST_ROOT/daemon"
+new_repo "$DAEMON"
+D() { python3 "$PLANCTL" --root "$DAEMON" "$@"; }
+L() { PLANCTL_NO_DAEMON=1 D "$@"; }
+L create --slug warm --name Warm --goal "Serve warm" --review-policy none --doc-mode none \
+  --doc-reason "No docs" --actor planner >/dev/null
+D daemon --idle-timeout 60 >"$TEST_ROOT/daemon.out" 2>&1 &
+for _ in $(seq 50); do grep -q "daemon serving" "$TEST_ROOT/daemon.out" && break; sleep 0.1; done
+without_time() { grep -v '"generatedAt"'; }
+check "the daemon answers show exactly like an in-process run" \
+  "$(D show --plan warm | without_time | shasum)" "$(L show --plan warm | without_time | shasum)"
+D add-phase --plan warm --id p1 --title One --purpose One --actor planner >/dev/null
+L add-phase --plan warm --id p2 --title Two --purpose Two --actor planner >/dev/null
+check "daemon and in-process mutations see each other's writes" \
+  "$(D show --plan warm | python3 -c 'import json,sys;print([p["id"] for p in json.load(sys.stdin)["phases"]])')" "['p1', 'p2']"
+expect_die "daemon errors keep the CLI exit status" D show --plan missing
+check "daemon --stop reports the commands it served" \
+  "$(D daemon --stop | python3 -c 'import json,sys;print(json.load(sys.stdin)["served"])')" "4"
+wait
+check "without a daemon the CLI runs in-process" "$(D validate | python3 -c 'import json,sys;print(json.load(sys.stdin)["valid"])')" "True"
+check "the daemon's document cache hands out copies and evicts the least recently used" \
+  "$(python3 -c "import sys; sys.path.insert(0, '$SCRIPT_DIR'); from pathlib import Path; from qing_plan import storage as st
+store = Path('$DAEMON/qing-plans'); st._DOCUMENT_CACHE, st.DOCUMENT_CACHE_ENTRIES = {}, 2
+st.read_json(store / 'index.json')['plans'].clear(); st.read_json(store / 'index.json')['plans'].clear()
+print(len(st.read_json(store / 'index.json')['plans']), end=' ')
+st.read_json(store / 'project-map.json'); st.read_json(store / 'index.json'); st.read_json(store / 'warm' / 'plan.json')
+print(*sorted(path.name for path in st._DOCUMENT_CACHE))")" "1 index.json plan.json"
+
+###############################################################################
+# hash cache: stat-keyed, git-ignored, racy entries re-read, --no-hash-cache.
+###############################################################################
+HASH="$TEST_ROOT/hash"
+new_repo "$HASH"
+mkdir -p "$HASH/assets"
+printf 'large generated asset\n' >"$HASH/assets/blob.bin"
+touch -d '2020-01-01 00:00:00' "$HASH/assets/blob.bin"
+git -C "$HASH" add assets
+git -C "$HASH" commit -qm asset
+X() { python3 "$PLANCTL" --root "$HASH" "$@"; }
+X create --slug hashed --name Hashed --goal "Hash once" --review-policy none --doc-mode none \
+  --doc-reason "No docs" --actor planner >/dev/null
+X upsert-module --plan hashed --id assets --name Assets --description Assets --path-pattern 'assets/**' \
+  --reason "Generated assets" --evidence "assets/" --actor planner >/dev/null
+X add-phase --plan hashed --id p1 --title One --purpose One --actor planner >/dev/null
+X add-item --plan hashed --phase p1 --id regen --title Regen --purpose Regen --module assets \
+  --change-reason "Regenerate" --file assets/blob.bin:modify --verify-kind test --actor planner >/dev/null
+git -C "$HASH" add qing-plans
+git -C "$HASH" commit -qm plan
+X transition --plan hashed --state active --reason go --actor-type human >/dev/null
+real_hash="$(shasum -a 256 "$HASH/assets/blob.bin" | cut -d' ' -f1)"
+start_hash() { python3 -c "import json;i=json.load(open('$HASH/qing-plans/hashed/plan.json'))['phases'][0]['items'][0];print(i['executionAttempts'][-1]['plannedSnapshots'][0]['sha256'])"; }
+X update-item --plan hashed --item regen --status in-progress --actor worker >/dev/null
+check "snapshots hash through a git-ignored stat-keyed cache" \
+  "$(start_hash)/$(git -C "$HASH" check-ignore -q qing-plans/.cache/hashes.json && echo ignored)" "$real_hash/ignored"
+poison_hash_cache() {
+  python3 - "$HASH/qing-plans/.cache/hashes.json" <<'PY'
+import json, sys
+path = sys.argv[1]
+data = json.load(open(path))
+for entry in data["entries"].values():
+    entry[4] = "0" * 64
+json.dump(data, open(path, "w"))
+PY
+}
+restart_item() {
+  X "$@" update-item --plan hashed --item regen --status blocked --reason wait --actor worker >/dev/null
+  X "$@" update-item --plan hashed --item regen --status in-progress --actor worker >/dev/null
+}
+poison_hash_cache
+restart_item
+check "an unchanged (size, mtime, inode) skips the file read" "$(start_hash)" "$(printf '0%.0s' $(seq 64))"
+restart_item --no-hash-cache
+check "--no-hash-cache re-reads every file" "$(start_hash)" "$real_hash"
+printf 'regenerated\n' >"$HASH/assets/blob.bin"
+restart_item
+poison_hash_cache
+restart_item
+check "a racily fresh mtime is re-hashed instead of trusted" \
+  "$(start_hash)" "$(shasum -a 256 "$HASH/assets/blob.bin" | cut -d' ' -f1)"
+
+check "the committed baseline diff is cached per (baseline, HEAD)" \
+  "$(X show --plan hashed >/dev/null; ls "$HASH/qing-plans/.cache/changes" | wc -l | tr -d ' ')" "1"
+git -C "$HASH" add assets
+git -C "$HASH" commit -qm regenerate
+git -C "$HASH" mv assets/blob.bin assets/moved.bin
+check "a new HEAD adds an entry and the working-tree delta composes onto the cached diff" \
+  "$(X changes --plan hashed | python3 -c 'import json,sys;print(json.load(sys.stdin)["changeCoverage"]["offPlanChanges"])')/$(ls "$HASH/qing-plans/.cache/changes" | wc -l | tr -d ' ')" \
+  "[{'path': 'assets/moved.bin', 'action': 'move'}]/2"
+git -C "$HASH" mv assets/moved.bin assets/blob.bin
+
+X add-issue --plan hashed --title "Slow fixture" --detail "Regeneration is slow" --severity warning \
+  --next-action "Profile it" --actor worker >/dev/null
+incremental_status="$(grep -v '"generatedAt"' "$HASH/qing-plans/hashed/status.json")"
+X refresh-status --plan hashed --full >/dev/null
+check "incrementally reused status sections match a --full rebuild byte for byte" \
+  "$(test -f "$HASH/qing-plans/.cache/status/hashed.json" && grep -v '"generatedAt"' "$HASH/qing-plans/hashed/status.json" | shasum)" \
+  "$(printf '%s\n' "$incremental_status" | shasum)"
+
+LANES="$TEST_ROOT/lanes"
+new_repo "$LANES"
+L() { python3 "$PLANCTL" --root "$LANES" "$@"; }
+L create --slug laned --name Laned --goal "Fan out" --review-policy none --doc-mode none --doc-reason "No docs" \
+  --execution-lanes 2 --actor planner >/dev/null
+L upsert-module --plan laned --id core --name Core --description Core --path-pattern 'core/**' \
+  --reason Core --evidence core --actor planner >/dev/null
+L add-phase --plan laned --id p1 --title One --purpose One --actor planner >/dev/null
+for spec in "a core/a.txt:create" "b core/b.txt:create" "c core/a.txt:modify" "d core/d.txt:move:core/b.txt" "e core/e.txt:create"; do
+  set -- $spec
+  L add-item --plan laned --phase p1 --id "$1" --title "$1" --purpose "$1" --module core --change-reason "$1" \
+    --file "$2" --verify-kind test --actor planner >/dev/null
+done
+git -C "$LANES" add qing-plans
+git -C "$LANES" commit -qm plan
+L transition --plan laned --state active --reason go --actor-type human >/dev/null
+lane_actions() { L resume | python3 -c 'import json,sys;print(" ".join("%s:%s@%s" % (a["type"], a["id"], a.get("lane")) for a in json.load(sys.stdin)["nextActions"]))'; }
+check "two lanes offer the first disjoint ready items" "$(lane_actions)" "start-item:a@1 start-item:b@2"
+L update-item --item a --status in-progress --actor worker-1 >/dev/null
+L update-item --item b --status in-progress --actor worker-2 >/dev/null
+expect_die "a third item waits for a free lane" L update-item --item e --status in-progress --actor worker-3
+L set-execution-lanes --lanes 3 --actor lead >/dev/null
+expect_die "an item sharing a running item's path is not admitted" L update-item --item c --status in-progress --actor worker-3
+expect_die "a move whose source a running item declares is not admitted" L update-item --item d --status in-progress --actor worker-3
+check "a new lane is offered to the first disjoint ready item" "$(lane_actions)" "continue-item:a@1 continue-item:b@2 start-item:e@3"
+expect_die "lanes cannot drop below the running items" L set-execution-lanes --lanes 1 --actor lead
+L checkpoint --item b --reason "Paused for review" --next-action "Finish b" --actor worker-2 >/dev/null
+check "each running lane keeps its own attribution and checkpoint note" \
+  "$(python3 -c "import json;c=json.load(open('$LANES/qing-plans/laned/plan.json'))['checkpoint'];print([(l['lane'],l['itemId'],l['startedBy'],l['stopReason']) for l in c['lanes']])")" \
+  "[(1, 'a', 'worker-1', None), (2, 'b', 'worker-2', 'Paused for review')]"
+mkdir -p "$LANES/core"
+printf 'a\n' >"$LANES/core/a.txt"
+L verify --item a --result pass --evidence ok --verified-by script --actor worker-1 >/dev/null
+check "a finished lane frees its paths for the next item" "$(lane_actions)" "continue-item:b@2 start-item:c@1 start-item:e@3"
+check "laned plan validates" "$(L validate | python3 -c 'import json,sys;print(json.load(sys.stdin)["valid"])')" "True"
+check "the schedule forecasts from finished attempts" \
+  "$(L resume | python3 -c 'import json,sys;s=json.load(sys.stdin)["schedule"];print(s["basis"],s["samples"],s["eta"]["lanes"],s["remaining"]["items"])')" \
+  "execution-history 1 3 4"
+
+L create --slug ranked --name Ranked --goal "Rank ready work" --review-policy none --doc-mode none --doc-reason "No docs" \
+  --actor planner >/dev/null
+L add-phase --plan ranked --id p1 --title One --purpose One --actor planner >/dev/null
+for spec in "x " "y " "z y" "w z"; do
+  set -- $spec
+  L add-item --plan ranked --phase p1 --id "$1" --title "$1" --purpose "$1" --depends-on "${2:-}" --no-file-impact \
+    --verify-kind manual --actor planner >/dev/null
+done
+check "the ready queue leads with the longest downstream chain" \
+  "$(L resume --plan ranked | python3 -c 'import json,sys;s=json.load(sys.stdin)["schedule"];print([q["id"] for q in s["readyQueue"]],s["criticalPath"]["items"],s["basis"],s["eta"])')" \
+  "['y', 'x'] ['y', 'z', 'w'] item-count None"
+
+X show --plan hashed | grep -v '"generatedAt"' > "$TEST_ROOT/plain.out"
+X --profile --profile-output "$TEST_ROOT/trace.json" show --plan hashed 2> "$TEST_ROOT/profile.err" | grep -v '"generatedAt"' > "$TEST_ROOT/profiled.out"
+check "--profile leaves stdout alone and writes a trace of git and JSON spans" \
+  "$(cmp -s "$TEST_ROOT/plain.out" "$TEST_ROOT/profiled.out" && echo same)/$(grep -c '^  trace: ' "$TEST_ROOT/profile.err")/$(python3 -c 'import json, sys; print(sorted({e["cat"] for e in json.load(open(sys.argv[1]))["traceEvents"] if e["ph"] == "X"} & {"git", "json", "projection"}))' "$TEST_ROOT/trace.json")" \
+  "same/1/['git', 'json', 'projection']"
+profiles="$HASH/qing-plans/.cache/profiles"
+mkdir -p "$profiles"
+for n in $(seq 1 21); do printf '{}\n' >"$profiles/planctl-old-$n.json"; touch -t 202001010000 "$profiles/planctl-old-$n.json"; done
+X --profile show --plan hashed >/dev/null 2>&1
+check "--profile keeps only the newest 20 traces in the store cache" \
+  "$(ls "$profiles" | wc -l | tr -d ' ')/$(ls "$profiles" | grep -c -- '-show-')" "20/1"
+
+mkdir -p "$TEST_ROOT/stuck/qing-plans" "$TEST_ROOT/fleet"
+mkfifo "$TEST_ROOT/stuck/qing-plans/index.json"
+printf '# repositories\n%s\n%s\n\n../stuck\n%s\n' "$LANES" "$HASH" "$TEST_ROOT/nowhere" >"$TEST_ROOT/fleet/roots.txt"
+python3 "$PLANCTL" fleet --roots-file "$TEST_ROOT/fleet/roots.txt" --jobs 2 --timeout 2 >"$TEST_ROOT/fleet.ndjson"
+check "fleet streams one record per repository and isolates a hung one" \
+  "$(python3 -c 'import json,sys;r=[json.loads(l) for l in open(sys.argv[1])];print(sorted((x["root"].rsplit("/",1)[-1],x["status"],(x.get("plan") or {}).get("slug")) for x in r if x["type"]=="repo"),r[-1]["type"])' "$TEST_ROOT/fleet.ndjson")" \
+  "[('hash', 'ok', 'hashed'), ('lanes', 'ok', 'laned'), ('nowhere', 'error', None), ('stuck', 'timeout', None)] summary"
+check "fleet writes an aggregate index in roots-file order" \
+  "$(python3 -c 'import json,sys;d=json.load(open(sys.argv[1]));print(d["totals"]["ok"],d["totals"]["timeout"],[r["root"].rsplit("/",1)[-1] for r in d["repositories"]])' "$TEST_ROOT/fleet/roots.fleet.json")" \
+  "2 1 ['lanes', 'hash', 'stuck', 'nowhere']"
+
+L create --slug side --name Side --goal "Draft alongside the active plan" --review-policy none --doc-mode none \
+  --doc-reason "Lock fixture" --actor planner --actor-type agent >/dev/null
+python3 -c 'import fcntl, sys, time; h = open(sys.argv[1], "a+"); fcntl.flock(h, fcntl.LOCK_EX); open(sys.argv[2], "w").close(); time.sleep(30)' \
+  "$LANES/qing-plans/.cache/locks/plan-laned.lock" "$TEST_ROOT/plan-held" &
+holder=$!
+while [ ! -e "$TEST_ROOT/plan-held" ]; do sleep 0.05; done
+check "a mutation of another plan does not wait for a held plan lock" \
+  "$(L --lock-timeout 5 add-phase --plan side --id s1 --title Side --purpose "Side work" --actor planner --actor-type agent >/dev/null && echo ran)" "ran"
+lock_status=0
+PLANCTL_LOCK_TIMING=1 L --lock-timeout 0.2 add-issue --title Held --detail "Plan lock held" --severity warning \
+  --next-action Wait --actor smoke >/dev/null 2>"$TEST_ROOT/lock.err" || lock_status=$?
+check "--lock-timeout gives up on a held plan lock and reports each wait" \
+  "$lock_status/$(grep -c 'waited' "$TEST_ROOT/lock.err")/$(grep -o 'timed out after 0.2s waiting for the plan-laned lock' "$TEST_ROOT/lock.err")" \
+  "2/1/timed out after 0.2s waiting for the plan-laned lock"
+kill "$holder"
+wait "$holder" 2>/dev/null || true
+index_revision="$(L resume | python3 -c 'import json, sys; print(json.load(sys.stdin)["revisions"]["index"])')"
+cas_status=0
+L add-issue --title First --detail "Prepared at one revision" --next-action Wait --actor smoke --expect-revision "index=$index_revision" >/dev/null
+L add-issue --title Second --detail "Prepared at the same revision" --next-action Wait --actor smoke \
+  --expect-revision "index=$index_revision" >"$TEST_ROOT/conflict.json" 2>/dev/null || cas_status=$?
+check "--expect-revision applies the first of two racing mutations and returns the other's conflict" \
+  "$cas_status/$(python3 -c 'import json, sys; c=json.load(open(sys.argv[1]))["conflict"]; print(c["stale"], c["actual"]["index"] - c["expected"]["index"])' "$TEST_ROOT/conflict.json")" \
+  "3/['index'] 1"
+check "apply_if_current reports a stale plan revision as a conflict instead of raising" \
+  "$(python3 -c 'import sys; sys.path.insert(0, sys.argv[1]); from qing_plan.cli import apply_if_current; r = apply_if_current(sys.argv[2], ["add-issue", "--title", "Late", "--detail", "d", "--next-action", "n"], {"plan": 0}); print(r["applied"], r["conflict"]["stale"])' "$SCRIPT_DIR" "$LANES")" \
+  "False ['plan']"
+L add-issue --title "Generation probe" --detail "Publish a pointer" --severity warning --next-action "Ignore" --actor smoke >/dev/null
+generation_before="$(L show | python3 -c 'import json, sys; print(json.load(sys.stdin)["plan"]["revision"])')"
+python3 - "$SCRIPT_DIR" "$LANES" <<'PY'
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+from qing_plan import storage as st
+root = Path(sys.argv[2])
+st.select_store(root, "show")
+st.publish_generation(root, settled=False)
+path = st.plan_path(root, st.read_json(st.index_path(root))["currentPlanSlug"])
+plan = st.read_json(path)
+plan["revision"] += 1
+st.write_json(path, plan)
+PY
+check "readers stay on the published generation while a mutation is unsettled" \
+  "$(L show | python3 -c 'import json, sys; print(json.load(sys.stdin)["plan"]["revision"])')" "$generation_before"
+python3 - "$SCRIPT_DIR" "$LANES" <<'PY'
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+from qing_plan import storage as st
+st.select_store(Path(sys.argv[2]), "show")
+st.publish_generation(Path(sys.argv[2]), settled=True)
+PY
+python3 -c 'import json, sys; p=sys.argv[1]; d=json.load(open(p)); d["goal"]="Edited by hand"; json.dump(d, open(p, "w"), indent=2)' \
+  "$LANES/qing-plans/$(python3 -c 'import json, sys; print(json.load(open(sys.argv[1]))["currentPlanSlug"])' "$LANES/qing-plans/index.json")/plan.json"
+check "an edit made outside planctl wins over a settled generation" \
+  "$(L show | python3 -c 'import json, sys; print(json.load(sys.stdin)["plan"]["goal"])')/$(test -f "$LANES/qing-plans/.cache/generations/current.json" && echo pointer)" \
+  "Edited by hand/pointer"
+replay_status=0
+L validate --replay >/dev/null 2>"$TEST_ROOT/replay.err" || replay_status=$?
+check "validate --replay names where a hand-edited plan.json departs from its event log" \
+  "$replay_status/$(grep -o 'departs from its event log at [a-z, ]*' "$TEST_ROOT/replay.err")" "2/departs from its event log at goal, revision"
+printf '{"goal": "torn' >"$LANES/qing-plans/laned/plan.json"
+L recover-plan --plan laned >/dev/null
+check "recover-plan rebuilds a corrupted plan.json from the event log" \
+  "$(L validate --replay | python3 -c 'import json, sys; r = json.load(sys.stdin)["replay"]; print(r["laned"]["consistent"], r["side"]["consistent"])')/$(L show | python3 -c 'import json, sys; print(json.load(sys.stdin)["plan"]["goal"])')" \
+  "True True/Fan out"
+PLANCTL_NO_STATUS_WORKER=1 L --defer-status add-issue --title Deferred --detail "Queued render" --next-action Wait \
+  --actor smoke >"$TEST_ROOT/deferred.json"
+PLANCTL_NO_STATUS_WORKER=1 L --defer-status add-issue --title "Deferred again" --detail "Coalesced render" --next-action Wait \
+  --actor smoke >/dev/null
+check "--defer-status persists the plan and queues one coalesced render behind it" \
+  "$(python3 -c 'import json, sys; print(json.load(open(sys.argv[1]))["statusQueued"])' "$TEST_ROOT/deferred.json")/$(L show | python3 -c 'import json, sys; s = json.load(sys.stdin); print(s["statusLag"]["requests"], s["statusLag"]["planRevision"] == s["plan"]["revision"], s["issues"][-1]["title"])')" \
+  "True/2 True Deferred again"
+check "refresh-status --wait renders the queue and returns status current with the plan" \
+  "$(L refresh-status --wait | python3 -c 'import json, sys; s = json.load(sys.stdin); i = json.load(open(sys.argv[1])); print(s["plan"]["updatedAt"] == next(e["updatedAt"] for e in i["plans"] if e["slug"] == "laned"), s["issues"][-1]["title"])' "$LANES/qing-plans/index.json")/$(ls "$LANES/qing-plans/.cache/status" | grep -c pending || true)" \
+  "True Deferred again/0"
+L --defer-status add-issue --title Background --detail "Worker render" --next-action Wait --actor smoke >/dev/null
+check "a background worker renders a deferred status without being waited on" \
+  "$(python3 -c 'import json, sys, time, os; d = time.time() + 20
+while os.path.exists(sys.argv[1]) and time.time() < d: time.sleep(0.05)
+print(json.load(open(sys.argv[2]))["issues"][-1]["title"])' "$LANES/qing-plans/.cache/status/laned.pending.json" "$LANES/qing-plans/laned/status.json")" \
+  "Background"
+shards_before="$(ls "$LANES/qing-plans/laned/phases")"
+L add-issue --title Sharded --detail "Phases unchanged" --next-action None --actor smoke >/dev/null
+check "a mutation that leaves the phases alone keeps every phase shard in place" \
+  "$(ls "$LANES/qing-plans/laned/phases")/$(python3 -c 'import json, sys; print(json.load(open(sys.argv[1]))["issues"][-1]["title"])' "$LANES/qing-plans/laned/status.json")" \
+  "$shards_before/Sharded"
+
+SCOPED="$TEST_ROOT/scoped"
+new_repo "$SCOPED"
+S() { python3 "$PLANCTL" --root "$SCOPED" "$@"; }
+S create --slug scoped --name Scoped --goal "Scan only the plan" --review-policy none --doc-mode none --doc-reason "No docs" \
+  --actor planner >/dev/null
+S upsert-module --plan scoped --id core --name Core --description Core --path-pattern 'core/**' --reason Core --evidence core \
+  --actor planner >/dev/null
+S add-phase --plan scoped --id p1 --title One --purpose One --actor planner >/dev/null
+S add-item --plan scoped --phase p1 --id a --title a --purpose a --module core --change-reason a --file core/a.txt:create \
+  --verify-kind test --actor planner >/dev/null
+git -C "$SCOPED" add qing-plans
+git -C "$SCOPED" commit -qm plan
+S transition --plan scoped --state active --reason go --actor-type human >/dev/null
+mkdir -p "$SCOPED/core" "$SCOPED/build"
+printf 'a\n' >"$SCOPED/core/a.txt"
+printf 'stray\n' >"$SCOPED/core/stray.txt"
+printf 'output\n' >"$SCOPED/build/out.txt"
+printf 'changed\n' >"$SCOPED/baseline.txt"
+off_plan() { python3 -c 'import json, sys; c = json.load(sys.stdin)["changeCoverage"]; print(c.get("scanScope"), ",".join(p["path"] for p in c["offPlanChanges"]), c["observed"])'; }
+check "an unscoped scan reports every off-plan path" "$(S changes | off_plan)" "None baseline.txt,build/out.txt,core/stray.txt 1"
+git -C "$SCOPED" config qing-plans.scanScope planned
+check "a planned scan scope skips untracked files outside the plan yet sees every tracked change" \
+  "$(S changes | off_plan)" "planned baseline.txt,core/stray.txt 1"
+check "changes --full-scan keeps exhaustive off-plan detection on demand" \
+  "$(S changes --full-scan | off_plan)" "None baseline.txt,build/out.txt,core/stray.txt 1"
+git -C "$SCOPED" config core.untrackedCache true
+check "with the untracked cache on, the scoped scan filters one full status to the same paths" \
+  "$(S changes | off_plan)" "planned baseline.txt,core/stray.txt 1"
+check "history --format ndjson streams the events, then a summary in place of the envelope" \
+  "$(L --format ndjson history | python3 -c 'import json, sys; rows = [json.loads(l) for l in sys.stdin]; print(rows[-1]["type"], rows[-1]["events"] == len(rows) - 1, [r["eventId"] for r in rows[:-1]] == [e["eventId"] for e in json.load(open(sys.argv[1]))["events"]])' <(L history))" \
+  "summary True True"
+check "show --format ndjson writes the status line, each phase, and one line per item" \
+  "$(L --format ndjson show | python3 -c 'import json, sys; rows = [json.loads(l) for l in sys.stdin]; print(rows[0]["type"], sum(r["type"] == "item" for r in rows) == rows[0]["summary"]["totalItems"])')" \
+  "status True"
+check "--format compact writes one line and the same document" \
+  "$(L --format compact show | wc -l | tr -d ' ')/$(python3 -c 'import json, sys; a, b = (json.load(open(p)) for p in sys.argv[1:]); a.pop("generatedAt"); b.pop("generatedAt"); print(a == b)' <(L --format compact show) <(L show))" \
+  "1/True"
+
+check "compiled path matcher agrees with per-module fnmatch loops" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/path_matcher.py" --modules 60 --paths 400 --repeat 1 | python3 -c 'import json, sys; print(json.load(sys.stdin)["identical"])')" \
+  "True"
+
+check "indexed phase graph matches the quadratic projection" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/phase_graph.py" --sizes 300 | python3 -c 'import json, sys; print(json.load(sys.stdin)["results"][0]["identical"])')" \
+  "True"
+
+check "shared PlanIndex helpers match the per-call walks" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/plan_index.py" --sizes 300 --repeat 1 | python3 -c 'import json, sys; print(all(h["identical"] for h in json.load(sys.stdin)["results"][0]["helpers"].values()))')" \
+  "True"
+
+check "copy-on-write amendment previews match deepcopy plus full validation" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/amendment_preview.py" --sizes 120 --attempts 3 --repeat 1 | python3 -c 'import json, sys; print(all(c["identical"] for c in json.load(sys.stdin)["results"][0]["cases"].values()))')" \
+  "True"
+
+check "replay rebuilds a long event log exactly and resumes from its snapshot" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/replay.py" --events 3000 --items 40 --tail 50 --snapshot-every 1000 | python3 -c 'import json, sys; d = json.load(sys.stdin); print(d["identical"], d["tailReplay"]["fromSnapshot"])')" \
+  "True 3000"
+
+check "NDJSON output carries the same events and items as the JSON document" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/output_formats.py" --events 200 --items 20 | python3 -c 'import json, sys; r = json.load(sys.stdin)["results"][0]; print(r["history"]["identical"], r["show"]["identical"])')" \
+  "True True"
+check "benchmark runner times every command on a generated store" \
+  "$(python3 "$SCRIPT_DIR/../benchmarks/run.py" --plans 2 --items 12 --phases 3 --events 30 --repo-files 60 --untracked 3 \
+      --repeat 1 --modes inProcess | python3 -c 'import json, sys; print(" ".join(json.load(sys.stdin)["results"]))')" \
+  "show resume validate history verify propose-amendment migrate-store"
+
 python3 -m py_compile "$SCRIPT_DIR/planctl.py" "$SCRIPT_DIR"/qing_plan/*.py
 check "source package compiles" "$?" "0"
 